@@ -1,5 +1,6 @@
 """Temporal activity package for the RAG0 project."""
 
+from ._vector_stores import clear_vector_store_managers
 from .ask import answer_query_activity
 from .cli import CommandParseError, parse_cli_command_activity, render_cli_menu_activity
 from .commands import (
@@ -17,6 +18,7 @@ from .vector_index import update_index_activity
 __all__ = [
     "CommandParseError",
     "answer_query_activity",
+    "clear_vector_store_managers",
     "ingest_command_activity",
     "detect_document_type_activity",
     "index_stats_activity",
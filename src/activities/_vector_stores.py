@@ -0,0 +1,34 @@
+"""Process-wide cache of vector store managers used by the ingestion and stats activities."""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict
+
+from ..ingestion.vector_store import VectorStoreManager
+
+
+@lru_cache(maxsize=4)
+def get_vector_store_manager(index_dir: str, collection_name: str = "rag0") -> VectorStoreManager:
+    """Return a shared manager for ``index_dir`` so each activity call skips reopening the store."""
+
+    return VectorStoreManager(storage_dir=Path(index_dir), collection_name=collection_name)
+
+
+def collect_index_stats(index_dir: str) -> Dict[str, Any]:
+    """Return index statistics, reusing the cached manager once the index directory exists."""
+
+    if not Path(index_dir).exists():
+        # Opening a manager would create the directory; report the missing store instead.
+        return VectorStoreManager.get_stats(Path(index_dir))
+    return get_vector_store_manager(index_dir).stats()
+
+
+def clear_vector_store_managers() -> None:
+    """Drop cached managers, releasing their Chroma clients; called on worker shutdown."""
+
+    get_vector_store_manager.cache_clear()
+
+
+__all__ = ["clear_vector_store_managers", "collect_index_stats", "get_vector_store_manager"]
@@ -4,48 +4,110 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from typing import Any, Dict, List, Optional
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, TypedDict, cast
 
+from pydantic import TypeAdapter
 from temporalio import activity
 
-from ..agents.ask import AskAgentConfig, AskAgentState, LangGraphAskAgent
+from ..agents.ask import (
+    AskAgentConfig,
+    AskAgentState,
+    ConversationTurn,
+    LangGraphAskAgent,
+    ReasoningStep,
+    RetrievedDocument,
+)
+from ..ingestion.vector_store import VectorStoreManager
+from ._query_cache import QueryCache
+
+
+class ProgressEvent(TypedDict):
+    """Progress update emitted while the ask graph runs."""
+
+    label: str
+    detail: str
+    metadata: Dict[str, Any]
+
+
+class AnswerQueryResult(TypedDict):
+    """Payload returned by :func:`answer_query_activity`."""
+
+    answer: Optional[str]
+    citations: List[str]
+    documents: List[Dict[str, Any]]
+    reasoning: List[Dict[str, Any]]
+    conversation: List[Dict[str, Any]]
+    progress: List[ProgressEvent]
+
 
 ASK_AGENT = LangGraphAskAgent()
+# Source of the activity's default arguments; unset parameters fall back to these values.
+_DEFAULTS = AskAgentConfig()
+ANSWER_CACHE = QueryCache(max_size=256, ttl_seconds=300.0)
+# Bounds concurrent graph runs (and therefore concurrent Ollama calls) independently
+# of the event loop's default executor.
+_ASK_EXECUTOR = ThreadPoolExecutor(
+    max_workers=max(int(os.getenv("ASK_AGENT_CONCURRENCY", "4")), 1),
+    thread_name_prefix="ask-agent",
+)
+# Built once so list serialisation runs in pydantic-core rather than per-item model_dump calls.
+_DOCUMENTS_ADAPTER = TypeAdapter(List[RetrievedDocument])
+_REASONING_ADAPTER = TypeAdapter(List[ReasoningStep])
+_CONVERSATION_ADAPTER = TypeAdapter(List[ConversationTurn])
 logger = logging.getLogger(__name__)
 
 
+async def _signal_pump(
+    parent_handle: Any,
+    signal_queue: asyncio.Queue[Optional[ProgressEvent]],
+) -> None:
+    """Forward queued progress events to the parent workflow until ``None`` arrives."""
+
+    while True:
+        payload = await signal_queue.get()
+        if payload is None:
+            return
+        try:
+            await parent_handle.signal("push_progress", {"command": "ask", "event": payload})
+        except Exception as exc:  # pragma: no cover - defensive logging
+            logger.debug("Failed to signal parent workflow progress: %s", exc)
+
+
 @activity.defn
 async def answer_query_activity(
     question: str,
     index_dir: str = "storage/index",
-    top_k: int = AskAgentConfig().top_k,
-    ollama_model: str = AskAgentConfig().ollama_model,
-    ollama_base_url: str = AskAgentConfig().ollama_base_url,
-    temperature: float = AskAgentConfig().temperature,
-    max_subquestions: int = AskAgentConfig().max_subquestions,
-    neighbor_span: int = AskAgentConfig().neighbor_span,
-    reflection_enabled: bool = AskAgentConfig().reflection_enabled,
-    max_reflections: int = AskAgentConfig().max_reflections,
-    min_citations: int = AskAgentConfig().min_citations,
+    top_k: Optional[int] = None,
+    ollama_model: Optional[str] = None,
+    ollama_base_url: Optional[str] = None,
+    temperature: Optional[float] = None,
+    max_subquestions: Optional[int] = None,
+    neighbor_span: Optional[int] = None,
+    reflection_enabled: Optional[bool] = None,
+    max_reflections: Optional[int] = None,
+    min_citations: Optional[int] = None,
     parent_workflow_id: Optional[str] = None,
     parent_run_id: Optional[str] = None,
-) -> Dict[str, Any]:
+) -> AnswerQueryResult:
     """Execute the LangGraph ask agent to produce an answer."""
 
     config = AskAgentConfig(
         index_dir=index_dir,
-        top_k=top_k,
-        ollama_model=ollama_model,
-        ollama_base_url=ollama_base_url,
-        temperature=temperature,
-        max_subquestions=max_subquestions,
-        neighbor_span=neighbor_span,
-        reflection_enabled=reflection_enabled,
-        max_reflections=max_reflections,
-        min_citations=min_citations,
+        top_k=_DEFAULTS.top_k if top_k is None else top_k,
+        ollama_model=_DEFAULTS.ollama_model if ollama_model is None else ollama_model,
+        ollama_base_url=_DEFAULTS.ollama_base_url if ollama_base_url is None else ollama_base_url,
+        temperature=_DEFAULTS.temperature if temperature is None else temperature,
+        max_subquestions=_DEFAULTS.max_subquestions if max_subquestions is None else max_subquestions,
+        neighbor_span=_DEFAULTS.neighbor_span if neighbor_span is None else neighbor_span,
+        reflection_enabled=_DEFAULTS.reflection_enabled if reflection_enabled is None else reflection_enabled,
+        max_reflections=_DEFAULTS.max_reflections if max_reflections is None else max_reflections,
+        min_citations=_DEFAULTS.min_citations if min_citations is None else min_citations,
     )
 
-    progress_events: List[Dict[str, Any]] = []
+    progress_events: List[ProgressEvent] = []
     loop = asyncio.get_running_loop()
 
     parent_handle = None
@@ -60,39 +122,32 @@ async def answer_query_activity(
             logger.debug("Unable to acquire parent workflow handle: %s", exc)
             parent_handle = None
 
+    # A single pump forwards progress to the parent in order; None closes it.
+    signal_queue: Optional[asyncio.Queue[Optional[ProgressEvent]]] = None
+    pump_task: Optional[asyncio.Task[None]] = None
+    if parent_handle is not None:
+        signal_queue = asyncio.Queue()
+        pump_task = loop.create_task(_signal_pump(parent_handle, signal_queue))
+
     def _record_progress(event: Dict[str, Any]) -> None:
-        payload = {
+        metadata = event.get("metadata") or {}
+        # Heartbeats and signals serialize the payload, so they can share the metadata
+        # reference; only the retained progress list needs its own copy.
+        payload: ProgressEvent = {
             "label": str(event.get("label", "")),
             "detail": str(event.get("detail", "")),
-            "metadata": dict(event.get("metadata") or {}),
+            "metadata": metadata,
         }
-        progress_events.append(payload)
+        progress_events.append({**payload, "metadata": dict(metadata)})
         loop.call_soon_threadsafe(activity.heartbeat, payload)
-
-        if parent_handle is not None:
-
-            def _schedule_signal(event_payload: Dict[str, Any]) -> None:
-                async def _send() -> None:
-                    try:
-                        await parent_handle.signal(
-                            "push_progress",
-                            {
-                                "command": "ask",
-                                "event": event_payload,
-                            },
-                        )
-                    except Exception as exc:  # pragma: no cover - defensive logging
-                        logger.debug("Failed to signal parent workflow progress: %s", exc)
-
-                loop.create_task(_send())
-
-            loop.call_soon_threadsafe(_schedule_signal, payload)
+        if signal_queue is not None:
+            loop.call_soon_threadsafe(signal_queue.put_nowait, payload)
 
     def _on_step(label: str, agent_state: AskAgentState) -> None:
         try:
             last_step = agent_state.reasoning[-1] if agent_state.reasoning else None
             detail = (last_step.detail if last_step else "").strip()
-            metadata = dict(last_step.metadata) if last_step else {}
+            metadata = last_step.metadata if last_step else {}
         except Exception:  # pragma: no cover - defensive guard against unexpected state
             detail = ""
             metadata = {}
@@ -104,24 +159,41 @@ async def answer_query_activity(
         }
         _record_progress(event)
 
-    state = await asyncio.to_thread(ASK_AGENT.run, question, config, _on_step)
+    try:
+        # The index version invalidates cached answers whenever documents are ingested.
+        cache_key = (
+            question.strip(),
+            VectorStoreManager.read_index_version(Path(index_dir)),
+            config.model_dump_json(),
+        )
+        cached = ANSWER_CACHE.get(cache_key)
+        if cached is not None:
+            _record_progress(
+                {
+                    "label": "cache",
+                    "detail": "Served answer from the query cache.",
+                    "metadata": {"cache_hit": True},
+                }
+            )
+            return cast(AnswerQueryResult, {**cached, "progress": progress_events})
+
+        state = await loop.run_in_executor(_ASK_EXECUTOR, ASK_AGENT.run, question, config, _on_step)
 
-    formatted_documents: List[Dict[str, Any]] = [
-        {
-            "text": doc.text,
-            "score": doc.score,
-            "metadata": doc.metadata,
+        result: AnswerQueryResult = {
+            "answer": state.answer,
+            "citations": state.citations,
+            "documents": _DOCUMENTS_ADAPTER.dump_python(state.retrieved_documents),
+            "reasoning": _REASONING_ADAPTER.dump_python(state.reasoning),
+            "conversation": _CONVERSATION_ADAPTER.dump_python(state.conversation),
+            "progress": progress_events,
         }
-        for doc in state.retrieved_documents
-    ]
-    return {
-        "answer": state.answer,
-        "citations": state.citations,
-        "documents": formatted_documents,
-        "reasoning": [step.model_dump() for step in state.reasoning],
-        "conversation": [turn.model_dump() for turn in state.conversation],
-        "progress": progress_events,
-    }
-
-
-__all__ = ["answer_query_activity"]
+        if state.answer and not state.error:
+            ANSWER_CACHE.set(cache_key, result)
+        return result
+    finally:
+        if signal_queue is not None and pump_task is not None:
+            loop.call_soon(signal_queue.put_nowait, None)
+            await pump_task
+
+
+__all__ = ["AnswerQueryResult", "ProgressEvent", "answer_query_activity"]
@@ -2,9 +2,11 @@
 
 from __future__ import annotations
 
+import os
 import shlex
-from pathlib import Path
-from typing import Any, Dict
+import stat
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping
 
 from temporalio import activity
 
@@ -21,9 +23,64 @@ _MENU_TEXT = (
     "  /quit quit the session\n"
 )
 
+_SHLEX_SPECIAL_CHARS = ('"', "'", "\\")
+
+
+def _tokenize(raw_input: str) -> List[str]:
+    """Split CLI input, only paying for shlex when quoting or escapes are present."""
+
+    if not any(char in raw_input for char in _SHLEX_SPECIAL_CHARS):
+        return raw_input.split()
+    try:
+        return shlex.split(raw_input)
+    except ValueError as exc:
+        raise CommandParseError(str(exc)) from exc
+
+
+def _handle_ingest(tokens: List[str]) -> Dict[str, Any]:
+    if len(tokens) < 2:
+        raise CommandParseError("Usage: /ingest <path-to-document>")
+    source_path = os.path.expanduser(tokens[1])
+    try:
+        file_stat = os.stat(source_path)
+    except OSError as exc:
+        raise CommandParseError(f"File not found: {source_path}") from exc
+    if not stat.S_ISREG(file_stat.st_mode):
+        raise CommandParseError(f"Not a file: {source_path}")
+    return {
+        "command": "ingest",
+        "arguments": {"source_path": os.path.realpath(source_path)},
+    }
+
+
+def _handle_ask(tokens: List[str]) -> Dict[str, Any]:
+    question = " ".join(tokens[1:]).strip()
+    args: Dict[str, Any] = {}
+    if question:
+        args["question"] = question
+    return {"command": "ask", "arguments": args}
+
+
+def _handle_stat(tokens: List[str]) -> Dict[str, Any]:
+    return {"command": "stat", "arguments": {}}
+
+
+def _handle_quit(tokens: List[str]) -> Dict[str, Any]:
+    return {"command": "quit", "arguments": {}}
+
+
+_COMMAND_HANDLERS: Mapping[str, Callable[[List[str]], Dict[str, Any]]] = MappingProxyType(
+    {
+        "ingest": _handle_ingest,
+        "ask": _handle_ask,
+        "stat": _handle_stat,
+        "quit": _handle_quit,
+    }
+)
+
 
 @activity.defn
-async def render_cli_menu_activity() -> Dict[str, str]:
+def render_cli_menu_activity() -> Dict[str, str]:
     """Return the interactive menu text shown to CLI users."""
 
     return {"prompt": _MENU_TEXT}
@@ -36,10 +93,7 @@ async def parse_cli_command_activity(raw_input: str) -> Dict[str, Any]:
     if not raw_input.strip():
         raise CommandParseError("Enter a command to continue.")
 
-    try:
-        tokens = shlex.split(raw_input)
-    except ValueError as exc:
-        raise CommandParseError(str(exc)) from exc
+    tokens = _tokenize(raw_input)
 
     if not tokens:
         raise CommandParseError("Enter a command to continue.")
@@ -48,33 +102,10 @@ async def parse_cli_command_activity(raw_input: str) -> Dict[str, Any]:
     if command_token.startswith("/"):
         command_token = command_token[1:]
 
-    if command_token not in {"ingest", "ask", "stat", "quit"}:
+    handler = _COMMAND_HANDLERS.get(command_token)
+    if handler is None:
         raise CommandParseError(f"Unknown command: {tokens[0]}")
-
-    if command_token == "ingest":
-        if len(tokens) < 2:
-            raise CommandParseError("Usage: /ingest <path-to-document>")
-        source_path = Path(tokens[1]).expanduser()
-        if not source_path.exists():
-            raise CommandParseError(f"File not found: {source_path}")
-        if not source_path.is_file():
-            raise CommandParseError(f"Not a file: {source_path}")
-        return {
-            "command": "ingest",
-            "arguments": {"source_path": str(source_path.resolve())},
-        }
-
-    if command_token == "ask":
-        question = " ".join(tokens[1:]).strip()
-        args: Dict[str, Any] = {}
-        if question:
-            args["question"] = question
-        return {"command": "ask", "arguments": args}
-
-    if command_token == "stat":
-        return {"command": "stat", "arguments": {}}
-
-    return {"command": "quit", "arguments": {}}
+    return handler(tokens)
 
 
 __all__ = [
@@ -2,12 +2,12 @@
 
 from __future__ import annotations
 
-from pathlib import Path
+import os
 from typing import Any, Dict
 
 from temporalio import activity
 
-from ..ingestion.vector_store import VectorStoreManager
+from ._vector_stores import collect_index_stats
 
 
 def _coerce_bool(value: Any) -> bool:
@@ -19,7 +19,7 @@ def _coerce_bool(value: Any) -> bool:
 
 
 @activity.defn
-async def ingest_command_activity(
+def ingest_command_activity(
     arguments: Dict[str, Any],
     config: Dict[str, Any],
 ) -> Dict[str, Any]:
@@ -29,11 +29,11 @@ async def ingest_command_activity(
     if not source_path_value:
         raise ValueError("source_path is required for ingest command")
 
-    source_path = Path(source_path_value)
-    if not source_path.exists():
+    # parse_cli_command_activity already stat'ed the path; this cheap re-check only
+    # catches files removed in between.
+    source_path = str(source_path_value)
+    if not os.path.isfile(source_path):
         raise ValueError(f"File not found: {source_path}")
-    if not source_path.is_file():
-        raise ValueError(f"Not a file: {source_path}")
 
     parsed_dir = config.get("parsed_dir", "parsed")
     index_dir = config.get("index_dir", "storage/index")
@@ -48,7 +48,7 @@ async def ingest_command_activity(
     return {
         "parsed_dir": parsed_dir,
         "index_dir": index_dir,
-        "source_path": str(source_path),
+        "source_path": source_path,
         "chunk_size": chunk_size,
         "chunk_overlap": chunk_overlap,
         "chunk_merge_threshold": chunk_merge_threshold,
@@ -56,7 +56,7 @@ async def ingest_command_activity(
 
 
 @activity.defn
-async def question_command_activity(
+def question_command_activity(
     arguments: Dict[str, Any],
     config: Dict[str, Any],
 ) -> Dict[str, Any]:
@@ -92,16 +92,16 @@ async def question_command_activity(
 
 
 @activity.defn
-async def stats_command_activity(config: Dict[str, Any]) -> Dict[str, Any]:
+def stats_command_activity(config: Dict[str, Any]) -> Dict[str, Any]:
     """Return vector index statistics for the stats command."""
 
-    stats = VectorStoreManager.get_stats(Path(config.get("index_dir", "storage/index")))
+    stats = collect_index_stats(str(config.get("index_dir", "storage/index")))
     stats["status"] = "ok"
     return stats
 
 
 @activity.defn
-async def quit_command_activity() -> Dict[str, Any]:
+def quit_command_activity() -> Dict[str, Any]:
     """Return the terminal payload used when the user quits the session."""
 
     return {
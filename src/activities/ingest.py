@@ -11,7 +11,7 @@ from ..ingestion.detector import detect_document_type
 
 
 @activity.defn
-async def detect_document_type_activity(source_path: str) -> Dict[str, Any]:
+def detect_document_type_activity(source_path: str) -> Dict[str, Any]:
     """Detect the document type for the provided source file."""
 
     file_path = Path(source_path)
@@ -2,8 +2,10 @@
 
 from __future__ import annotations
 
+import asyncio
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Tuple
 
 from temporalio import activity
 
@@ -12,6 +14,24 @@ from ..ingestion.doc_parser import DocParser
 from ..ingestion.models import DocumentType
 from ..ingestion.vision_parser import VisionParser
 
+_DOCUMENT_TYPES: Dict[str, DocumentType] = {member.value: member for member in DocumentType}
+
+
+@lru_cache(maxsize=8)
+def _get_parsers(
+    chunk_size: int,
+    chunk_overlap: int,
+    chunk_merge_threshold: int,
+) -> Tuple[DocParser, VisionParser]:
+    """Build (once per chunking settings) the parsers shared across documents."""
+
+    chunk_config = ChunkingConfig(
+        chunk_size_tokens=max(chunk_size, 1),
+        chunk_overlap_tokens=max(min(chunk_overlap, max(chunk_size - 1, 0)), 0),
+        merge_threshold_tokens=max(chunk_merge_threshold, 0),
+    )
+    return DocParser(chunk_config), VisionParser(chunking_config=chunk_config)
+
 
 @activity.defn
 async def parse_document_activity(
@@ -23,32 +43,19 @@ async def parse_document_activity(
 ) -> Dict[str, Any]:
     """Parse the document based on the detected document type."""
 
-    try:
-        doc_type = DocumentType(document_type)
-    except ValueError:
-        doc_type = DocumentType.UNKNOWN
-
+    doc_type = _DOCUMENT_TYPES.get(document_type, DocumentType.UNKNOWN)
     file_path = Path(source_path)
-    chunk_config = ChunkingConfig(
-        chunk_size_tokens=max(chunk_size, 1),
-        chunk_overlap_tokens=max(min(chunk_overlap, max(chunk_size - 1, 0)), 0),
-        merge_threshold_tokens=max(chunk_merge_threshold, 0),
-    )
-    doc_parser = DocParser(chunk_config)
-    vision_parser = VisionParser(chunking_config=chunk_config)
+    doc_parser, vision_parser = _get_parsers(chunk_size, chunk_overlap, chunk_merge_threshold)
 
     metadata = {"source_path": str(file_path), "file_name": file_path.name}
     metadata["document_type"] = doc_type.value
 
-    if doc_type is DocumentType.TEXT_PDF:
-        parsed = doc_parser.parse(file_path, metadata)
-    elif doc_type in {DocumentType.SCANNED_PDF, DocumentType.IMAGE}:
-        if vision_parser.is_available():
-            parsed = vision_parser.parse(file_path, metadata)
-        else:
-            parsed = doc_parser.parse(file_path, metadata)
-    else:
-        parsed = doc_parser.parse(file_path, metadata)
+    parser: DocParser | VisionParser = doc_parser
+    if doc_type in {DocumentType.SCANNED_PDF, DocumentType.IMAGE} and vision_parser.is_available():
+        parser = vision_parser
+
+    # Parsing reads files and calls the vision model; run it off the worker's event loop.
+    parsed = await asyncio.to_thread(parser.parse, file_path, metadata)
 
     return {
         "document_type": doc_type.value,
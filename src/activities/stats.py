@@ -2,19 +2,18 @@
 
 from __future__ import annotations
 
-from pathlib import Path
 from typing import Any, Dict
 
 from temporalio import activity
 
-from ..ingestion.vector_store import VectorStoreManager
+from ._vector_stores import collect_index_stats
 
 
 @activity.defn
-async def index_stats_activity(index_dir: str = "storage/index") -> Dict[str, Any]:
+def index_stats_activity(index_dir: str = "storage/index") -> Dict[str, Any]:
     """Return basic statistics about the backing vector store."""
 
-    stats = VectorStoreManager.get_stats(Path(index_dir))
+    stats = collect_index_stats(index_dir)
     stats["status"] = "ok"
     return stats
 
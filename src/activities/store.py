@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import asyncio
 from pathlib import Path
 from typing import Any, Dict
 
@@ -18,7 +19,7 @@ async def store_parsed_document_activity(
 ) -> Dict[str, Any]:
     """Persist parsed Markdown content to disk."""
 
-    paths = store_parsed_markdown(metadata, content, Path(parsed_dir))
+    paths = await asyncio.to_thread(store_parsed_markdown, metadata, content, Path(parsed_dir))
     markdown_path = paths["markdown_path"]
     metadata_path = paths["metadata_path"]
     return {
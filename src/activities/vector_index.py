@@ -2,13 +2,23 @@
 
 from __future__ import annotations
 
+import asyncio
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, TypedDict
 
 from temporalio import activity
 
 from ..ingestion.storage import load_parsed_markdown
-from ..ingestion.vector_store import VectorStoreManager
+from ._vector_stores import get_vector_store_manager
+
+
+class UpdateIndexResult(TypedDict):
+    """Payload returned by :func:`update_index_activity`."""
+
+    status: str
+    documents: str
+    markdown_preview: str
+    warnings: List[Any]
 
 
 @activity.defn
@@ -16,10 +26,19 @@ async def update_index_activity(
     parsed_markdown_path: str,
     index_dir: str = "storage/index",
     metadata_path: str | None = None,
-) -> Dict[str, Any]:
+) -> UpdateIndexResult:
     """Load parsed Markdown content and upsert it into the vector index."""
 
-    manager = VectorStoreManager(storage_dir=Path(index_dir))
+    # Chroma and the sidecar reads are blocking, so keep them off the worker's event loop.
+    return await asyncio.to_thread(_update_index, parsed_markdown_path, index_dir, metadata_path)
+
+
+def _update_index(
+    parsed_markdown_path: str,
+    index_dir: str,
+    metadata_path: str | None,
+) -> UpdateIndexResult:
+    manager = get_vector_store_manager(index_dir)
     parsed_payload = load_parsed_markdown(
         Path(parsed_markdown_path),
         Path(metadata_path) if metadata_path else None,
@@ -32,54 +51,40 @@ async def update_index_activity(
     markdown_body: str = content.get("markdown", "")
     warnings: List[Any] = parsed_payload.get("warnings", [])
 
-    text_blocks: List[Dict[str, Any]] = []
-    if chunks:
-        for chunk in chunks:
-            text = chunk.get("text", "")
-            if not text:
-                continue
-            chunk_metadata = {
-                **metadata,
-                "chunk_id": chunk.get("chunk_id"),
-                "chunk_index": chunk.get("chunk_index"),
-                "page_start": chunk.get("page_start"),
-                "page_end": chunk.get("page_end"),
-                "paragraph_start": chunk.get("paragraph_start"),
-                "paragraph_end": chunk.get("paragraph_end"),
-            }
-            if metadata_path:
-                chunk_metadata["parsed_metadata_path"] = metadata_path
-            text_blocks.append(
-                {
-                    "text": text,
-                    "metadata": chunk_metadata,
+    def _iter_blocks() -> Iterator[Dict[str, Any]]:
+        if chunks:
+            for chunk in chunks:
+                text = chunk.get("text", "")
+                if not text:
+                    continue
+                chunk_metadata = {
+                    **metadata,
+                    "chunk_id": chunk.get("chunk_id"),
+                    "chunk_index": chunk.get("chunk_index"),
+                    "page_start": chunk.get("page_start"),
+                    "page_end": chunk.get("page_end"),
+                    "paragraph_start": chunk.get("paragraph_start"),
+                    "paragraph_end": chunk.get("paragraph_end"),
                 }
-            )
-    else:
+                if metadata_path:
+                    chunk_metadata["parsed_metadata_path"] = metadata_path
+                yield {"text": text, "metadata": chunk_metadata}
+            return
+
         for paragraph in paragraphs:
             text = paragraph.get("text", "")
             if not text:
                 continue
-            block_metadata = {
-                **metadata,
-                "page": paragraph.get("page"),
-            }
-            text_blocks.append(
-                {
-                    "text": text,
-                    "metadata": block_metadata,
-                }
-            )
+            yield {"text": text, "metadata": {**metadata, "page": paragraph.get("page")}}
 
-    if text_blocks:
-        manager.upsert_documents(text_blocks)
+    indexed = manager.upsert_documents(_iter_blocks())
 
     return {
         "status": "indexed",
-        "documents": str(len(text_blocks)),
+        "documents": str(indexed),
         "markdown_preview": markdown_body[:500],
         "warnings": warnings,
     }
 
 
-__all__ = ["update_index_activity"]
+__all__ = ["UpdateIndexResult", "update_index_activity"]
@@ -1,6 +1,6 @@
 """LangGraph-backed ask agent."""
 
-from .graph import LangGraphAskAgent, OllamaResponder
+from .graph import LangGraphAskAgent, OllamaResponder, warm_ollama_model
 from .state import (
     AskAgentConfig,
     AskAgentState,
@@ -19,4 +19,5 @@ __all__ = [
     "OllamaResponder",
     "ReasoningStep",
     "RetrievedDocument",
+    "warm_ollama_model",
 ]
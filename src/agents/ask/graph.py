@@ -3,72 +3,105 @@
 from __future__ import annotations
 
 import logging
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Callable, Dict, List, Optional, cast
 
+import httpx
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_ollama import ChatOllama
 from langgraph.graph import END, START, StateGraph
 
-from src.ingestion.vector_store import VectorStoreManager
+from src.ingestion.vector_store import RETRIEVAL_CACHE_SIZE, VectorStoreManager
 
 from .nodes import (
     NodeDependencies,
-    build_answer_grader,
-    build_document_grader,
     build_query_rewriter,
     build_question_analyzer,
-    build_reasoner,
     build_response_generator,
-    build_retriever,
+    build_retrieve_and_grade,
 )
 from .state import AskAgentConfig, AskAgentState, AskGraphState
 
 logger = logging.getLogger(__name__)
 
 
+SYSTEM_PROMPT = (
+    "You are the RAG0 local assistant. "
+    "Answer with concise paragraphs and cite supporting chunks using [n] "
+    "where n references the numbered context blocks."
+)
+
+# Upper bound for both the cached LangChain chains and the compiled graphs.
+CACHE_SIZE = 8
+# How long Ollama keeps a warmed model resident; loading weights can take a while.
+WARMUP_KEEP_ALIVE = "30m"
+WARMUP_TIMEOUT_SECONDS = 120.0
+
+StepCallback = Callable[[str, AskAgentState], None]
+
+_DEFAULT_CONFIG = AskAgentConfig()
+
+
+@dataclass
+class _RunScope:
+    """Per-run resources that must not outlive a single ``LangGraphAskAgent.run``."""
+
+    on_step: Optional[StepCallback] = None
+    vector_managers: Dict[str, VectorStoreManager] = field(default_factory=dict)
+
+
+_RUN_SCOPE: ContextVar[Optional[_RunScope]] = ContextVar("ask_agent_run_scope", default=None)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _build_chain(model: str, base_url: str, temperature: float) -> Any:
+    """Build the prompt | llm | parser chain once per model settings."""
+
+    prompt = ChatPromptTemplate.from_messages(
+        [
+            ("system", SYSTEM_PROMPT),
+            MessagesPlaceholder("history"),
+            (
+                "human",
+                "Question: {question}\nContext:\n{context}\nInstructions: {instructions}",
+            ),
+        ]
+    )
+    llm = ChatOllama(model=model, base_url=base_url, temperature=temperature)
+    return prompt | llm | StrOutputParser()
+
+
+async def warm_ollama_model(model: str, base_url: str, keep_alive: str = WARMUP_KEEP_ALIVE) -> bool:
+    """Ask Ollama to load ``model`` so the first question does not pay the load cost."""
+
+    payload = {"model": model, "prompt": "", "keep_alive": keep_alive, "options": {"num_predict": 0}}
+    try:
+        async with httpx.AsyncClient(base_url=base_url, timeout=WARMUP_TIMEOUT_SECONDS) as client:
+            response = await client.post("/api/generate", json=payload)
+            response.raise_for_status()
+    except httpx.HTTPError as exc:
+        logger.warning("Ollama warmup for %s failed: %s", model, exc)
+        return False
+    logger.info("Ollama model %s warmed up", model)
+    return True
+
+
 class OllamaResponder:
     """Wrapper around a LangChain Ollama chat model with graceful fallback."""
 
     def __init__(self, config: AskAgentConfig) -> None:
         self._config = config
-        self._chain: Optional[Any] = None
-        self._setup_chain()
-
-    def _setup_chain(self) -> None:
-        try:
-            from langchain_core.output_parsers import StrOutputParser
-            from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-            from langchain_ollama import ChatOllama
-        except ImportError:
-            logger.debug("LangChain modules not available; using fallback responder.")
-            return
-
-        system_prompt = (
-            "You are the RAG0 local assistant. "
-            "Answer with concise paragraphs and cite supporting chunks using [n] "
-            "where n references the numbered context blocks."
-        )
-        prompt = ChatPromptTemplate.from_messages(
-            [
-                ("system", system_prompt),
-                MessagesPlaceholder("history"),
-                (
-                    "human",
-                    "Question: {question}\nContext:\n{context}\nInstructions: {instructions}",
-                ),
-            ]
-        )
-        llm = ChatOllama(
-            model=self._config.ollama_model,
-            base_url=self._config.ollama_base_url,
-            temperature=self._config.temperature,
+        self._chain = _build_chain(
+            config.ollama_model,
+            config.ollama_base_url,
+            config.temperature,
         )
-        parser = StrOutputParser()
-        self._chain = prompt | llm | parser
 
     def __call__(self, state: AskAgentState, context: str) -> str:
-        if self._chain is None:
-            return self._fallback_response(state, context)
-
         history = [{"role": turn.role, "content": turn.content} for turn in state.conversation]
         instructions = "Use numbered citations and keep answers under 200 words."
         if state.reflection_notes:
@@ -125,7 +158,19 @@ class OllamaResponder:
 
 def _default_vector_store_factory(config: AskAgentConfig) -> VectorStoreManager:
     storage_dir = Path(config.index_dir)
-    return VectorStoreManager(storage_dir=storage_dir, collection_name="rag0")
+    # Reflection passes re-issue the original question; the cache skips repeat searches.
+    return VectorStoreManager(
+        storage_dir=storage_dir,
+        collection_name="rag0",
+        retrieval_cache_size=RETRIEVAL_CACHE_SIZE if config.enable_retrieval_cache else 0,
+        mmr_lambda=config.mmr_lambda,
+    )
+
+
+def _dispatch_step(label: str, agent_state: AskAgentState) -> None:
+    scope = _RUN_SCOPE.get()
+    if scope is not None and scope.on_step is not None:
+        scope.on_step(label, agent_state)
 
 
 class LangGraphAskAgent:
@@ -138,58 +183,65 @@ class LangGraphAskAgent:
     ) -> None:
         self._vector_store_factory = vector_store_factory
         self._responder_factory = responder_factory
+        # Compiled graphs are keyed by the JSON form of their AskAgentConfig.
+        self._compiled_graph = lru_cache(maxsize=CACHE_SIZE)(self._build_graph_from_key)
+
+    def _scoped_vector_store(self, config: AskAgentConfig) -> VectorStoreManager:
+        """Return the vector store for the current run, creating it on first use."""
 
-    def _build_graph(
-        self, config: AskAgentConfig, *, on_step: Optional[Callable[[str, AskAgentState], None]] = None
-    ):
-        vector_manager_cache: Dict[str, VectorStoreManager] = {}
+        scope = _RUN_SCOPE.get()
+        if scope is None:
+            return self._vector_store_factory(config)
+        manager = scope.vector_managers.get(config.index_dir)
+        if manager is None:
+            manager = self._vector_store_factory(config)
+            scope.vector_managers[config.index_dir] = manager
+        return manager
 
-        def vector_factory(cfg: AskAgentConfig) -> VectorStoreManager:
-            cache_key = cfg.index_dir
-            if cache_key not in vector_manager_cache:
-                vector_manager_cache[cache_key] = self._vector_store_factory(cfg)
-            return vector_manager_cache[cache_key]
+    def _build_graph_from_key(self, config_json: str):
+        return self._build_graph(AskAgentConfig.model_validate_json(config_json))
 
+    def _build_graph(self, config: AskAgentConfig):
         responder = self._responder_factory(config)
         deps = NodeDependencies(
-            vector_store_factory=vector_factory,
+            vector_store_factory=self._scoped_vector_store,
             llm_callable=responder,
-            on_step=on_step,
+            on_step=_dispatch_step,
+            config=config,
         )
         graph_builder = StateGraph(AskGraphState)
         graph_any = cast(Any, graph_builder)
         graph_any.add_node("analysis", build_question_analyzer(deps))
-        graph_any.add_node("retrieval", build_retriever(deps))
-        graph_any.add_node("reasoner", build_reasoner(deps))
-        graph_any.add_node("grade_answer", build_answer_grader(deps))
-        graph_any.add_node("grade_documents", build_document_grader(deps))
+        # Retrieval, drafting and grading always run back to back, so they share one node
+        # and a single graph-state round trip per reflection pass.
+        graph_any.add_node("retrieve_and_grade", build_retrieve_and_grade(deps))
         graph_any.add_node("rewrite_query", build_query_rewriter(deps))
         graph_any.add_node("response", build_response_generator(deps))
         graph_any.add_edge(START, "analysis")
-        graph_any.add_edge("analysis", "retrieval")
-        graph_any.add_edge("retrieval", "reasoner")
-        graph_any.add_edge("reasoner", "grade_answer")
-        graph_any.add_edge("grade_answer", "grade_documents")
+        graph_any.add_edge("analysis", "retrieve_and_grade")
 
         def _route(state: AskGraphState) -> str:
-            agent_state = AskAgentState.from_graph_state(state)
+            # Reads the raw graph dict: routing needs four fields, not a rebuilt AskAgentState.
+            state_config = state.get("config") or {}
+            reflection_enabled = state_config.get("reflection_enabled", _DEFAULT_CONFIG.reflection_enabled)
+            max_reflections = state_config.get("max_reflections", _DEFAULT_CONFIG.max_reflections)
             if (
-                not agent_state.config.reflection_enabled
-                or agent_state.reflection_count >= agent_state.config.max_reflections
-                or not (agent_state.needs_more_context or agent_state.needs_answer_revision)
+                not reflection_enabled
+                or state.get("reflection_count", 0) >= max_reflections
+                or not (state.get("needs_more_context") or state.get("needs_answer_revision"))
             ):
                 return "response"
             return "rewrite_query"
 
         graph_any.add_conditional_edges(
-            "grade_documents",
+            "retrieve_and_grade",
             _route,
             {
                 "rewrite_query": "rewrite_query",
                 "response": "response",
             },
         )
-        graph_any.add_edge("rewrite_query", "retrieval")
+        graph_any.add_edge("rewrite_query", "retrieve_and_grade")
         graph_any.add_edge("response", END)
         return graph_builder.compile()
 
@@ -197,11 +249,15 @@ class LangGraphAskAgent:
         self,
         question: str,
         config: Optional[AskAgentConfig] = None,
-        on_step: Optional[Callable[[str, AskAgentState], None]] = None,
+        on_step: Optional[StepCallback] = None,
     ) -> AskAgentState:
         agent_config = config or AskAgentConfig()
         initial_state = AskAgentState(question=question, config=agent_config)
 
-        graph = self._build_graph(agent_config, on_step=on_step)
-        result_state = graph.invoke(initial_state.to_graph_state())
+        graph = self._compiled_graph(agent_config.model_dump_json())
+        token = _RUN_SCOPE.set(_RunScope(on_step=on_step))
+        try:
+            result_state = graph.invoke(initial_state.to_graph_state())
+        finally:
+            _RUN_SCOPE.reset(token)
         return AskAgentState.from_graph_state(result_state)
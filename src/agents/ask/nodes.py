@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 import re
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Callable, List, Optional, Set
 
 from src.ingestion.vector_store import VectorStoreManager
@@ -20,9 +20,20 @@ from .state import (
 MAX_CONTEXT_CHARS = 1200
 MIN_CONTEXT_RESULTS = 2
 
+_CITATION_RE = re.compile(r"\[(\d+)\]")
+_SPLIT_RE = re.compile(r"[?!.]")
+_WS_RE = re.compile(r"\s+")
+_TOKEN_RE = re.compile(r"\S+")
+
 
 def _normalize_question(text: str) -> str:
-    return " ".join(text.strip().split())
+    return _WS_RE.sub(" ", text).strip()
+
+
+def _count_tokens(text: str) -> int:
+    """Count whitespace-separated tokens without building the word list."""
+
+    return sum(1 for _ in _TOKEN_RE.finditer(text))
 
 
 def _generate_subquestions(question: str, max_subquestions: int) -> List[str]:
@@ -32,21 +43,15 @@ def _generate_subquestions(question: str, max_subquestions: int) -> List[str]:
     if not question:
         return []
 
-    candidates = [_normalize_question(segment) for segment in re.split(r"[?!.]", question) if segment.strip()]
-    if not candidates:
-        return [question]
-
     refined: List[str] = []
-    for item in candidates:
-        if not item.endswith("?"):
-            refined.append(f"{item}?")
-        else:
-            refined.append(item)
+    for segment in _SPLIT_RE.split(question):
+        item = _normalize_question(segment)
+        if not item:
+            continue
+        refined.append(item if item.endswith("?") else f"{item}?")
         if len(refined) >= max_subquestions:
             break
-    if not refined:
-        refined.append(question if question.endswith("?") else f"{question}?")
-    return refined
+    return refined or [question]
 
 
 @dataclass
@@ -56,16 +61,37 @@ class NodeDependencies:
     vector_store_factory: Callable[[AskAgentConfig], VectorStoreManager]
     llm_callable: Callable[[AskAgentState, str], str]
     on_step: Optional[Callable[[str, AskAgentState], None]] = None
+    # Config the graph was compiled for; nodes reuse it instead of rebuilding it from the state.
+    config: Optional[AskAgentConfig] = None
+    # Resolved once so nodes call it unconditionally instead of checking ``on_step`` each time.
+    notify: Callable[[str, AskAgentState], None] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.notify = self.on_step if self.on_step is not None else _ignore_step
+
+
+def _ignore_step(label: str, agent_state: AskAgentState) -> None:
+    return None
+
 
+AgentStep = Callable[[NodeDependencies, AskAgentState], None]
 
-def _notify_step(deps: NodeDependencies, label: str, agent_state: AskAgentState) -> None:
-    if deps.on_step is not None:
-        deps.on_step(label, agent_state)
+
+def _as_node(deps: NodeDependencies, *steps: AgentStep) -> Callable[[AskGraphState], AskGraphState]:
+    """Run ``steps`` in order on one ``AskAgentState``, converting to and from graph state once."""
+
+    def _node(state: AskGraphState) -> AskGraphState:
+        agent_state = AskAgentState.from_graph_state(state, deps.config)
+        for step in steps:
+            step(deps, agent_state)
+        return agent_state.to_graph_state()
+
+    return _node
 
 
 def build_question_analyzer(deps: NodeDependencies) -> Callable[[AskGraphState], AskGraphState]:
     def _node(state: AskGraphState) -> AskGraphState:
-        agent_state = AskAgentState.from_graph_state(state)
+        agent_state = AskAgentState.from_graph_state(state, deps.config)
         question = _normalize_question(agent_state.question)
         agent_state.question = question
 
@@ -81,187 +107,193 @@ def build_question_analyzer(deps: NodeDependencies) -> Callable[[AskGraphState],
                 metadata={"sub_questions": subquestions},
             )
         )
-        _notify_step(deps, "analysis", agent_state)
+        deps.notify("analysis", agent_state)
         return agent_state.to_graph_state()
 
     return _node
 
 
-def build_retriever(deps: NodeDependencies) -> Callable[[AskGraphState], AskGraphState]:
-    def _node(state: AskGraphState) -> AskGraphState:
-        agent_state = AskAgentState.from_graph_state(state)
-        manager = deps.vector_store_factory(agent_state.config)
-        prompts = agent_state.sub_questions or [agent_state.question]
-        try:
-            retrieved = manager.multi_query(
-                prompts,
-                top_k=agent_state.config.top_k,
-                deduplicate=True,
-                neighbor_span=max(agent_state.config.neighbor_span, 0),
-                dedupe_fields=agent_state.config.dedupe_fields,
-            )
-        except Exception as exc:  # pragma: no cover - defensive against backend failure
-            agent_state.error = str(exc)
-            agent_state.reasoning.append(
-                ReasoningStep(
-                    label="retrieval_error",
-                    detail="Vector store query failed.",
-                    metadata={"exception": str(exc)},
-                )
-            )
-            return agent_state.to_graph_state()
-
-        reranked = VectorStoreManager.rerank_documents(
-            retrieved,
-            max_per_source=max(agent_state.config.neighbor_span + 1, 2),
+def _trim_context(text: str) -> str:
+    """Cap ``text`` at ``MAX_CONTEXT_CHARS``, ending truncated text with an ellipsis."""
+
+    if len(text) <= MAX_CONTEXT_CHARS:
+        return text
+    # Walk back over trailing whitespace in the window so only one slice is allocated.
+    end = MAX_CONTEXT_CHARS
+    while end > 0 and text[end - 1].isspace():
+        end -= 1
+    return text[:end] + "..."
+
+
+def _unique_source_count(agent_state: AskAgentState) -> int:
+    """Count distinct sources in the retrieved documents, reusing the count within a node."""
+
+    documents = agent_state.retrieved_documents
+    cached = agent_state._source_count
+    if cached is not None and cached[0] is documents and cached[1] == len(documents):
+        return cached[2]
+    sources: Set[str] = set()
+    add = sources.add
+    for doc in documents:
+        metadata = doc.metadata
+        add(metadata.get("source_path") or metadata.get("file_name") or "unknown")
+    agent_state._source_count = (documents, len(documents), len(sources))
+    return len(sources)
+
+
+def _retrieve(deps: NodeDependencies, agent_state: AskAgentState) -> None:
+    manager = deps.vector_store_factory(agent_state.config)
+    # Reflection can repeat the original question; multi_query already embeds and searches
+    # all prompts in one batch, so duplicates would only add redundant rows.
+    prompts = list(dict.fromkeys(agent_state.sub_questions or [agent_state.question]))
+    try:
+        retrieved = manager.multi_query(
+            prompts,
+            top_k=agent_state.config.top_k,
+            deduplicate=True,
+            neighbor_span=max(agent_state.config.neighbor_span, 0),
+            dedupe_fields=agent_state.config.dedupe_fields,
         )
-        merged = VectorStoreManager.merge_adjacent_documents(reranked)
-
-        documents: List[RetrievedDocument] = []
-        for item in merged:
-            raw_text = item.get("text", "") or ""
-            trimmed = raw_text[:MAX_CONTEXT_CHARS]
-            if len(raw_text) > MAX_CONTEXT_CHARS:
-                trimmed = trimmed.rstrip() + "..."
-            documents.append(
-                RetrievedDocument(
-                    text=trimmed,
-                    score=float(item.get("score") or 0.0),
-                    metadata=item.get("metadata") or {},
-                )
-            )
-        agent_state.retrieved_documents = documents
-        unique_sources: Set[str] = {
-            doc.metadata.get("source_path") or doc.metadata.get("file_name") or "unknown" for doc in documents
-        }
+    except Exception as exc:  # pragma: no cover - defensive against backend failure
+        agent_state.error = str(exc)
         agent_state.reasoning.append(
             ReasoningStep(
-                label="retrieval",
-                detail=f"Retrieved {len(documents)} document chunk(s) for reasoning.",
-                metadata={
-                    "top_k": agent_state.config.top_k,
-                    "neighbor_span": agent_state.config.neighbor_span,
-                    "sources": len(unique_sources),
-                },
+                label="retrieval_error",
+                detail="Vector store query failed.",
+                metadata={"exception": str(exc)},
             )
         )
-        _notify_step(deps, "retrieval", agent_state)
-        return agent_state.to_graph_state()
-
-    return _node
-
-
-def build_answer_grader(deps: NodeDependencies) -> Callable[[AskGraphState], AskGraphState]:
-    def _node(state: AskGraphState) -> AskGraphState:
-        agent_state = AskAgentState.from_graph_state(state)
-        answer = (agent_state.answer or "").strip()
-        citations = set(agent_state.citations)
-
-        needs_revision = False
-        needs_context = not answer
-
-        if (
-            answer
-            and agent_state.config.min_citations > 0
-            and len(citations) < agent_state.config.min_citations
-        ):
-            needs_revision = True
-
-        agent_state.needs_more_context = agent_state.needs_more_context or needs_context
-        agent_state.needs_answer_revision = needs_revision
-        agent_state.reasoning.append(
-            ReasoningStep(
-                label="grade_answer",
-                detail="Evaluated draft answer for completeness and citations.",
-                metadata={
-                    "has_answer": bool(answer),
-                    "citation_count": len(citations),
-                    "needs_more_context": needs_context,
-                    "needs_answer_revision": needs_revision,
-                },
+        return
+
+    reranked = VectorStoreManager.rerank_documents(
+        retrieved,
+        max_per_source=max(agent_state.config.neighbor_span + 1, 2),
+    )
+    merged = VectorStoreManager.merge_adjacent_documents(reranked)
+
+    documents: List[RetrievedDocument] = []
+    for item in merged:
+        documents.append(
+            RetrievedDocument(
+                text=_trim_context(item.get("text", "") or ""),
+                score=float(item.get("score") or 0.0),
+                metadata=item.get("metadata") or {},
             )
         )
-        _notify_step(deps, "grade_answer", agent_state)
-        return agent_state.to_graph_state()
-
-    return _node
-
-
-def build_document_grader(deps: NodeDependencies) -> Callable[[AskGraphState], AskGraphState]:
-    def _node(state: AskGraphState) -> AskGraphState:
-        agent_state = AskAgentState.from_graph_state(state)
-        documents = agent_state.retrieved_documents
-        unique_sources = {
-            doc.metadata.get("source_path") or doc.metadata.get("file_name") or "unknown" for doc in documents
-        }
-
-        if len(documents) < max(MIN_CONTEXT_RESULTS, agent_state.config.min_citations):
-            agent_state.needs_more_context = True
-
-        agent_state.reasoning.append(
-            ReasoningStep(
-                label="grade_documents",
-                detail="Checked retrieved context diversity.",
-                metadata={
-                    "document_count": len(documents),
-                    "unique_sources": len(unique_sources),
-                    "needs_more_context": agent_state.needs_more_context,
-                },
-            )
+    agent_state.retrieved_documents = documents
+    agent_state.reasoning.append(
+        ReasoningStep(
+            label="retrieval",
+            detail=f"Retrieved {len(documents)} document chunk(s) for reasoning.",
+            metadata={
+                "top_k": agent_state.config.top_k,
+                "neighbor_span": agent_state.config.neighbor_span,
+                "sources": _unique_source_count(agent_state),
+            },
         )
-        _notify_step(deps, "grade_documents", agent_state)
-        return agent_state.to_graph_state()
+    )
+    deps.notify("retrieval", agent_state)
+
+
+def _grade_answer(deps: NodeDependencies, agent_state: AskAgentState) -> None:
+    answer = (agent_state.answer or "").strip()
+    # ``_extract_citations`` already de-duplicates, so the list length is the unique count.
+    citation_count = len(agent_state.citations)
+
+    needs_revision = False
+    needs_context = not answer
+
+    if (
+        answer
+        and agent_state.config.min_citations > 0
+        and citation_count < agent_state.config.min_citations
+    ):
+        needs_revision = True
+
+    agent_state.needs_more_context = agent_state.needs_more_context or needs_context
+    agent_state.needs_answer_revision = needs_revision
+    agent_state.reasoning.append(
+        ReasoningStep(
+            label="grade_answer",
+            detail="Evaluated draft answer for completeness and citations.",
+            metadata={
+                "has_answer": bool(answer),
+                "citation_count": citation_count,
+                "needs_more_context": needs_context,
+                "needs_answer_revision": needs_revision,
+            },
+        )
+    )
+    deps.notify("grade_answer", agent_state)
 
-    return _node
 
+def _grade_documents(deps: NodeDependencies, agent_state: AskAgentState) -> None:
+    documents = agent_state.retrieved_documents
 
-def build_reasoner(deps: NodeDependencies) -> Callable[[AskGraphState], AskGraphState]:
-    def _node(state: AskGraphState) -> AskGraphState:
-        agent_state = AskAgentState.from_graph_state(state)
-        context = VectorStoreManager.format_documents_for_llm(
-            [doc.model_dump() for doc in agent_state.retrieved_documents]
+    if len(documents) < max(MIN_CONTEXT_RESULTS, agent_state.config.min_citations):
+        agent_state.needs_more_context = True
+
+    agent_state.reasoning.append(
+        ReasoningStep(
+            label="grade_documents",
+            detail="Checked retrieved context diversity.",
+            metadata={
+                "document_count": len(documents),
+                "unique_sources": _unique_source_count(agent_state),
+                "needs_more_context": agent_state.needs_more_context,
+            },
         )
-        if agent_state.error:
-            return agent_state.to_graph_state()
+    )
+    deps.notify("grade_documents", agent_state)
 
-        if not context.strip():
-            agent_state.answer = "I could not locate relevant context in the vector store."
-            agent_state.reasoning.append(
-                ReasoningStep(
-                    label="reasoner",
-                    detail="No context available; returned fallback answer.",
-                    metadata={},
-                )
-            )
-            return agent_state.to_graph_state()
 
-        answer = deps.llm_callable(agent_state, context)
+def _reason(deps: NodeDependencies, agent_state: AskAgentState) -> None:
+    context = VectorStoreManager.format_documents_for_llm(agent_state.retrieved_documents)
+    if agent_state.error:
+        return
 
-        agent_state.answer = answer.strip()
+    if not context.strip():
+        agent_state.answer = "I could not locate relevant context in the vector store."
         agent_state.reasoning.append(
             ReasoningStep(
                 label="reasoner",
-                detail="Generated a draft response using the Ollama model.",
-                metadata={
-                    "context_tokens": len(context.split()),
-                    "answer_tokens": len(answer.split()),
-                },
+                detail="No context available; returned fallback answer.",
+                metadata={},
             )
         )
-        _notify_step(deps, "reasoner", agent_state)
-        return agent_state.to_graph_state()
+        return
+
+    answer = deps.llm_callable(agent_state, context)
+
+    agent_state.answer = answer.strip()
+    agent_state.reasoning.append(
+        ReasoningStep(
+            label="reasoner",
+            detail="Generated a draft response using the Ollama model.",
+            metadata={
+                "context_tokens": _count_tokens(context),
+                "answer_tokens": _count_tokens(answer),
+            },
+        )
+    )
+    deps.notify("reasoner", agent_state)
 
-    return _node
+
+def build_retrieve_and_grade(deps: NodeDependencies) -> Callable[[AskGraphState], AskGraphState]:
+    """Fuse retrieval, drafting and both graders, which always run back to back, into one node."""
+
+    return _as_node(deps, _retrieve, _reason, _grade_answer, _grade_documents)
 
 
 def _extract_citations(answer: str) -> List[str]:
-    pattern = re.compile(r"\[(\d+)\]")
-    return sorted(set(pattern.findall(answer)))
+    """Return the distinct citation markers in ``answer``, sorted."""
+
+    return sorted(set(_CITATION_RE.findall(answer)))
 
 
 def build_response_generator(deps: NodeDependencies) -> Callable[[AskGraphState], AskGraphState]:
     def _node(state: AskGraphState) -> AskGraphState:
-        agent_state = AskAgentState.from_graph_state(state)
+        agent_state = AskAgentState.from_graph_state(state, deps.config)
         answer = agent_state.answer or ""
         citations = _extract_citations(answer)
         agent_state.citations = citations
@@ -279,7 +311,7 @@ def build_response_generator(deps: NodeDependencies) -> Callable[[AskGraphState]
                 metadata={"citations": citations},
             )
         )
-        _notify_step(deps, "response", agent_state)
+        deps.notify("response", agent_state)
         return agent_state.to_graph_state()
 
     return _node
@@ -287,7 +319,7 @@ def build_response_generator(deps: NodeDependencies) -> Callable[[AskGraphState]
 
 def build_query_rewriter(deps: NodeDependencies) -> Callable[[AskGraphState], AskGraphState]:
     def _node(state: AskGraphState) -> AskGraphState:
-        agent_state = AskAgentState.from_graph_state(state)
+        agent_state = AskAgentState.from_graph_state(state, deps.config)
         if not agent_state.config.reflection_enabled:
             agent_state.needs_more_context = False
             agent_state.needs_answer_revision = False
@@ -303,7 +335,7 @@ def build_query_rewriter(deps: NodeDependencies) -> Callable[[AskGraphState], As
                     metadata={"reflection_count": agent_state.reflection_count},
                 )
             )
-            _notify_step(deps, "rewrite_query", agent_state)
+            deps.notify("rewrite_query", agent_state)
             return agent_state.to_graph_state()
 
         followups: List[str] = []
@@ -333,7 +365,7 @@ def build_query_rewriter(deps: NodeDependencies) -> Callable[[AskGraphState], As
                 },
             )
         )
-        _notify_step(deps, "rewrite_query", agent_state)
+        deps.notify("rewrite_query", agent_state)
         return agent_state.to_graph_state()
 
     return _node
@@ -1,34 +1,49 @@
-"""Pydantic models and helpers for LangGraph-based ask workflow state."""
+"""State models and helpers for the LangGraph-based ask workflow."""
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Literal, Optional, TypedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Literal, Optional, Sequence, Tuple, TypedDict
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 
-class ConversationTurn(BaseModel):
+# History records are created and serialised many times per question, so they are
+# plain slotted dataclasses rather than validated models.
+@dataclass(slots=True)
+class ConversationTurn:
     """A single conversational exchange."""
 
     role: Literal["user", "assistant", "tool"]
     content: str
-    metadata: Dict[str, Any] = Field(default_factory=dict)
+    metadata: Dict[str, Any] = field(default_factory=dict)
 
+    def to_dict(self) -> Dict[str, Any]:
+        return {"role": self.role, "content": self.content, "metadata": dict(self.metadata)}
 
-class RetrievedDocument(BaseModel):
+
+@dataclass(slots=True)
+class RetrievedDocument:
     """Representation of a retrieved vector store document."""
 
     text: str
     score: float = 0.0
-    metadata: Dict[str, Any] = Field(default_factory=dict)
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"text": self.text, "score": self.score, "metadata": dict(self.metadata)}
 
 
-class ReasoningStep(BaseModel):
+@dataclass(slots=True)
+class ReasoningStep:
     """Represents intermediate reasoning or a tool invocation."""
 
     label: str
     detail: str
-    metadata: Dict[str, Any] = Field(default_factory=dict)
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"label": self.label, "detail": self.detail, "metadata": dict(self.metadata)}
 
 
 class AskAgentConfig(BaseModel):
@@ -46,6 +61,8 @@ class AskAgentConfig(BaseModel):
     reflection_enabled: bool = True
     max_reflections: int = 2
     min_citations: int = 1
+    enable_retrieval_cache: bool = True
+    mmr_lambda: float = 0.5
 
 
 class AskAgentState(BaseModel):
@@ -65,35 +82,80 @@ class AskAgentState(BaseModel):
     reflection_notes: List[str] = Field(default_factory=list)
     config: AskAgentConfig = Field(default_factory=AskAgentConfig)
 
+    # Items rebuilt by ``from_graph_state`` paired with the dicts they came from, so
+    # ``to_graph_state`` only dumps entries added or replaced since.
+    _graph_seed: Dict[str, Tuple[List[Any], List[Dict[str, Any]]]] = PrivateAttr(default_factory=dict)
+    _config_seed: Optional[Tuple[AskAgentConfig, Dict[str, Any]]] = PrivateAttr(default=None)
+    # Distinct-source count memoised for the current ``retrieved_documents`` list object.
+    _source_count: Optional[Tuple[List[RetrievedDocument], int, int]] = PrivateAttr(default=None)
+
+    def _dump_items(self, name: str, items: Sequence[Any]) -> List[Dict[str, Any]]:
+        seed_items, seed_dicts = self._graph_seed.get(name, ([], []))
+        reused = 0
+        for item, seeded in zip(items, seed_items, strict=False):
+            if item is not seeded:
+                break
+            reused += 1
+        if reused == len(items) == len(seed_dicts):
+            return seed_dicts
+        return [*seed_dicts[:reused], *(item.to_dict() for item in items[reused:])]
+
+    def _dump_config(self) -> Dict[str, Any]:
+        if self._config_seed is not None and self._config_seed[0] is self.config:
+            return self._config_seed[1]
+        return self.config.model_dump()
+
     def to_graph_state(self) -> "AskGraphState":
-        """Return a LangGraph compatible dictionary."""
+        """Return a LangGraph compatible dictionary.
+
+        Lists are handed over rather than copied: ``from_graph_state`` copies them on the
+        way in, so a node never mutates a list still held by an earlier graph state.
+        """
 
         return {
             "question": self.question,
-            "sub_questions": list(self.sub_questions),
-            "conversation": [turn.model_dump() for turn in self.conversation],
-            "retrieved_documents": [doc.model_dump() for doc in self.retrieved_documents],
-            "reasoning": [step.model_dump() for step in self.reasoning],
+            "sub_questions": self.sub_questions,
+            "conversation": self._dump_items("conversation", self.conversation),
+            "retrieved_documents": self._dump_items("retrieved_documents", self.retrieved_documents),
+            "reasoning": self._dump_items("reasoning", self.reasoning),
             "answer": self.answer,
-            "citations": list(self.citations),
+            "citations": self.citations,
             "error": self.error,
             "reflection_count": self.reflection_count,
             "needs_more_context": self.needs_more_context,
             "needs_answer_revision": self.needs_answer_revision,
-            "reflection_notes": list(self.reflection_notes),
-            "config": self.config.model_dump(),
+            "reflection_notes": self.reflection_notes,
+            "config": self._dump_config(),
         }
 
     @classmethod
-    def from_graph_state(cls, state: "AskGraphState") -> "AskAgentState":
-        """Instantiate from a LangGraph state payload."""
-
-        return cls(
+    def from_graph_state(
+        cls, state: "AskGraphState", config: Optional[AskAgentConfig] = None
+    ) -> "AskAgentState":
+        """Instantiate from a LangGraph state payload.
+
+        The payload was produced by :meth:`to_graph_state`, so it is rebuilt with
+        ``model_construct`` instead of being validated again on every node. Graph nodes
+        pass the config their graph was compiled for, which matches the payload's config
+        and is reused instead of being reconstructed on every entry.
+        """
+
+        conversation_dicts = state.get("conversation", [])
+        document_dicts = state.get("retrieved_documents", [])
+        reasoning_dicts = state.get("reasoning", [])
+        config_dict = state.get("config", {})
+        if config is None:
+            config = AskAgentConfig.model_construct(**config_dict)
+        conversation = [ConversationTurn(**turn) for turn in conversation_dicts]
+        retrieved_documents = [RetrievedDocument(**doc) for doc in document_dicts]
+        reasoning = [ReasoningStep(**step) for step in reasoning_dicts]
+
+        agent_state = cls.model_construct(
             question=state.get("question", ""),
             sub_questions=list(state.get("sub_questions", [])),
-            conversation=[ConversationTurn(**turn) for turn in state.get("conversation", [])],
-            retrieved_documents=[RetrievedDocument(**doc) for doc in state.get("retrieved_documents", [])],
-            reasoning=[ReasoningStep(**step) for step in state.get("reasoning", [])],
+            conversation=conversation,
+            retrieved_documents=retrieved_documents,
+            reasoning=reasoning,
             answer=state.get("answer"),
             citations=list(state.get("citations", [])),
             error=state.get("error"),
@@ -101,8 +163,15 @@ class AskAgentState(BaseModel):
             needs_more_context=bool(state.get("needs_more_context", False)),
             needs_answer_revision=bool(state.get("needs_answer_revision", False)),
             reflection_notes=list(state.get("reflection_notes", [])),
-            config=AskAgentConfig(**state.get("config", {})),
+            config=config,
         )
+        agent_state._graph_seed = {
+            "conversation": (list(conversation), conversation_dicts),
+            "retrieved_documents": (list(retrieved_documents), document_dicts),
+            "reasoning": (list(reasoning), reasoning_dicts),
+        }
+        agent_state._config_seed = (config, config_dict)
+        return agent_state
 
 
 class AskGraphState(TypedDict, total=False):
@@ -2,18 +2,32 @@
 
 from __future__ import annotations
 
+import argparse
 import asyncio
-import uuid
+import random
+import re
+import secrets
+import threading
 from contextlib import nullcontext, suppress
-from typing import Callable, Dict, Optional, Tuple
+from dataclasses import dataclass, fields
+from functools import lru_cache
+from typing import Any, Callable, ContextManager, Dict, List, Optional, Tuple, cast
 
 from dotenv import load_dotenv
-from temporalio.client import Client, WorkflowHandle
+from temporalio.client import (
+    Client,
+    WorkflowHandle,
+    WorkflowUpdateFailedError,
+    WorkflowUpdateRPCTimeoutOrCancelledError,
+)
+from temporalio.service import RPCError
 
-from .config import WorkflowConfig
+from .config import DEFAULT_RESULT_TIMEOUT_SECONDS, WorkflowConfig
+from .temporal.converter import DATA_CONVERTER
 from .utils.cli import (
     DEFAULT_THEME,
     RICH_AVAILABLE,
+    Panel,
     build_main_cli_parser,
     build_response_view,
     emit_plain_result,
@@ -24,134 +38,309 @@ from .utils.cli import (
     workflow_history_url,
 )
 from .workflows import MainWorkflow
+from .workflows.main_workflow import SUBMIT_AND_WAIT_UPDATE, WAIT_STATE_CHANGE_UPDATE
+
+try:  # pragma: no cover - optional speedup, see the "speedups" extra
+    import uvloop
+except ImportError:  # pragma: no cover - the default asyncio loop is used instead
+    uvloop = cast(Any, None)
 
 load_dotenv()
 
+# libuv-backed loop for the CLI's wait/sleep cycle when uvloop is installed.
+_LOOP_FACTORY: Optional[Callable[[], asyncio.AbstractEventLoop]] = (
+    uvloop.new_event_loop if uvloop is not None else None
+)
 
-def _safe_int(value: object, default: int = 0) -> int:
-    if isinstance(value, bool):
-        return int(value)
-    if isinstance(value, (int, float)):
-        return int(value)
-    if isinstance(value, str):
-        stripped = value.strip()
-        if not stripped:
-            return default
-        try:
-            return int(stripped)
-        except ValueError:
-            return default
-    return default
 
+_CONFIG_FIELDS = tuple(config_field.name for config_field in fields(WorkflowConfig))
 
-async def _query_prompt(
-    handle: WorkflowHandle,
-    last_revision: int,
-) -> Tuple[int, Optional[str], Optional[str]]:
-    """Fetch the latest prompt payload and return revision, prompt, and error."""
 
+def _safe_int(value: object, default: int = 0) -> int:
+    # int() already accepts bools, floats and whitespace-padded digit strings.
     try:
-        payload_raw: Optional[Dict[str, object]] = await handle.query(MainWorkflow.get_next_prompt)
-    except Exception as exc:  # pragma: no cover - defensive network guard
-        return last_revision, None, f"Unable to fetch workflow prompt: {exc}"
+        return int(value)  # type: ignore[call-overload]
+    except (TypeError, ValueError, OverflowError):
+        return default
 
-    payload = payload_raw if isinstance(payload_raw, dict) else {}
-    prompt_text = str(payload.get("prompt") or "")
-    revision = _safe_int(payload.get("revision"), last_revision)
 
-    if revision <= last_revision or not prompt_text:
-        return revision, None, None
+def _payload_revision(payload: object, default: int) -> int:
+    """Return ``payload["revision"]``; the workflow always sends ints, so that is checked first."""
 
-    return revision, prompt_text, None
+    if not isinstance(payload, dict):
+        return default
+    revision = payload.get("revision")
+    if type(revision) is int:
+        return revision
+    return _safe_int(revision, default)
 
 
-async def _await_prompt(
-    handle: WorkflowHandle,
-    last_revision: int,
-    *,
-    on_prompt: Optional[Callable[[str], None]] = None,
-    on_error: Optional[Callable[[str], None]] = None,
-    timeout_seconds: Optional[float] = None,
-) -> int:
-    """Poll for a prompt refresh before prompting the user for input."""
+def _prompt_text(payload: object) -> Optional[str]:
+    prompt = payload.get("prompt") if isinstance(payload, dict) else None
+    if prompt and not isinstance(prompt, str):
+        prompt = str(prompt)
+    return prompt or None
 
-    try:
-        loop = asyncio.get_running_loop()
-    except RuntimeError:  # pragma: no cover - fallback for non-async contexts
-        loop = asyncio.new_event_loop()
 
-    deadline = loop.time() + timeout_seconds if timeout_seconds is not None else None
-    new_revision = last_revision
+# First character that can start a command: a letter, a digit or the ``/`` prefix.
+_COMMAND_START_RE = re.compile(r"[^\W_]|/")
+
+# Static prompt/error styling, built once instead of per delivered prompt.
+_PROMPT_PANEL_TITLE = "[bold magenta]Workflow[/]"
+_PROMPT_PANEL_BORDER = "magenta"
+_RICH_ERROR_PREFIX = "[bold red]Error:[/] "
+_PLAIN_ERROR_PREFIX = "[error] "
+
+POLL_MIN_DELAY_SECONDS = 0.01
+POLL_MAX_DELAY_SECONDS = 0.5
+# Longest a single wait_state_change update is held open; the workflow caps it as well.
+UPDATE_WAIT_SECONDS = 25.0
+
+
+@lru_cache(maxsize=64)
+def _progress_label(raw_label: str) -> Tuple[str, str]:
+    """Return the display text and colour for a progress label; labels repeat across runs."""
+
+    return raw_label.replace("_", " ").title(), progress_label_style(raw_label, DEFAULT_THEME)
+
+
+def _sanitize_command(raw_command: str) -> str:
+    stripped = raw_command.strip()
+    # Drop stray leading characters (e.g. terminal escape residue) before the command.
+    match = _COMMAND_START_RE.search(stripped)
+    return stripped[match.start() :] if match else stripped
+
 
-    while True:
-        revision, prompt_text, error = await _query_prompt(handle, last_revision)
+async def _read_line(reader: Callable[[str], str], prompt: str) -> str:
+    """Run a blocking ``reader(prompt)`` off the event loop.
 
-        if error and on_error:
-            on_error(error)
+    A daemon thread is used rather than ``asyncio.to_thread`` so that Ctrl+C can end
+    the session while the thread is still blocked on the terminal.
+    """
 
-        if prompt_text and on_prompt:
-            on_prompt(prompt_text)
+    loop = asyncio.get_running_loop()
+    future: asyncio.Future[str] = loop.create_future()
+
+    def _deliver(value: Optional[str], error: Optional[BaseException]) -> None:
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(value or "")
+
+    def _run() -> None:
+        try:
+            value = reader(prompt)
+        except BaseException as exc:  # EOFError and friends are re-raised in the caller
+            loop.call_soon_threadsafe(_deliver, None, exc)
+        else:
+            loop.call_soon_threadsafe(_deliver, value, None)
+
+    threading.Thread(target=_run, name="rag0-input", daemon=True).start()
+    return await future
+
+
+@dataclass
+class _PollBackoff:
+    """Exponential delay between workflow queries while the workflow state is unchanged."""
+
+    minimum: float = POLL_MIN_DELAY_SECONDS
+    maximum: float = POLL_MAX_DELAY_SECONDS
+    factor: float = 2.0
+    delay: float = POLL_MIN_DELAY_SECONDS
+
+    async def sleep(self) -> None:
+        # Jitter keeps concurrent sessions from querying the server in lockstep.
+        pause = self.delay * random.uniform(0.5, 1.0)
+        self.delay = min(self.maximum, self.delay * self.factor)
+        await asyncio.sleep(pause)
 
-        if revision > last_revision:
-            return revision
 
-        if revision > new_revision:
-            new_revision = revision
+@dataclass
+class _WaitMode:
+    """Per-session switch between blocking workflow updates and query polling."""
 
-        if deadline is not None and loop.time() >= deadline:
-            return new_revision
+    # Cleared on the first failed update, e.g. against a server with updates disabled.
+    updates: bool = True
 
-        await asyncio.sleep(0.05)
 
+# Failures that make the session fall back from workflow updates to query polling.
+_UPDATE_ERRORS = (RPCError, WorkflowUpdateFailedError, WorkflowUpdateRPCTimeoutOrCancelledError)
 
-async def _poll_for_result(
+
+@dataclass
+class _StateChange:
+    """Outcome of one wait on the workflow: whichever of the prompt and result advanced."""
+
+    prompt_revision: int
+    result_revision: int
+    prompt_advanced: bool = False
+    prompt: Optional[str] = None
+    result: Optional[Dict[str, object]] = None
+    error: Optional[str] = None
+    timed_out: bool = False
+
+
+async def _fetch_state(
     handle: WorkflowHandle,
-    last_revision: int,
-) -> Tuple[Optional[Dict[str, object]], Optional[str]]:
-    """Poll the workflow until a newer result revision is available."""
+    last_prompt_revision: int,
+    last_result_revision: int,
+    mode: Optional[_WaitMode],
+    wait_seconds: float,
+    progress_since: int = 0,
+) -> Optional[Dict[str, object]]:
+    """Fetch the prompt and last result in one call.
+
+    With updates enabled in ``mode`` the workflow holds the request until either
+    revision advances or ``wait_seconds`` pass; otherwise the state is queried.
+    """
+
+    if mode is not None and mode.updates:
+        try:
+            state_raw = await handle.execute_update(
+                WAIT_STATE_CHANGE_UPDATE,
+                args=(last_prompt_revision, last_result_revision, wait_seconds, progress_since),
+            )
+        except _UPDATE_ERRORS:
+            mode.updates = False
+        else:
+            return state_raw if isinstance(state_raw, dict) else None
+    state_raw = await handle.query(MainWorkflow.get_state, progress_since)
+    return state_raw if isinstance(state_raw, dict) else None
+
+
+def _state_change(
+    state: Optional[Dict[str, object]],
+    last_prompt_revision: int,
+    last_result_revision: int,
+) -> Optional[_StateChange]:
+    """Compare a fetched workflow state with the last seen revisions; ``None`` if nothing advanced."""
+
+    prompt_payload = state.get("prompt") if state is not None else None
+    result_payload = state.get("result") if state is not None else None
+    prompt_revision = _payload_revision(prompt_payload, last_prompt_revision)
+    result_revision = _payload_revision(result_payload, last_result_revision)
+
+    prompt_advanced = prompt_revision > last_prompt_revision
+    result_advanced = result_revision > last_result_revision
+    if not (prompt_advanced or result_advanced):
+        return None
+    return _StateChange(
+        prompt_revision=max(prompt_revision, last_prompt_revision),
+        result_revision=max(result_revision, last_result_revision),
+        prompt_advanced=prompt_advanced,
+        prompt=_prompt_text(prompt_payload) if prompt_advanced else None,
+        result=cast(Dict[str, object], result_payload) if result_advanced else None,
+    )
 
-    try:
-        loop = asyncio.get_running_loop()
-    except RuntimeError:  # pragma: no cover - fallback for non-async contexts
-        loop = asyncio.new_event_loop()
 
-    deadline = loop.time() + 30.0  # generous upper bound for long-running commands
-    while True:
+async def _submit_command(
+    handle: WorkflowHandle,
+    command: str,
+    last_prompt_revision: int,
+    last_result_revision: int,
+    mode: Optional[_WaitMode] = None,
+) -> Optional[_StateChange]:
+    """Send ``command`` to the workflow and, with updates, wait for its first state change.
+
+    Returns ``None`` when only a signal was sent, the update's outcome is unknown, or
+    nothing changed yet, leaving the caller to wait with :func:`_await_state_change`.
+    """
+
+    if mode is not None and mode.updates:
         try:
-            result_raw = await handle.query(MainWorkflow.get_last_result)
-        except Exception as exc:  # pragma: no cover - defensive network guard
-            return None, f"Unable to query workflow result: {exc}"
+            state_raw = await handle.execute_update(
+                SUBMIT_AND_WAIT_UPDATE,
+                args=(command, last_prompt_revision, last_result_revision, UPDATE_WAIT_SECONDS),
+            )
+        except RPCError:
+            # Rejected before reaching the workflow, so the signal below is not a duplicate.
+            mode.updates = False
+        except (WorkflowUpdateFailedError, WorkflowUpdateRPCTimeoutOrCancelledError):
+            # The input may already be accepted; resending it could run the command twice.
+            return None
+        else:
+            state = state_raw if isinstance(state_raw, dict) else None
+            return _state_change(state, last_prompt_revision, last_result_revision)
+    await handle.signal(MainWorkflow.submit_input, command)
+    return None
+
 
-        if isinstance(result_raw, dict):
-            revision = _safe_int(result_raw.get("revision"), last_revision)
-            if revision > last_revision:
-                return result_raw, None
+async def _await_state_change(
+    handle: WorkflowHandle,
+    last_prompt_revision: int,
+    last_result_revision: int,
+    *,
+    mode: Optional[_WaitMode] = None,
+    on_error: Optional[Callable[[str], None]] = None,
+    timeout_seconds: Optional[float] = None,
+    progress_since: int = 0,
+) -> _StateChange:
+    """Wait until the workflow publishes a newer prompt or result.
+
+    Fetch errors are passed to ``on_error`` and waiting continues; without a callback
+    the error is returned. ``timed_out`` is set when ``timeout_seconds`` pass first.
+    ``progress_since`` asks the workflow to omit ask progress events already shown.
+    """
+
+    async def _wait() -> _StateChange:
+        # Created per wait, so the polling delay starts short again after every change.
+        backoff = _PollBackoff()
+        while True:
+            try:
+                state = await _fetch_state(
+                    handle,
+                    last_prompt_revision,
+                    last_result_revision,
+                    mode,
+                    UPDATE_WAIT_SECONDS,
+                    progress_since,
+                )
+            except Exception as exc:  # pragma: no cover - defensive network guard
+                error = f"Unable to fetch workflow state: {exc}"
+                if on_error is None:
+                    return _StateChange(last_prompt_revision, last_result_revision, error=error)
+                on_error(error)
+            else:
+                change = _state_change(state, last_prompt_revision, last_result_revision)
+                if change is not None:
+                    return change
 
-        if loop.time() >= deadline:
-            return None, "Timed out waiting for workflow result."
+            if mode is None or not mode.updates:
+                await backoff.sleep()
 
-        await asyncio.sleep(0.05)
+    try:
+        return await asyncio.wait_for(_wait(), timeout=timeout_seconds)
+    except asyncio.TimeoutError:
+        return _StateChange(last_prompt_revision, last_result_revision, timed_out=True)
 
 
 async def _start_workflow(cfg: WorkflowConfig) -> Tuple[WorkflowHandle, str, Optional[str], Optional[str]]:
     """Create workflow config, start the run, and return identifiers."""
 
-    ui_url = temporal_ui_url(cfg.address, cfg.namespace)
-
-    client = await Client.connect(cfg.address, namespace=cfg.namespace)
-    workflow_config = cfg.copy()
+    # Connect in the background while the run's config, ID and links are prepared.
+    connect_task = asyncio.create_task(
+        Client.connect(cfg.address, namespace=cfg.namespace, data_converter=DATA_CONVERTER)
+    )
+    try:
+        ui_url = temporal_ui_url(cfg.address, cfg.namespace)
+        workflow_config = cfg.copy()
 
-    prefix = cfg.workflow_id_prefix_value()
-    wf_id = f"{prefix}-{uuid.uuid4().hex}"
+        prefix = cfg.workflow_id_prefix_value()
+        wf_id = f"{prefix}-{secrets.token_hex(16)}"
+        workflow_link = workflow_history_url(ui_url, wf_id) if ui_url else None
+    except BaseException:
+        connect_task.cancel()
+        raise
 
+    client = await connect_task
     handle = await client.start_workflow(
         MainWorkflow.run,
         workflow_config,
         id=wf_id,
         task_queue=cfg.task_queue,
     )
-
-    workflow_link = workflow_history_url(ui_url, wf_id) if ui_url else None
     return handle, wf_id, ui_url, workflow_link
 
 
@@ -160,6 +349,7 @@ async def _run_workflow_plain(
     wf_id: str,
     temporal_ui: Optional[str],
     workflow_link: Optional[str],
+    result_timeout_seconds: Optional[float] = DEFAULT_RESULT_TIMEOUT_SECONDS,
 ) -> None:
     """Fallback interactive loop without Rich UI enhancements."""
 
@@ -169,6 +359,8 @@ async def _run_workflow_plain(
         and getattr(console, "is_terminal", False)
         and getattr(console, "is_interactive", False)
     )
+    # Resolved once; every Rich-vs-plain branch below checks this single name.
+    rich_console = console if use_rich else None
 
     print_session_banner(
         console=console,
@@ -180,13 +372,15 @@ async def _run_workflow_plain(
 
     last_prompt_revision = 0
     last_result_revision = 0
+    wait_mode = _WaitMode()
+    # Set when a state change seen while waiting for a result already carried the next prompt.
+    prompt_ready = False
+    pending_prompt: Optional[str] = None
 
     def handle_prompt(prompt: str) -> None:
-        if use_rich and console is not None:
-            from rich.panel import Panel
-
+        if rich_console is not None:
             message = prompt.strip() or "Workflow awaiting input."
-            console.print(Panel(message, title="[bold magenta]Workflow[/]", border_style="magenta"))
+            rich_console.print(Panel(message, title=_PROMPT_PANEL_TITLE, border_style=_PROMPT_PANEL_BORDER))
         else:
             print(
                 prompt,
@@ -194,80 +388,97 @@ async def _run_workflow_plain(
                 flush=True,
             )
 
-    def handle_error(message: str) -> None:
-        if use_rich and console is not None:
-            console.print(f"[bold red]Error:[/] {message}")
+    def emit_progress(events: List[Tuple[int, str, str, str]]) -> None:
+        # One write per batch of events rather than one per event.
+        if rich_console is not None:
+            rich_console.print(
+                "\n".join(f"[bold {color}]{idx}. {label}[/] {detail}" for idx, label, color, detail in events)
+            )
         else:
-            print(f"[error] {message}")
-
-    def _sanitize_command(raw_command: str) -> str:
-        if not raw_command:
-            return ""
+            print("\n".join(f"[progress] {idx}. {label}: {detail}" for idx, label, _, detail in events))
 
-        normalized = raw_command.encode("utf-8", "ignore").decode("utf-8")
-        stripped_leading = normalized.lstrip()
-        if not stripped_leading:
-            return ""
+    def _status(message: str) -> ContextManager[Any]:
+        if rich_console is not None:
+            return rich_console.status(message, spinner="dots")
+        return nullcontext()
 
-        start_index = 0
-        for idx, char in enumerate(stripped_leading):
-            if char.isalnum() or char in {"/"}:
-                start_index = idx
-                break
-        cleaned = stripped_leading[start_index:]
-        return cleaned.rstrip()
+    def handle_error(message: str) -> None:
+        if rich_console is not None:
+            rich_console.print(_RICH_ERROR_PREFIX + message)
+        else:
+            print(_PLAIN_ERROR_PREFIX + message)
 
     try:
         while True:
-            prompt_wait = (
-                console.status("[cyan]Waiting for workflow prompt…[/]", spinner="dots")
-                if use_rich and console is not None
-                else nullcontext()
-            )
-            with prompt_wait:
-                last_prompt_revision = await _await_prompt(
-                    handle,
-                    last_prompt_revision,
-                    on_prompt=handle_prompt,
-                    on_error=handle_error,
-                )
+            with _status("[cyan]Waiting for workflow prompt…[/]"):
+                while not prompt_ready:
+                    change = await _await_state_change(
+                        handle,
+                        last_prompt_revision,
+                        last_result_revision,
+                        mode=wait_mode,
+                        on_error=handle_error,
+                    )
+                    last_prompt_revision = change.prompt_revision
+                    last_result_revision = change.result_revision
+                    prompt_ready = change.prompt_advanced
+                    pending_prompt = change.prompt
+                if pending_prompt:
+                    handle_prompt(pending_prompt)
+            prompt_ready = False
+            pending_prompt = None
 
             try:
-                if use_rich and console is not None:
-                    raw_command = console.input("[bold cyan]rag0> [/]")
+                if rich_console is not None:
+                    raw_command = await _read_line(rich_console.input, "[bold cyan]rag0> [/]")
                 else:
-                    raw_command = input("rag0> ")
+                    raw_command = await _read_line(input, "rag0> ")
             except EOFError:
-                if use_rich and console is not None:
-                    console.print("\n[bold yellow]Input closed. Exiting session.[/]")
+                if rich_console is not None:
+                    rich_console.print("\n[bold yellow]Input closed. Exiting session.[/]")
                 else:
                     print("\nInput closed. Exiting session.")
                 break
 
             sanitized_command = _sanitize_command(raw_command)
 
-            await handle.signal(MainWorkflow.submit_input, sanitized_command)
-
             if not sanitized_command.strip():
+                await handle.signal(MainWorkflow.submit_input, sanitized_command)
                 continue
 
             progress_seen = 0
             final_result: Optional[Dict[str, object]] = None
             final_error: Optional[str] = None
 
-            result_wait = (
-                console.status("[cyan]Processing command…[/]", spinner="dots")
-                if use_rich and console is not None
-                else nullcontext()
-            )
-            with result_wait as status:
+            with _status("[cyan]Processing command…[/]") as status:
+                submitted = await _submit_command(
+                    handle, sanitized_command, last_prompt_revision, last_result_revision, wait_mode
+                )
                 while True:
-                    result, error = await _poll_for_result(handle, last_result_revision)
-                    if result is None:
-                        final_error = error or "No response received from workflow."
+                    change = submitted or await _await_state_change(
+                        handle,
+                        last_prompt_revision,
+                        last_result_revision,
+                        mode=wait_mode,
+                        timeout_seconds=result_timeout_seconds,
+                        progress_since=progress_seen,
+                    )
+                    submitted = None
+                    if change.error or change.timed_out:
+                        final_error = change.error or "Timed out waiting for workflow result."
                         break
 
-                    last_result_revision = _safe_int(result.get("revision"), last_result_revision)
+                    last_prompt_revision = change.prompt_revision
+                    last_result_revision = change.result_revision
+                    if change.prompt_advanced:
+                        # The refreshed menu usually lands with the final result, so the
+                        # next prompt needs no extra round trip.
+                        prompt_ready = True
+                        pending_prompt = change.prompt
+                    result = change.result
+                    if result is None:
+                        continue
+
                     status_value = str(result.get("status") or "").lower()
                     command = str(result.get("command") or "").lower()
                     payload_obj = result.get("result")
@@ -276,31 +487,23 @@ async def _run_workflow_plain(
                     if status_value == "running" and command == "ask":
                         progress_obj = payload.get("progress") or []
                         progress = progress_obj if isinstance(progress_obj, list) else []
-                        if progress:
-                            new_events = progress[progress_seen:]
-                            if new_events:
-                                start_index = progress_seen + 1
-                                progress_seen = len(progress)
-                                if use_rich and console is not None and status is not None:
-                                    last_event = new_events[-1]
-                                    raw_label = str(last_event.get("label", "") or "step")
-                                    label_text = raw_label.replace("_", " ").title()
-                                    color = progress_label_style(raw_label, DEFAULT_THEME)
-                                    status.update(f"[cyan]Processing command…[/] [{color}]{label_text}[/]")
-                                    for idx, event in enumerate(new_events, start=start_index):
-                                        event_label_raw = str(event.get("label", "") or "step")
-                                        detail = str(event.get("detail", "")).strip() or "Step completed."
-                                        event_label = event_label_raw.replace("_", " ").title()
-                                        event_color = progress_label_style(event_label_raw, DEFAULT_THEME)
-                                        console.print(f"[bold {event_color}]{idx}. {event_label}[/] {detail}")
-                                else:
-                                    for idx, event in enumerate(new_events, start=start_index):
-                                        if not isinstance(event, dict):
-                                            continue
-                                        event_label_raw = str(event.get("label", "") or "step")
-                                        event_label = event_label_raw.replace("_", " ").title()
-                                        detail = str(event.get("detail", "")).strip() or "Step completed."
-                                        print(f"[progress] {idx}. {event_label}: {detail}")
+                        # The workflow omits events before ``progress_offset`` (those already shown).
+                        offset = _safe_int(payload.get("progress_offset"), 0)
+                        new_events = progress[max(progress_seen - offset, 0) :]
+                        start_index = progress_seen + 1
+                        progress_seen = max(progress_seen, offset + len(progress))
+                        rendered: List[Tuple[int, str, str, str]] = []
+                        for idx, event in enumerate(new_events, start=start_index):
+                            if not isinstance(event, dict):
+                                continue
+                            event_label, event_color = _progress_label(str(event.get("label", "") or "step"))
+                            detail = str(event.get("detail", "")).strip() or "Step completed."
+                            rendered.append((idx, event_label, event_color, detail))
+                        if rendered:
+                            emit_progress(rendered)
+                            if status is not None:
+                                _, label_text, color, _ = rendered[-1]
+                                status.update(f"[cyan]Processing command…[/] [{color}]{label_text}[/]")
                         continue
 
                     final_result = result
@@ -308,38 +511,44 @@ async def _run_workflow_plain(
 
             if final_result is None:
                 warning = final_error or "No response received from workflow."
-                if use_rich and console is not None:
-                    console.print(f"[bold yellow]Warning:[/] {warning}")
+                if rich_console is not None:
+                    rich_console.print(f"[bold yellow]Warning:[/] {warning}")
                 else:
                     print(f"[warn] {warning}")
                 continue
 
             result = final_result
 
-            if use_rich and console is not None:
+            if rich_console is not None:
                 view = build_response_view(result)
-                console.print(view.body)
+                rich_console.print(view.body)
                 alert = view.metadata.get("message")
                 if alert and view.status in {"warn", "error"}:
                     style = "yellow" if view.status == "warn" else "red"
-                    console.print(f"[bold {style}]{alert}[/]")
+                    rich_console.print(f"[bold {style}]{alert}[/]")
             else:
                 emit_plain_result(result)
 
             if result.get("status") == "quit":
                 break
     except KeyboardInterrupt:
-        if use_rich and console is not None:
-            console.print("\n[bold yellow]Interrupted. Exiting session.[/]")
+        if rich_console is not None:
+            rich_console.print("\n[bold yellow]Interrupted. Exiting session.[/]")
         else:
             print("\nInterrupted. Exiting session.")
 
 
+def _config_from_args(args: argparse.Namespace) -> WorkflowConfig:
+    """Build the workflow config from parsed flags, ignoring flags it has no field for."""
+
+    return WorkflowConfig(**{name: getattr(args, name) for name in _CONFIG_FIELDS if hasattr(args, name)})
+
+
 async def _run_workflow_interactive(cfg: WorkflowConfig) -> None:
     handle, wf_id, ui_url, workflow_link = await _start_workflow(cfg)
 
     try:
-        await _run_workflow_plain(handle, wf_id, ui_url, workflow_link)
+        await _run_workflow_plain(handle, wf_id, ui_url, workflow_link, cfg.result_timeout_seconds)
     finally:
         with suppress(Exception):
             await handle.result()
@@ -349,8 +558,9 @@ def main() -> None:
     parser = build_main_cli_parser()
     args = parser.parse_args()
 
-    config = WorkflowConfig(**vars(args))
-    asyncio.run(_run_workflow_interactive(config))
+    config = _config_from_args(args)
+    with asyncio.Runner(loop_factory=_LOOP_FACTORY) as runner:
+        runner.run(_run_workflow_interactive(config))
 
 
 if __name__ == "__main__":  # pragma: no cover
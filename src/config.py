@@ -3,9 +3,8 @@
 from __future__ import annotations
 
 import os
-from typing import Any, Dict, Optional
-
-from pydantic.dataclasses import dataclass
+from dataclasses import dataclass, replace
+from typing import Any, Dict, Optional, Tuple
 
 DEFAULT_PARSED_DIR = "parsed"
 DEFAULT_INDEX_DIR = "storage/index"
@@ -29,11 +28,35 @@ DEFAULT_ASK_TEMPERATURE = float(os.environ.get("RAG0_ASK_TEMPERATURE", "0.0"))
 DEFAULT_CHUNK_SIZE = int(os.environ.get("RAG0_CHUNK_SIZE", "700"))
 DEFAULT_CHUNK_OVERLAP = int(os.environ.get("RAG0_CHUNK_OVERLAP", "150"))
 DEFAULT_CHUNK_MERGE_THRESHOLD = int(os.environ.get("RAG0_CHUNK_MERGE_THRESHOLD", "60"))
+DEFAULT_RESULT_TIMEOUT_SECONDS = float(os.environ.get("RAG0_RESULT_TIMEOUT_SECONDS", "120"))
+
 
+# (activity payload key, WorkflowConfig attribute) pairs for ``to_activity_payload``.
+_ACTIVITY_PAYLOAD_FIELDS: Tuple[Tuple[str, str], ...] = (
+    ("parsed_dir", "parsed_dir"),
+    ("index_dir", "index_dir"),
+    ("ask_top_k", "ask_top_k"),
+    ("ollama_model", "ollama_model"),
+    ("ollama_base_url", "ollama_base_url"),
+    ("temperature", "ask_temperature"),
+    ("max_subquestions", "ask_max_subquestions"),
+    ("chunk_size", "chunk_size"),
+    ("chunk_overlap", "chunk_overlap"),
+    ("chunk_merge_threshold", "chunk_merge_threshold"),
+    ("neighbor_span", "ask_neighbor_span"),
+    ("reflection_enabled", "ask_reflection_enabled"),
+    ("max_reflections", "ask_max_reflections"),
+    ("min_citations", "ask_min_citations"),
+)
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class WorkflowConfig:
-    """Typed configuration for launching the interactive workflow."""
+    """Typed configuration for launching the interactive workflow.
+
+    Values come from typed CLI flags and the environment defaults above, so a plain
+    frozen dataclass is used instead of re-validating on every construction.
+    """
 
     parsed_dir: str = DEFAULT_PARSED_DIR
     index_dir: str = DEFAULT_INDEX_DIR
@@ -53,26 +76,12 @@ class WorkflowConfig:
     chunk_size: int = DEFAULT_CHUNK_SIZE
     chunk_overlap: int = DEFAULT_CHUNK_OVERLAP
     chunk_merge_threshold: int = DEFAULT_CHUNK_MERGE_THRESHOLD
+    result_timeout_seconds: float = DEFAULT_RESULT_TIMEOUT_SECONDS
 
     def to_activity_payload(self) -> Dict[str, Any]:
         """Return a dict compatible with activity execution."""
 
-        return {
-            "parsed_dir": self.parsed_dir,
-            "index_dir": self.index_dir,
-            "ask_top_k": self.ask_top_k,
-            "ollama_model": self.ollama_model,
-            "ollama_base_url": self.ollama_base_url,
-            "temperature": self.ask_temperature,
-            "max_subquestions": self.ask_max_subquestions,
-            "chunk_size": self.chunk_size,
-            "chunk_overlap": self.chunk_overlap,
-            "chunk_merge_threshold": self.chunk_merge_threshold,
-            "neighbor_span": self.ask_neighbor_span,
-            "reflection_enabled": self.ask_reflection_enabled,
-            "max_reflections": self.ask_max_reflections,
-            "min_citations": self.ask_min_citations,
-        }
+        return {key: getattr(self, attribute) for key, attribute in _ACTIVITY_PAYLOAD_FIELDS}
 
     def workflow_id_prefix_value(self) -> str:
         """Return a sanitized workflow ID prefix."""
@@ -83,6 +92,4 @@ class WorkflowConfig:
     def copy(self, **updates: Any) -> "WorkflowConfig":
         """Return a shallow copy with optional overrides."""
 
-        values = {name: getattr(self, name) for name in self.__dataclass_fields__}
-        values.update(updates)
-        return WorkflowConfig(**values)
+        return replace(self, **updates)
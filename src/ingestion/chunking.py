@@ -2,11 +2,15 @@
 
 from __future__ import annotations
 
+import re
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass
+from functools import lru_cache
+from itertools import accumulate
 from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ChunkingConfig:
     """Configuration controlling chunk size and overlap."""
 
@@ -15,75 +19,102 @@ class ChunkingConfig:
     merge_threshold_tokens: int = 60
 
     def clamp(self) -> "ChunkingConfig":
-        """Return a sanitized copy with non-negative values."""
-
-        size = max(self.chunk_size_tokens, 1)
-        overlap = min(max(self.chunk_overlap_tokens, 0), size - 1)
-        threshold = max(self.merge_threshold_tokens, 0)
-        return ChunkingConfig(
-            chunk_size_tokens=size,
-            chunk_overlap_tokens=overlap,
-            merge_threshold_tokens=threshold,
-        )
+        """Return a sanitized config with non-negative values, shared across equal inputs."""
+
+        return _clamp(self.chunk_size_tokens, self.chunk_overlap_tokens, self.merge_threshold_tokens)
+
+
+@lru_cache(maxsize=32)
+def _clamp(size: int, overlap: int, threshold: int) -> ChunkingConfig:
+    size = max(size, 1)
+    return ChunkingConfig(
+        chunk_size_tokens=size,
+        chunk_overlap_tokens=min(max(overlap, 0), size - 1),
+        merge_threshold_tokens=max(threshold, 0),
+    )
+
+
+_PARAGRAPH_SEPARATOR = "\n\n"
 
+# Runs of non-empty lines; a blank line ("\n\n") ends a paragraph.
+_PARAGRAPH_RE = re.compile(r"[^\n]+(?:\n(?!\n)[^\n]+)*")
 
-def _tokenize(text: str) -> List[str]:
-    return [token for token in text.strip().split() if token]
+
+def split_paragraphs(text: str) -> List[str]:
+    """Return the stripped, non-blank blocks of ``text`` separated by blank lines."""
+
+    return [block for block in (match.group(0).strip() for match in _PARAGRAPH_RE.finditer(text)) if block]
+
+
+def _count_tokens(text: str) -> int:
+    return len(text.split())
 
 
 def _merge_short_paragraphs(
     paragraphs: Sequence[Dict[str, Any]],
-    paragraph_tokens: Sequence[List[str]],
+    paragraph_token_counts: Sequence[int],
     threshold: int,
-) -> List[Tuple[Dict[str, Any], List[int], List[str]]]:
-    """Merge adjacent paragraphs whose token counts fall below the threshold."""
-
-    merged: List[Tuple[Dict[str, Any], List[int], List[str]]] = []
-    buffer: Optional[Dict[str, Any]] = None
+) -> List[Tuple[Dict[str, Any], List[int], int]]:
+    """Merge adjacent paragraphs whose token counts fall below the threshold.
+
+    Segment dicts carry only the fields chunking reads; tokens are tracked as counts, the only
+    thing windowing needs.
+    """
+
+    merged: List[Tuple[Dict[str, Any], List[int], int]] = []
+    texts: List[str] = []
+    page: Any = None
+    page_end: Any = None
+    # Running page range over every numeric page value in the buffer, applied on flush.
+    page_min: Optional[int] = None
+    page_max: Optional[int] = None
     buffer_indices: List[int] = []
-    buffer_tokens: List[str] = []
+    buffer_token_count = 0
 
-    for index, (paragraph, tokens) in enumerate(zip(paragraphs, paragraph_tokens, strict=False)):
+    for index, (paragraph, token_count) in enumerate(zip(paragraphs, paragraph_token_counts, strict=False)):
         text = paragraph.get("text", "").strip()
         if not text:
             continue
 
-        if buffer is None:
-            buffer = dict(paragraph)
-            buffer_indices = [index]
-            buffer_tokens = list(tokens)
-            continue
-
-        if len(buffer_tokens) < threshold and len(tokens) < threshold:
-            buffer["text"] = f"{buffer['text'].rstrip()}\n\n{text}"
-            page_candidates = [
-                int(value)
-                for value in (
-                    buffer.get("page"),
-                    buffer.get("page_end"),
-                    paragraph.get("page"),
-                    paragraph.get("page_end"),
-                )
-                if isinstance(value, (int, float))
-            ]
-            if page_candidates:
-                buffer["page"] = min(page_candidates)
-                buffer["page_end"] = max(page_candidates)
+        if texts and buffer_token_count < threshold and token_count < threshold:
+            texts.append(text)
             buffer_indices.append(index)
-            buffer_tokens.extend(tokens)
-            continue
+            buffer_token_count += token_count
+        else:
+            if texts:
+                segment = _segment_fields(texts, page, page_end, page_min, page_max)
+                merged.append((segment, buffer_indices, buffer_token_count))
+            texts = [text]
+            page = paragraph.get("page")
+            page_end = paragraph.get("page_end")
+            page_min = page_max = None
+            buffer_indices = [index]
+            buffer_token_count = token_count
 
-        merged.append((buffer, buffer_indices.copy(), list(buffer_tokens)))
-        buffer = dict(paragraph)
-        buffer_indices = [index]
-        buffer_tokens = list(tokens)
+        for value in (paragraph.get("page"), paragraph.get("page_end")):
+            if isinstance(value, (int, float)):
+                number = int(value)
+                if page_min is None or number < page_min:
+                    page_min = number
+                if page_max is None or number > page_max:
+                    page_max = number
 
-    if buffer is not None:
-        merged.append((buffer, buffer_indices.copy(), list(buffer_tokens)))
+    if texts:
+        segment = _segment_fields(texts, page, page_end, page_min, page_max)
+        merged.append((segment, buffer_indices, buffer_token_count))
 
     return merged
 
 
+def _segment_fields(
+    texts: List[str], page: Any, page_end: Any, page_min: Optional[int], page_max: Optional[int]
+) -> Dict[str, Any]:
+    # A lone paragraph keeps its own page fields; merged ones span the numeric pages they cover.
+    if len(texts) > 1 and page_min is not None:
+        page, page_end = page_min, page_max
+    return {"text": _PARAGRAPH_SEPARATOR.join(texts), "page": page, "page_end": page_end}
+
+
 def generate_chunks(
     paragraphs: Sequence[Dict[str, Any]],
     base_metadata: Dict[str, Any],
@@ -91,28 +122,38 @@ def generate_chunks(
 ) -> List[Dict[str, Any]]:
     """Return chunk dictionaries derived from paragraphs and config."""
 
+    chunks, _ = generate_chunks_with_descriptors(paragraphs, base_metadata, config)
+    return chunks
+
+
+def generate_chunks_with_descriptors(
+    paragraphs: Sequence[Dict[str, Any]],
+    base_metadata: Dict[str, Any],
+    config: Optional[ChunkingConfig] = None,
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Return chunks plus the text-free descriptors stored in document metadata."""
+
     if not paragraphs:
-        return []
+        return [], []
 
     cfg = (config or ChunkingConfig()).clamp()
-    paragraph_tokens = [_tokenize(paragraph.get("text", "")) for paragraph in paragraphs]
-    merged_segments = _merge_short_paragraphs(paragraphs, paragraph_tokens, cfg.merge_threshold_tokens)
+    token_counts = [_count_tokens(paragraph.get("text", "")) for paragraph in paragraphs]
+    merged_segments = _merge_short_paragraphs(paragraphs, token_counts, cfg.merge_threshold_tokens)
 
     segments: List[Dict[str, Any]] = []
-    for segment, indices, tokens in merged_segments:
-        text = segment.get("text", "").strip()
-        if not text:
-            continue
-        if not tokens:
-            tokens = _tokenize(text)
-        if not tokens:
+    for segment, indices, token_count in merged_segments:
+        # Merged texts are joined from stripped, non-empty paragraphs, so they need no further trim.
+        text = segment["text"]
+        if not token_count:
+            token_count = _count_tokens(text)
+        if not token_count:
             continue
         page_start = segment.get("page")
         page_end = segment.get("page_end", page_start)
         segments.append(
             {
                 "text": text,
-                "tokens": tokens,
+                "token_count": token_count,
                 "indices": indices,
                 "page_start": page_start,
                 "page_end": page_end if page_end is not None else page_start,
@@ -120,64 +161,83 @@ def generate_chunks(
         )
 
     if not segments:
-        return []
+        return [], []
 
     chunks: List[Dict[str, Any]] = []
+    descriptors: List[Dict[str, Any]] = []
     segment_count = len(segments)
+    # token_offsets[i] is the token count of segments[:i]; segments are never empty, so it strictly grows.
+    token_offsets = list(accumulate((segment["token_count"] for segment in segments), initial=0))
+    # Per-chunk metadata starts from a flat copy of this template instead of re-spreading base_metadata.
+    metadata_template = dict(base_metadata)
+    chunk_id_prefix = base_metadata.get("file_name", "document")
     start = 0
     chunk_index = 0
 
     while start < segment_count:
-        token_total = 0
-        end = start
-        included_segments: List[Dict[str, Any]] = []
-
-        while end < segment_count and (token_total < cfg.chunk_size_tokens or not included_segments):
-            segment = segments[end]
-            included_segments.append(segment)
-            token_total += len(segment["tokens"])
-            end += 1
-            if token_total >= cfg.chunk_size_tokens and end - start > 1:
-                break
-
-        text = "\n\n".join(segment["text"] for segment in included_segments).strip()
-        if not text:
-            start = max(end, start + 1)
-            continue
+        # Grow the window until it reaches the chunk size, always taking at least one segment.
+        end = min(
+            bisect_left(token_offsets, token_offsets[start] + cfg.chunk_size_tokens, lo=start + 1),
+            segment_count,
+        )
+        token_total = token_offsets[end] - token_offsets[start]
+        window = range(start, end)
+        text = _PARAGRAPH_SEPARATOR.join(segments[position]["text"] for position in window)
 
         chunk_index += 1
         ordinal = chunk_index - 1
-        chunk_id = f"{base_metadata.get('file_name', 'document')}-chunk-{chunk_index:04d}"
-        paragraph_indices = sorted({idx for segment in included_segments for idx in segment["indices"]})
-        page_values = [
-            segment["page_start"] for segment in included_segments if segment["page_start"] is not None
-        ]
-        page_values_end = [
-            segment["page_end"] for segment in included_segments if segment["page_end"] is not None
-        ]
-        page_start = page_values[0] if page_values else None
-        page_end = page_values_end[-1] if page_values_end else page_start
+        chunk_id = f"{chunk_id_prefix}-chunk-{chunk_index:04d}"
+        # Segments arrive in paragraph order with ascending, non-empty index lists.
+        paragraph_start = segments[start]["indices"][0]
+        paragraph_end = segments[end - 1]["indices"][-1]
+        page_start = next(
+            (
+                segments[position]["page_start"]
+                for position in window
+                if segments[position]["page_start"] is not None
+            ),
+            None,
+        )
+        page_end = next(
+            (
+                segments[position]["page_end"]
+                for position in reversed(window)
+                if segments[position]["page_end"] is not None
+            ),
+            page_start,
+        )
+
+        chunk_extra = metadata_template.copy()
+        chunk_extra["chunk_id"] = chunk_id
+        chunk_extra["chunk_index"] = ordinal
+        chunk_extra["page_start"] = page_start
+        chunk_extra["page_end"] = page_end
+        chunk_extra["paragraph_start"] = paragraph_start
+        chunk_extra["paragraph_end"] = paragraph_end
 
         chunk_metadata = {
             "chunk_id": chunk_id,
             "text": text,
             "token_count": token_total,
             "chunk_index": ordinal,
-            "paragraph_start": paragraph_indices[0] if paragraph_indices else None,
-            "paragraph_end": paragraph_indices[-1] if paragraph_indices else None,
+            "paragraph_start": paragraph_start,
+            "paragraph_end": paragraph_end,
             "page_start": page_start,
             "page_end": page_end,
-            "metadata": {
-                **base_metadata,
+            "metadata": chunk_extra,
+        }
+        chunks.append(chunk_metadata)
+        descriptors.append(
+            {
                 "chunk_id": chunk_id,
                 "chunk_index": ordinal,
+                "paragraph_start": paragraph_start,
+                "paragraph_end": paragraph_end,
                 "page_start": page_start,
                 "page_end": page_end,
-                "paragraph_start": paragraph_indices[0] if paragraph_indices else None,
-                "paragraph_end": paragraph_indices[-1] if paragraph_indices else None,
-            },
-        }
-        chunks.append(chunk_metadata)
+                "token_count": token_total,
+            }
+        )
 
         if end >= segment_count:
             break
@@ -186,13 +246,8 @@ def generate_chunks(
             start = end
             continue
 
-        remaining_overlap = cfg.chunk_overlap_tokens
-        back_index = end - 1
-        while back_index > start and remaining_overlap > 0:
-            remaining_overlap -= len(segments[back_index]["tokens"])
-            back_index -= 1
-        start = max(back_index + 1, 0)
-        if start >= end:
-            start = end
+        # Step back over trailing segments until they cover the overlap, keeping the window moving forward.
+        overlap_start = bisect_right(token_offsets, token_offsets[end] - cfg.chunk_overlap_tokens) - 1
+        start = min(max(overlap_start, start + 1), end)
 
-    return chunks
+    return chunks, descriptors
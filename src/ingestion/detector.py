@@ -3,71 +3,115 @@
 from __future__ import annotations
 
 import logging
+import os
+import re
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Optional, cast
+from typing import Any, Dict, Optional
 
 from .models import DocumentType
 
 logger = logging.getLogger(__name__)
 
-try:
-    import filetype
-except ImportError:  # pragma: no cover - optional dependency
-    filetype = cast(Any, None)
-
-_PdfReader: Optional[Any] = None
-try:
-    from pypdf import PdfReader as _PdfReader
-except ImportError:  # pragma: no cover - optional dependency
-    _PdfReader = None
-
-PdfReader = cast(Optional[Any], _PdfReader)
+# Detection results are keyed by path, mtime and size, so an edited file is re-read.
+PDF_TEXT_CACHE_SIZE = 128
+# Raw bytes scanned for font resources or text objects before falling back to pypdf.
+PDF_TEXT_SCAN_BYTES = 1_048_576
+
+_PDF_TEXT_MARKER_RE = re.compile(rb"/Font\s*<<|\bBT\b[\s\S]{1,2048}?\bET\b")
+
+# Fallback magic numbers matched in one pass; group names map to mimes below.
+_MAGIC_RE = re.compile(
+    rb"(?:(?P<pdf>%PDF)|(?P<png>\x89PNG\r\n\x1a\n)|(?P<jpeg>\xff\xd8\xff)|(?P<tiff>II\*\x00|MM\x00\*)"
+    rb"|(?P<bmp>BM)|(?P<gif>GIF8[79]a))"
+)
+_MAGIC_MIMES = {
+    "pdf": "application/pdf",
+    "png": "image/png",
+    "jpeg": "image/jpeg",
+    "tiff": "image/tiff",
+    "bmp": "image/bmp",
+    "gif": "image/gif",
+}
+# Long enough for the PNG signature, the longest above.
+_MAGIC_HEADER_SIZE = 8
+
+_PDF_SUFFIXES = frozenset({".pdf"})
+_IMAGE_SUFFIXES = frozenset({".png", ".jpg", ".jpeg", ".tiff", ".bmp", ".gif"})
+
+
+@lru_cache(maxsize=None)
+def _filetype_module() -> Optional[Any]:
+    # Optional dependencies are imported on first detection, not when the worker starts.
+    try:
+        import filetype
+    except ImportError:  # pragma: no cover - optional dependency
+        return None
+    return filetype
 
 
-def _detect_mime(file_path: Path) -> Optional[str]:
-    if not file_path.exists():
+@lru_cache(maxsize=None)
+def _pdf_reader_cls() -> Optional[Any]:
+    try:
+        from pypdf import PdfReader
+    except ImportError:  # pragma: no cover - optional dependency
         return None
+    return PdfReader
+
 
+def _detect_mime(file_path: str) -> Optional[str]:
+    filetype = _filetype_module()
     if filetype is not None:
         try:
-            kind = filetype.guess(str(file_path))
+            kind = filetype.guess(file_path)
             if kind and kind.mime:
                 return kind.mime.lower()
         except Exception as exc:  # pragma: no cover - defensive
             logger.debug("filetype.guess failed for %s: %s", file_path, exc)
 
-    # Fallback to simple signature checks
+    # Fallback to simple signature checks on a raw descriptor; the header is only a few bytes.
     try:
-        with file_path.open("rb") as fh:
-            header = fh.read(8)
+        fd = os.open(file_path, os.O_RDONLY)
+        try:
+            header = os.read(fd, _MAGIC_HEADER_SIZE)
+        finally:
+            os.close(fd)
     except OSError:  # pragma: no cover - defensive
         return None
 
-    if header.startswith(b"%PDF"):
-        return "application/pdf"
+    match = _MAGIC_RE.match(header)
+    if match is None or match.lastgroup is None:
+        return None
+    return _MAGIC_MIMES[match.lastgroup]
+
+
+def _pdf_has_text(file_path: str, file_stat: os.stat_result, max_pages: int = 3) -> bool:
+    return _cached_pdf_has_text(file_path, file_stat.st_mtime_ns, file_stat.st_size, max_pages)
+
 
-    signatures = {
-        b"\x89PNG\r\n\x1a\n": "image/png",
-        b"\xff\xd8\xff": "image/jpeg",
-        b"II*\x00": "image/tiff",
-        b"MM\x00*": "image/tiff",
-        b"BM": "image/bmp",
-        b"GIF87a": "image/gif",
-        b"GIF89a": "image/gif",
-    }
-    for sig, mime in signatures.items():
-        if header.startswith(sig):
-            return mime
+def _pdf_likely_has_text(file_path: str, limit: int = PDF_TEXT_SCAN_BYTES) -> bool:
+    """Return True when uncompressed font or text markers appear in the first ``limit`` bytes."""
 
-    return None
+    try:
+        with open(file_path, "rb") as fh:
+            blob = fh.read(limit)
+    except OSError:  # pragma: no cover - defensive
+        return False
+    return _PDF_TEXT_MARKER_RE.search(blob) is not None
 
 
-def _pdf_has_text(file_path: Path, max_pages: int = 3) -> bool:
+@lru_cache(maxsize=PDF_TEXT_CACHE_SIZE)
+def _cached_pdf_has_text(file_path: str, mtime_ns: int, size: int, max_pages: int) -> bool:
+    # Markers are only visible outside compressed streams, so a miss still needs the full parse.
+    if _pdf_likely_has_text(file_path):
+        return True
+
+    PdfReader = _pdf_reader_cls()
     if PdfReader is None:
         return False
 
     try:
-        reader = PdfReader(str(file_path))
+        reader = PdfReader(file_path)
     except Exception as exc:  # pragma: no cover - defensive
         logger.debug("PdfReader failed for %s: %s", file_path, exc)
         return False
@@ -87,6 +131,14 @@ def _pdf_has_text(file_path: Path, max_pages: int = 3) -> bool:
     return False
 
 
+def _classify_pdf(file_path: str, file_stat: os.stat_result) -> DocumentType:
+    if _pdf_has_text(file_path, file_stat):
+        return DocumentType.TEXT_PDF
+    if file_stat.st_size <= 0:
+        return DocumentType.UNKNOWN
+    return DocumentType.SCANNED_PDF
+
+
 def detect_document_type(file_path: Path, metadata: Dict[str, str] | None = None) -> DocumentType:
     """Detect the document type using magic bytes, mime detection, and PDF heuristics."""
 
@@ -96,27 +148,25 @@ def detect_document_type(file_path: Path, metadata: Dict[str, str] | None = None
         except ValueError:
             logger.debug("Invalid detected_type override: %s", override)
 
-    mime = _detect_mime(file_path)
-    if mime == "application/pdf":
-        if _pdf_has_text(file_path):
-            return DocumentType.TEXT_PDF
-
-        file_size = file_path.stat().st_size if file_path.exists() else 0
-        if file_size <= 0:
-            return DocumentType.UNKNOWN
-
-        return DocumentType.SCANNED_PDF
-
-    if mime and mime.startswith("image/"):
-        return DocumentType.IMAGE
+    # One stat per detection: a missing or unreadable file has no type, and the result
+    # feeds the PDF check cache key.
+    path_str = os.fspath(file_path)
+    try:
+        file_stat = os.stat(path_str)
+    except OSError:
+        return DocumentType.UNKNOWN
 
+    # Well-known suffixes are trusted; content sniffing only runs for other names.
     suffix = file_path.suffix.lower()
-    if suffix == ".pdf":
-        if _pdf_has_text(file_path):
-            return DocumentType.TEXT_PDF
-        return DocumentType.SCANNED_PDF
+    if suffix in _PDF_SUFFIXES:
+        return _classify_pdf(path_str, file_stat)
+    if suffix in _IMAGE_SUFFIXES:
+        return DocumentType.IMAGE
 
-    if suffix in {".png", ".jpg", ".jpeg", ".tiff", ".bmp", ".gif"}:
+    mime = _detect_mime(path_str)
+    if mime == "application/pdf":
+        return _classify_pdf(path_str, file_stat)
+    if mime and mime.startswith("image/"):
         return DocumentType.IMAGE
 
     return DocumentType.UNKNOWN
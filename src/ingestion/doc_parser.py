@@ -4,13 +4,14 @@ from __future__ import annotations
 
 import logging
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Dict, Optional
 
-from docling.document_converter import DocumentConverter
-
-from .chunking import ChunkingConfig, generate_chunks
+from .chunking import ChunkingConfig, generate_chunks_with_descriptors, split_paragraphs
 from .models import ParsedDocument
 
+if TYPE_CHECKING:  # pragma: no cover - Docling is imported lazily at runtime
+    from docling.document_converter import DocumentConverter
+
 logger = logging.getLogger(__name__)
 
 
@@ -18,15 +19,24 @@ class DocParser:
     """Parses documents using Docling DocumentConverter."""
 
     def __init__(self, chunking_config: Optional[ChunkingConfig] = None) -> None:
-        self._converter = DocumentConverter()
+        self._converter: Optional[DocumentConverter] = None
         self._chunking_config = chunking_config or ChunkingConfig()
 
+    def _get_converter(self) -> DocumentConverter:
+        # Docling pulls in heavy model dependencies, so it is loaded on the first parse
+        # rather than when the worker imports this module.
+        if self._converter is None:
+            from docling.document_converter import DocumentConverter
+
+            self._converter = DocumentConverter()
+        return self._converter
+
     def parse(self, file_path: Path, metadata: Dict[str, Any]) -> ParsedDocument:
         """Parse a document and return structured content."""
 
-        result = self._converter.convert(str(file_path))
+        result = self._get_converter().convert(str(file_path))
         markdown = result.document.export_to_markdown()
-        text_blocks = [segment.strip() for segment in markdown.split("\n\n") if segment.strip()]
+        text_blocks = split_paragraphs(markdown)
         paragraphs = [{"text": block} for block in text_blocks]
 
         warnings = [
@@ -41,19 +51,10 @@ class DocParser:
         if isinstance(file_name, str) and file_name.strip():
             merged_metadata.setdefault("file_name", file_name.strip())
 
-        chunks = generate_chunks(paragraphs, merged_metadata, self._chunking_config)
-        merged_metadata["chunk_descriptors"] = [
-            {
-                "chunk_id": chunk["chunk_id"],
-                "chunk_index": chunk["chunk_index"],
-                "paragraph_start": chunk["paragraph_start"],
-                "paragraph_end": chunk["paragraph_end"],
-                "page_start": chunk["page_start"],
-                "page_end": chunk["page_end"],
-                "token_count": chunk["token_count"],
-            }
-            for chunk in chunks
-        ]
+        chunks, descriptors = generate_chunks_with_descriptors(
+            paragraphs, merged_metadata, self._chunking_config
+        )
+        merged_metadata["chunk_descriptors"] = descriptors
 
         return ParsedDocument(
             metadata=merged_metadata,
@@ -3,8 +3,86 @@
 from __future__ import annotations
 
 import json
+import mmap
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, cast
+
+import orjson
+
+try:  # Optional dependency shipped with the ``speedups`` extra.
+    import msgpack
+except ImportError:  # pragma: no cover - JSON sidecars are used alone
+    msgpack = cast(Any, None)
+
+from .chunking import split_paragraphs
+
+_SIDECAR_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+STORAGE_IO_WORKERS = 4
+# Sidecars larger than this are parsed from a read-only mapping instead of a bytes copy.
+SIDECAR_MMAP_THRESHOLD_BYTES = 8 * 1024 * 1024
+
+# Reused across store calls so file writes do not pay for thread start-up.
+_IO_POOL = ThreadPoolExecutor(max_workers=STORAGE_IO_WORKERS, thread_name_prefix="rag0-storage")
+
+
+def _dump_sidecar(payload: Dict[str, Any]) -> bytes:
+    try:
+        return orjson.dumps(payload, option=_SIDECAR_OPTIONS)
+    except TypeError:
+        # Values orjson rejects (e.g. integers past 64 bits) still encode with the stdlib.
+        return json.dumps(payload, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def binary_sidecar_path(metadata_path: Path) -> Path:
+    """Return the msgpack sibling of a ``.metadata.json`` sidecar."""
+
+    return metadata_path.with_suffix(".msgpack")
+
+
+def read_metadata_sidecar(metadata_path: Path) -> Dict[str, Any]:
+    """Decode a sidecar, preferring its msgpack sibling when msgpack is installed.
+
+    Raises the JSON decoder's error when only the JSON form is available and it is malformed.
+    """
+
+    binary_path = binary_sidecar_path(metadata_path)
+    if msgpack is not None and _is_current(binary_path, metadata_path):
+        try:
+            payload = msgpack.unpackb(binary_path.read_bytes(), raw=False)
+        except (ValueError, msgpack.UnpackException):
+            payload = None
+        if isinstance(payload, dict):
+            return payload
+    return _load_json(metadata_path)
+
+
+def _load_json(path: Path) -> Any:
+    with path.open("rb") as fh:
+        if os.fstat(fh.fileno()).st_size <= SIDECAR_MMAP_THRESHOLD_BYTES:
+            return orjson.loads(fh.read())
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as view:
+            return orjson.loads(view)
+
+
+def _is_current(binary_path: Path, metadata_path: Path) -> bool:
+    # A JSON sidecar edited after the last store wins over its stale binary twin.
+    try:
+        return binary_path.stat().st_mtime_ns >= metadata_path.stat().st_mtime_ns
+    except OSError:
+        return False
+
+
+def _write_binary_sidecar(binary_path: Path, sidecar_bytes: bytes) -> None:
+    if msgpack is not None:
+        try:
+            # Pack what the JSON decodes to (string keys, encoded dates) so both forms load the same.
+            binary_path.write_bytes(msgpack.packb(orjson.loads(sidecar_bytes), use_bin_type=True))
+            return
+        except (TypeError, ValueError, OverflowError):
+            pass
+    binary_path.unlink(missing_ok=True)
 
 
 def store_parsed_markdown(
@@ -15,6 +93,7 @@ def store_parsed_markdown(
     """Store the parsed markdown content and metadata sidecar."""
 
     output_dir.mkdir(parents=True, exist_ok=True)
+    output_dir = output_dir.resolve()
 
     file_name = metadata.get("file_name", "document")
     stem = Path(file_name).stem or "document"
@@ -22,19 +101,23 @@ def store_parsed_markdown(
     metadata_path = output_dir / f"{stem}.metadata.json"
 
     markdown_body = content.get("markdown") or ""
-
-    target_path.write_text(markdown_body, encoding="utf-8")
+    # The two files are independent, so the markdown write overlaps the sidecar encode and write.
+    markdown_write = _IO_POOL.submit(target_path.write_text, markdown_body, encoding="utf-8")
 
     payload = {
         "metadata": metadata,
         "content": content,
     }
-    metadata_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
-    markdown_real = target_path.resolve()
-    metadata_real = metadata_path.resolve()
+    try:
+        sidecar_bytes = _dump_sidecar(payload)
+        metadata_path.write_bytes(sidecar_bytes)
+        # The JSON sidecar stays canonical; the msgpack twin only speeds up reloads.
+        _write_binary_sidecar(binary_sidecar_path(metadata_path), sidecar_bytes)
+    finally:
+        markdown_write.result()
     return {
-        "markdown_path": markdown_real,
-        "metadata_path": metadata_real,
+        "markdown_path": target_path,
+        "metadata_path": metadata_path,
     }
 
 
@@ -46,8 +129,8 @@ def load_parsed_markdown(markdown_path: Path, metadata_path: Path | None = None)
     sidecar_path = metadata_path or markdown_path.with_suffix(".metadata.json")
     if sidecar_path.exists():
         try:
-            sidecar_payload = json.loads(sidecar_path.read_text(encoding="utf-8"))
-        except json.JSONDecodeError:
+            sidecar_payload = read_metadata_sidecar(sidecar_path)
+        except orjson.JSONDecodeError:
             sidecar_payload = {}
     else:
         sidecar_payload = {}
@@ -56,7 +139,7 @@ def load_parsed_markdown(markdown_path: Path, metadata_path: Path | None = None)
     content = sidecar_payload.get("content")
 
     if not metadata or not content:
-        text_blocks = [segment.strip() for segment in markdown_body.split("\n\n") if segment.strip()]
+        text_blocks = split_paragraphs(markdown_body)
         paragraphs = [{"text": block} for block in text_blocks]
         metadata = metadata or {"file_name": markdown_path.stem}
         content = {
@@ -2,19 +2,30 @@
 
 from __future__ import annotations
 
+import asyncio
 import hashlib
-import json
+import heapq
 import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Sequence, Tuple, Union, cast
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple, Union, cast
 
 import chromadb
-from llama_index.core import Document, VectorStoreIndex
-from llama_index.core.schema import QueryBundle
+import httpx
+import numpy as np
+from chromadb.api import ClientAPI
+from llama_index.core import VectorStoreIndex
+from llama_index.core.schema import MetadataMode, QueryBundle, TextNode
 from llama_index.core.storage import StorageContext
+from llama_index.core.vector_stores.utils import metadata_dict_to_node, node_to_metadata_dict
 from llama_index.embeddings.ollama import OllamaEmbedding
 from llama_index.vector_stores.chroma import ChromaVectorStore
 
+from .storage import read_metadata_sidecar
+
 # Reduce verbose logs from dependencies
 logging.getLogger("httpx").setLevel(logging.WARNING)
 logging.getLogger("ollama").setLevel(logging.WARNING)
@@ -23,25 +34,106 @@ logging.getLogger("chromadb").setLevel(logging.WARNING)
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_OLLAMA_BASE_URL = "http://localhost:11434"
+EMBED_TIMEOUT_SECONDS = 60.0
+INDEX_VERSION_FILE = "index.version"
+UPSERT_BATCH_SIZE = 128
+MAX_QUERY_WORKERS = 8
+RETRIEVAL_CACHE_SIZE = 512
+# Maximal marginal relevance re-ranks an over-fetched candidate pool of this size.
+MMR_FETCH_MULTIPLIER = 5
+MMR_MAX_CANDIDATES = 40
+# Collections above this many rows are searched by the Chroma retriever instead of an
+# in-process embedding matrix, which Chroma's segment memory limit does not cover.
+EXACT_SEARCH_MAX_ROWS = 200_000
+QUERY_EMBEDDING_CACHE_SIZE = 512
+# Chroma keeps loaded segments in an LRU cache capped at this many bytes; 0 keeps every segment resident.
+# The cap covers Chroma's segments only, not the exact-search embedding matrix (see EXACT_SEARCH_MAX_ROWS).
+CHROMA_MEMORY_LIMIT_BYTES = 2 << 30
+# Metadata values Chroma stores as-is; anything else is stringified.
+_METADATA_SCALARS = (str, int, float, bool)
+_METADATA_SCALAR_TYPES = frozenset(_METADATA_SCALARS)
+
+# One Ollama embedder per (base URL, model), shared by every manager and the query embedding cache.
+_EMBEDDERS: Dict[Tuple[str, str], OllamaEmbedding] = {}
+
+
+def _embedder(base_url: str, model_name: str) -> OllamaEmbedding:
+    key = (base_url, model_name)
+    embedder = _EMBEDDERS.get(key)
+    if embedder is None:
+        embedder = _EMBEDDERS.setdefault(key, OllamaEmbedding(model_name=model_name, base_url=base_url))
+    return embedder
+
+
+def _persistent_client(path: Path, memory_limit_bytes: int = CHROMA_MEMORY_LIMIT_BYTES) -> ClientAPI:
+    """Persistent Chroma client whose segment cache is capped at ``memory_limit_bytes``.
+
+    The cap bounds Chroma's own segments; the manager's in-process embedding matrix is
+    separate and is bounded by ``EXACT_SEARCH_MAX_ROWS`` instead.
+    """
+
+    # Chroma rejects a second client for the same path with different settings, so every
+    # client in the process goes through here.
+    settings = chromadb.Settings()
+    if memory_limit_bytes > 0:
+        settings = chromadb.Settings(
+            chroma_segment_cache_policy="LRU",
+            chroma_memory_limit_bytes=memory_limit_bytes,
+        )
+    return chromadb.PersistentClient(path=str(path), settings=settings)
+
+
+@lru_cache(maxsize=QUERY_EMBEDDING_CACHE_SIZE)
+def _embed_query(base_url: str, model_name: str, prompt: str) -> Tuple[float, ...]:
+    """Query embedding for ``prompt``; repeated prompts skip the Ollama round-trip."""
+
+    return tuple(_embedder(base_url, model_name).get_query_embedding(prompt))
+
 
 class VectorStoreManager:
     """Wrapper around a ChromaDB collection using LlamaIndex."""
 
+    # In-memory copy of the collection's embeddings used for exact cosine search; reloaded
+    # lazily whenever the persisted index version changes.
+    _collection: Optional[Any] = None
+    _matrix: Optional[np.ndarray] = None
+    _matrix_ids: List[str]
+    _matrix_version = -1
+    # Per-prompt retrieval results, cleared whenever the index is rebuilt or written to.
+    _retrieval_cache_size = 0
+    _retrieval_cache: "OrderedDict[Tuple[str, int], List[Dict[str, Any]]]"
+    # 1.0 ranks purely by similarity; lower values trade relevance for diversity (MMR).
+    _mmr_lambda = 1.0
+
     def __init__(
         self,
         storage_dir: Path,
         collection_name: str = "rag0",
         reset_collection: bool = False,
         embed_model_name: str = "granite-embedding",
+        ollama_base_url: str = DEFAULT_OLLAMA_BASE_URL,
+        retrieval_cache_size: int = RETRIEVAL_CACHE_SIZE,
+        mmr_lambda: float = 1.0,
+        memory_limit_bytes: int = CHROMA_MEMORY_LIMIT_BYTES,
     ) -> None:
         self._storage_dir = storage_dir
         self._storage_dir.mkdir(parents=True, exist_ok=True)
         self._collection_name = collection_name
         self._embed_model_name = embed_model_name
-        self._client = chromadb.PersistentClient(path=str(self._storage_dir))
+        self._ollama_base_url = ollama_base_url.rstrip("/")
+        self._client = _persistent_client(self._storage_dir, memory_limit_bytes)
         self._index: Optional[VectorStoreIndex] = None
+        self._matrix = None
+        self._matrix_ids = []
+        self._matrix_version = -1
         self._embed_model: Optional[OllamaEmbedding] = None
-        self._chunk_sidecar_cache: Dict[str, List[Dict[str, Any]]] = {}
+        # Sidecar chunks per resolved path, with the mtime they were read at and a
+        # chunk_id -> position map for neighbour lookups.
+        self._chunk_sidecar_cache: Dict[str, Tuple[int, List[Dict[str, Any]], Dict[str, int]]] = {}
+        self._retrieval_cache_size = max(retrieval_cache_size, 0)
+        self._retrieval_cache = OrderedDict()
+        self._mmr_lambda = min(max(mmr_lambda, 0.0), 1.0)
 
         if reset_collection:
             self._reset_collection()
@@ -56,9 +148,12 @@ class VectorStoreManager:
 
     def _build_index(self) -> None:
         collection = self._client.get_or_create_collection(name=self._collection_name)
+        self._collection = collection
+        self._matrix = None
+        self._clear_retrieval_cache()
         chroma_vector_store = ChromaVectorStore(chroma_collection=collection)
         storage_context = StorageContext.from_defaults(vector_store=chroma_vector_store)
-        embed_model = OllamaEmbedding(model_name=self._embed_model_name)
+        embed_model = _embedder(self._ollama_base_url, self._embed_model_name)
         self._embed_model = embed_model
 
         if collection.count() > 0:
@@ -83,21 +178,258 @@ class VectorStoreManager:
     def is_available(self) -> bool:
         return self._index is not None
 
-    def upsert_documents(self, documents: List[Dict[str, Any]]) -> None:
-        if not documents or not self.is_available():
-            return
+    def upsert_documents(
+        self,
+        documents: Iterable[Dict[str, Any]],
+        batch_size: int = UPSERT_BATCH_SIZE,
+    ) -> int:
+        """Embed and insert ``documents`` in fixed-size batches; return the number inserted.
+
+        Chunks already stored for a ``source_path`` in ``documents`` are replaced rather than
+        merged. The index version counter is bumped whenever anything was inserted so answer
+        caches keyed on it are invalidated.
+        """
 
         index = self._index
         if index is None:
-            return
+            return 0
+
+        inserted = 0
+        # Sources whose previously stored chunks were already removed during this call.
+        replaced_sources: Set[str] = set()
+        iterator = iter(documents)
+        while True:
+            batch = list(islice(iterator, max(batch_size, 1)))
+            if not batch:
+                break
+            # Stable ids make re-ingesting a document overwrite its chunks; the last copy of an
+            # id within a batch wins so Chroma never sees duplicates in one call.
+            nodes_by_id: Dict[str, TextNode] = {}
+            for doc in batch:
+                if not doc.get("text"):
+                    continue
+                metadata = self._clean_metadata(doc.get("metadata", {}))
+                node_id = self._node_id(doc["text"], metadata)
+                nodes_by_id[node_id] = TextNode(id_=node_id, text=doc["text"], metadata=metadata)
+            nodes = list(nodes_by_id.values())
+            if nodes:
+                self._remove_stale_sources(nodes, replaced_sources)
+                embeddings = self._embed_prompts(
+                    [node.get_content(metadata_mode=MetadataMode.EMBED) for node in nodes]
+                )
+                if embeddings is not None and self._collection is not None:
+                    self._upsert_embedded(self._collection, nodes, embeddings)
+                else:
+                    # Nodes without an embedding are embedded by the index's embed model.
+                    index.insert_nodes(nodes)
+                inserted += len(nodes)
 
-        for doc in documents:
-            text = doc.get("text", "")
-            if not text:
+        self._matrix = None
+        self._clear_retrieval_cache()
+        if inserted:
+            self.bump_index_version(self._storage_dir)
+        return inserted
+
+    def _remove_stale_sources(self, nodes: Sequence[TextNode], replaced_sources: Set[str]) -> None:
+        """Delete stored chunks of sources seen for the first time in this upsert.
+
+        Stable ids alone would leave orphans when a re-parse yields fewer chunks than before.
+        """
+
+        collection = self._collection
+        if collection is None:
+            return
+        for node in nodes:
+            source = node.metadata.get("source_path")
+            if not source or source in replaced_sources:
                 continue
-            metadata = self._clean_metadata(doc.get("metadata", {}))
-            li_doc = Document(text=text, metadata=metadata)
-            index.insert(li_doc)
+            replaced_sources.add(source)
+            collection.delete(where={"source_path": source})
+
+    @staticmethod
+    def _node_id(text: str, metadata: Dict[str, Any]) -> str:
+        """Deterministic node id from the chunk's source and chunk id, or its text when it has none."""
+
+        source = metadata.get("source_path") or metadata.get("file_name") or "unknown"
+        key = metadata.get("chunk_id") or text
+        return hashlib.sha1(f"{source}:{key}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _upsert_embedded(collection: Any, nodes: Sequence[TextNode], embeddings: np.ndarray) -> None:
+        """Write embedded nodes to Chroma in one upsert, laid out as LlamaIndex's Chroma store does."""
+
+        metadatas = []
+        for node in nodes:
+            metadata = node_to_metadata_dict(node, remove_text=True, flat_metadata=True)
+            metadatas.append({key: "" if value is None else value for key, value in metadata.items()})
+        collection.upsert(
+            ids=[node.node_id for node in nodes],
+            embeddings=embeddings.tolist(),
+            documents=[node.get_content(metadata_mode=MetadataMode.NONE) for node in nodes],
+            metadatas=metadatas,
+        )
+
+    def batch_embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Embed ``texts`` with a single call to Ollama's batched ``/api/embed`` endpoint."""
+
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+
+        response = httpx.post(
+            f"{self._ollama_base_url}/api/embed",
+            json={"model": self._embed_model_name, "input": list(texts)},
+            timeout=EMBED_TIMEOUT_SECONDS,
+        )
+        response.raise_for_status()
+        embeddings = np.asarray(response.json()["embeddings"], dtype=np.float32)
+        if embeddings.ndim != 2 or embeddings.shape[0] != len(texts):
+            raise ValueError(f"Expected {len(texts)} embeddings, received shape {embeddings.shape}")
+        return embeddings
+
+    def _embed_prompts(self, prompts: Sequence[str]) -> Optional[np.ndarray]:
+        if self._embed_model is None or not prompts:
+            return None
+        try:
+            return self.batch_embed(prompts)
+        except Exception as exc:  # pragma: no cover - embedding failures should not break flow
+            logger.warning("Batch embedding failed; embedding prompts one at a time: %s", exc)
+            return None
+
+    def _embedding_matrix(self) -> Optional[np.ndarray]:
+        """Return the row-normalized ``(N, D)`` embedding matrix of the collection.
+
+        Only embeddings and ids are held in memory; texts and metadata are fetched per search.
+        """
+
+        collection = self._collection
+        if collection is None:
+            return None
+        version = self.read_index_version(self._storage_dir)
+        if self._matrix is not None and self._matrix_version == version:
+            return self._matrix
+        self._matrix = None
+        try:
+            count = collection.count()
+            if count == 0 or count > EXACT_SEARCH_MAX_ROWS:
+                return None
+            payload = collection.get(include=["embeddings"])
+        except Exception as exc:  # pragma: no cover - fall back to the Chroma retriever
+            logger.debug("Could not load embeddings for %s: %s", self._collection_name, exc)
+            return None
+
+        embeddings = payload.get("embeddings")
+        if embeddings is None or len(embeddings) == 0:
+            return None
+        matrix = np.ascontiguousarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0.0] = 1.0
+        matrix /= norms
+
+        self._matrix = matrix
+        self._matrix_ids = list(payload["ids"])
+        self._matrix_version = version
+        return matrix
+
+    def _fetch_rows(self, ids: Sequence[str]) -> Dict[str, Tuple[str, Dict[str, Any]]]:
+        """Text and node metadata for the given collection ids."""
+
+        collection = self._collection
+        if collection is None or not ids:
+            return {}
+        payload = collection.get(ids=list(ids), include=["documents", "metadatas"])
+        documents = payload.get("documents") or []
+        metadatas = payload.get("metadatas") or []
+        rows: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        for position, row_id in enumerate(payload["ids"]):
+            text = documents[position] if position < len(documents) else ""
+            raw_metadata = dict(metadatas[position] or {}) if position < len(metadatas) else {}
+            try:
+                node = metadata_dict_to_node(raw_metadata, text=text)
+                rows[row_id] = (node.get_content(), dict(node.metadata))
+            except Exception:  # pragma: no cover - entries written without LlamaIndex node content
+                rows[row_id] = (text or "", {k: v for k, v in raw_metadata.items() if not k.startswith("_")})
+        return rows
+
+    @staticmethod
+    def _top_k_indices(scores: np.ndarray, top_k: int) -> np.ndarray:
+        """Indices of the ``top_k`` highest scores, best first, without a full sort."""
+
+        if top_k >= scores.shape[0]:
+            return np.argsort(-scores)
+        candidates = np.argpartition(-scores, top_k)[:top_k]
+        return candidates[np.argsort(-scores[candidates])]
+
+    @staticmethod
+    def _mmr_select(
+        candidates: np.ndarray,
+        relevance: np.ndarray,
+        top_k: int,
+        mmr_lambda: float,
+    ) -> List[int]:
+        """Greedy maximal-marginal-relevance pick of ``top_k`` rows from normalized ``candidates``."""
+
+        count = candidates.shape[0]
+        if count == 0 or top_k <= 0:
+            return []
+        pairwise = candidates @ candidates.T
+        selected = [int(np.argmax(relevance))]
+        redundancy = pairwise[:, selected[0]].copy()
+        available = np.ones(count, dtype=bool)
+        available[selected[0]] = False
+        while len(selected) < min(top_k, count):
+            marginal = mmr_lambda * relevance - (1.0 - mmr_lambda) * redundancy
+            marginal[~available] = -np.inf
+            chosen = int(np.argmax(marginal))
+            selected.append(chosen)
+            available[chosen] = False
+            np.maximum(redundancy, pairwise[:, chosen], out=redundancy)
+        return selected
+
+    def _search_embeddings(self, queries: np.ndarray, top_k: int) -> Optional[List[List[Dict[str, Any]]]]:
+        """Cosine-search every query row against the collection with one matmul.
+
+        With ``mmr_lambda`` below 1.0 each query over-fetches candidates and keeps a diverse
+        ``top_k`` via maximal marginal relevance.
+        """
+
+        matrix = self._embedding_matrix()
+        if matrix is None or top_k <= 0 or queries.ndim != 2 or queries.shape[1] != matrix.shape[1]:
+            return None
+
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        norms[norms == 0.0] = 1.0
+        scores = matrix @ (queries / norms).T
+        use_mmr = self._mmr_lambda < 1.0
+        fetch_k = max(top_k, min(top_k * MMR_FETCH_MULTIPLIER, MMR_MAX_CANDIDATES)) if use_mmr else top_k
+
+        selections: List[np.ndarray] = []
+        for column in range(scores.shape[1]):
+            column_scores = scores[:, column]
+            rows = self._top_k_indices(column_scores, fetch_k)
+            if use_mmr and rows.shape[0] > top_k:
+                rows = rows[self._mmr_select(matrix[rows], column_scores[rows], top_k, self._mmr_lambda)]
+            selections.append(rows)
+
+        # One fetch covers the texts of every query's selection.
+        ids = self._matrix_ids
+        try:
+            fetched = self._fetch_rows(list(dict.fromkeys(ids[row] for rows in selections for row in rows)))
+        except Exception as exc:  # pragma: no cover - fall back to the Chroma retriever
+            logger.debug("Could not fetch matched rows for %s: %s", self._collection_name, exc)
+            return None
+
+        results: List[List[Dict[str, Any]]] = []
+        for column, rows in enumerate(selections):
+            column_scores = scores[:, column]
+            matches: List[Dict[str, Any]] = []
+            for row in rows:
+                found = fetched.get(ids[row])
+                if found is None:
+                    continue
+                text, metadata = found
+                matches.append({"text": text, "metadata": dict(metadata), "score": float(column_scores[row])})
+            results.append(matches)
+        return results
 
     def _create_query_bundle(self, prompt: str) -> Optional[QueryBundle]:
         if not prompt.strip():
@@ -105,11 +437,17 @@ class VectorStoreManager:
         embedding = None
         if self._embed_model is not None:
             try:
-                embedding = self._embed_model.get_query_embedding(prompt)
+                embedding = list(_embed_query(self._ollama_base_url, self._embed_model_name, prompt))
             except Exception as exc:  # pragma: no cover - embedding failures should not break flow
                 logger.warning("Falling back to raw query due to embedding error: %s", exc)
         return QueryBundle(query_str=prompt, embedding=embedding)
 
+    @classmethod
+    def clear_embedding_cache(cls) -> None:
+        """Drop cached query embeddings, e.g. after the embedding model is re-pulled."""
+
+        _embed_query.cache_clear()
+
     def _retriever_input(self, prompt: str) -> Union[str, QueryBundle]:
         bundle = self._create_query_bundle(prompt)
         if bundle is None or bundle.embedding is None:
@@ -120,7 +458,7 @@ class VectorStoreManager:
     def _dedupe_key(
         match: Dict[str, Any],
         fields: Sequence[str],
-    ) -> Tuple[str, ...]:
+    ) -> Tuple[Union[str, bytes], ...]:
         metadata = match.get("metadata", {}) or {}
         values: List[str] = []
         for field in fields:
@@ -132,29 +470,40 @@ class VectorStoreManager:
             return tuple(values)
 
         source = metadata.get("source_path") or metadata.get("file_name") or "unknown"
-        text = match.get("text", "")
-        digest = hashlib.sha1(f"{source}:{text}".encode("utf-8")).hexdigest()
+        # Source is already part of the key, so only the text is hashed; a bytes digest never
+        # compares equal to the string values of a field-based key.
+        digest = hashlib.blake2b(match.get("text", "").encode("utf-8"), digest_size=16).digest()
         return (source, digest)
 
-    def _load_chunk_sidecar(self, metadata_path: str) -> List[Dict[str, Any]]:
+    def _load_chunk_sidecar(self, metadata_path: str) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
         if not metadata_path:
-            return []
+            return [], {}
         path = Path(metadata_path)
-        if not path.exists():
-            return []
+        try:
+            mtime_ns = path.stat().st_mtime_ns
+        except OSError:
+            return [], {}
         key = str(path.resolve())
-        if key in self._chunk_sidecar_cache:
-            return self._chunk_sidecar_cache[key]
+        cached = self._chunk_sidecar_cache.get(key)
+        # Re-ingesting a document rewrites its sidecar; a changed mtime forces a reload.
+        if cached is not None and cached[0] == mtime_ns:
+            return cached[1], cached[2]
 
         try:
-            payload = json.loads(path.read_text(encoding="utf-8"))
+            payload = read_metadata_sidecar(path)
             chunks = payload.get("content", {}).get("chunks", []) or []
         except Exception as exc:  # pragma: no cover - best effort cache load
             logger.debug("Failed to load chunk metadata %s: %s", path, exc)
             chunks = []
 
-        self._chunk_sidecar_cache[key] = chunks
-        return chunks
+        positions: Dict[str, int] = {}
+        for position, chunk in enumerate(chunks):
+            chunk_id = chunk.get("chunk_id")
+            if chunk_id:
+                # Keep the first occurrence, as the previous linear scan did.
+                positions.setdefault(str(chunk_id), position)
+        self._chunk_sidecar_cache[key] = (mtime_ns, chunks, positions)
+        return chunks, positions
 
     def _expand_neighbors(
         self,
@@ -171,14 +520,18 @@ class VectorStoreManager:
             metadata_path = metadata.get("parsed_metadata_path")
             if not chunk_id or not metadata_path:
                 continue
-            chunk_list = self._load_chunk_sidecar(str(metadata_path))
-            if not chunk_list:
-                continue
-            try:
-                index = next(i for i, chunk in enumerate(chunk_list) if chunk.get("chunk_id") == chunk_id)
-            except StopIteration:
+            chunk_list, positions = self._load_chunk_sidecar(str(metadata_path))
+            index = positions.get(str(chunk_id))
+            if index is None:
                 continue
 
+            # Parent fields fill gaps in the neighbour's own metadata; chunk fields always win.
+            parent_defaults = {
+                "parsed_metadata_path": metadata_path,
+                "source_path": metadata.get("source_path"),
+                "file_name": metadata.get("file_name"),
+            }
+            score = match.get("score", 0.0)
             for offset in range(1, neighbor_span + 1):
                 for neighbor_index in (index - offset, index + offset):
                     if neighbor_index < 0 or neighbor_index >= len(chunk_list):
@@ -187,27 +540,28 @@ class VectorStoreManager:
                     text = neighbor_chunk.get("text", "")
                     if not text:
                         continue
-                    neighbor_metadata = dict(neighbor_chunk.get("metadata") or {})
-                    neighbor_metadata.setdefault("parsed_metadata_path", metadata_path)
-                    neighbor_metadata.setdefault("source_path", metadata.get("source_path"))
-                    neighbor_metadata.setdefault("file_name", metadata.get("file_name"))
-                    neighbor_metadata["chunk_id"] = neighbor_chunk.get("chunk_id")
-                    neighbor_metadata["chunk_index"] = neighbor_chunk.get("chunk_index")
-                    neighbor_metadata["page_start"] = neighbor_chunk.get("page_start")
-                    neighbor_metadata["page_end"] = neighbor_chunk.get("page_end")
-                    neighbor_metadata["paragraph_start"] = neighbor_chunk.get("paragraph_start")
-                    neighbor_metadata["paragraph_end"] = neighbor_chunk.get("paragraph_end")
+                    neighbor_metadata = {
+                        **parent_defaults,
+                        **(neighbor_chunk.get("metadata") or {}),
+                        "chunk_id": neighbor_chunk.get("chunk_id"),
+                        "chunk_index": neighbor_chunk.get("chunk_index"),
+                        "page_start": neighbor_chunk.get("page_start"),
+                        "page_end": neighbor_chunk.get("page_end"),
+                        "paragraph_start": neighbor_chunk.get("paragraph_start"),
+                        "paragraph_end": neighbor_chunk.get("paragraph_end"),
+                    }
                     expansions.append(
-                        {
-                            "text": text,
-                            "metadata": neighbor_metadata,
-                            "score": match.get("score", 0.0) + (offset * 0.001),
-                        }
+                        {"text": text, "metadata": neighbor_metadata, "score": score + (offset * 0.001)}
                     )
 
         return expansions
 
-    def query(self, prompt: str, top_k: int = 3) -> List[Dict[str, Any]]:
+    def query(
+        self,
+        prompt: str,
+        top_k: int = 3,
+        embedding: Optional[Sequence[float]] = None,
+    ) -> List[Dict[str, Any]]:
         if not prompt.strip():
             return []
 
@@ -216,7 +570,11 @@ class VectorStoreManager:
             return []
 
         retriever = index.as_retriever(similarity_top_k=top_k)
-        retriever_input = self._retriever_input(prompt)
+        retriever_input: Union[str, QueryBundle]
+        if embedding is not None:
+            retriever_input = QueryBundle(query_str=prompt, embedding=[float(value) for value in embedding])
+        else:
+            retriever_input = self._retriever_input(prompt)
         results = retriever.retrieve(retriever_input)
 
         matches: List[Dict[str, Any]] = []
@@ -233,6 +591,64 @@ class VectorStoreManager:
             )
         return matches
 
+    async def aquery(
+        self,
+        prompt: str,
+        top_k: int = 3,
+        embedding: Optional[Sequence[float]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Run :meth:`query` in a worker thread so async callers keep their event loop free."""
+
+        return await asyncio.to_thread(self.query, prompt, top_k, embedding)
+
+    def _clear_retrieval_cache(self) -> None:
+        if self._retrieval_cache_size:
+            self._retrieval_cache.clear()
+
+    @staticmethod
+    def _retrieval_cache_key(prompt: str, top_k: int) -> Tuple[str, int]:
+        # The ask agent turns "Explain X." into the sub-question "Explain X?" and later
+        # re-issues the original; trailing sentence punctuation does not change the search.
+        return " ".join(prompt.split()).rstrip("?.! "), top_k
+
+    def _cached_retrieval(self, prompt: str, top_k: int) -> Optional[List[Dict[str, Any]]]:
+        if not self._retrieval_cache_size:
+            return None
+        key = self._retrieval_cache_key(prompt, top_k)
+        matches = self._retrieval_cache.get(key)
+        if matches is None:
+            return None
+        self._retrieval_cache.move_to_end(key)
+        # multi_query mutates scores while deduplicating, so hand out copies.
+        return [dict(match) for match in matches]
+
+    def _store_retrieval(self, prompt: str, top_k: int, matches: List[Dict[str, Any]]) -> None:
+        if not self._retrieval_cache_size:
+            return
+        self._retrieval_cache[self._retrieval_cache_key(prompt, top_k)] = [dict(match) for match in matches]
+        while len(self._retrieval_cache) > self._retrieval_cache_size:
+            self._retrieval_cache.popitem(last=False)
+
+    def _query_concurrently(
+        self,
+        prompts: Sequence[str],
+        top_k: int,
+        embeddings: Optional[np.ndarray],
+        max_workers: int = MAX_QUERY_WORKERS,
+    ) -> List[List[Dict[str, Any]]]:
+        """Run :meth:`query` for each prompt on a thread pool, preserving prompt order."""
+
+        def _run(position: int) -> List[Dict[str, Any]]:
+            embedding = embeddings[position] if embeddings is not None else None
+            return self.query(prompts[position], top_k=top_k, embedding=embedding)
+
+        workers = min(len(prompts), max_workers)
+        if workers <= 1:
+            return [_run(position) for position in range(len(prompts))]
+        # Each query waits on Ollama and Chroma, so overlapping them bounds latency by the slowest.
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(_run, range(len(prompts))))
+
     def multi_query(
         self,
         prompts: Sequence[str],
@@ -240,37 +656,57 @@ class VectorStoreManager:
         deduplicate: bool = True,
         neighbor_span: int = 0,
         dedupe_fields: Optional[Sequence[str]] = None,
+        max_workers: int = MAX_QUERY_WORKERS,
+        limit: Optional[int] = None,
     ) -> List[Dict[str, Any]]:
-        """Execute multiple related queries and optionally deduplicate results."""
+        """Execute multiple related queries and optionally deduplicate results.
+
+        Prompts that miss the retrieval cache are queried on up to ``max_workers`` threads;
+        ``1`` runs them serially. ``limit`` keeps only that many best-scored results.
+        """
 
         field_order = tuple(dedupe_fields) if dedupe_fields else ("source_path", "chunk_id")
-        seen: Dict[Tuple[str, ...], Dict[str, Any]] = {}
+        seen: Dict[Tuple[Union[str, bytes], ...], Dict[str, Any]] = {}
         aggregated: List[Dict[str, Any]] = []
-        seeds: List[Dict[str, Any]] = []
 
         def _record(match: Dict[str, Any]) -> None:
-            if not deduplicate:
+            # One dict probe per match: setdefault both finds and claims the key. The size check,
+            # not identity, tells a new key apart, since cached results can repeat a match object.
+            size = len(seen)
+            existing = seen.setdefault(self._dedupe_key(match, field_order), match)
+            if len(seen) > size:
                 aggregated.append(match)
                 return
-
-            key = self._dedupe_key(match, field_order)
-            existing = seen.get(key)
-            if existing:
-                existing["score"] = min(existing.get("score", 0.0), match.get("score", 0.0))
-                return
-            seen[key] = match
-            aggregated.append(match)
-
-        for prompt in prompts:
-            for match in self.query(prompt, top_k=top_k):
-                seeds.append(match)
-                _record(match)
-
-        if neighbor_span > 0 and seeds:
-            for neighbor in self._expand_neighbors(seeds, neighbor_span):
-                _record(neighbor)
-
-        aggregated.sort(key=lambda item: item.get("score", 0.0))
+            existing["score"] = min(existing.get("score", 0.0), match.get("score", 0.0))
+
+        active_prompts = [prompt for prompt in prompts if prompt.strip()]
+        per_prompt = [self._cached_retrieval(prompt, top_k) for prompt in active_prompts]
+        missing = [position for position, matches in enumerate(per_prompt) if matches is None]
+        if missing:
+            missing_prompts = [active_prompts[position] for position in missing]
+            embeddings = self._embed_prompts(missing_prompts)
+            searched = self._search_embeddings(embeddings, top_k) if embeddings is not None else None
+            if searched is None:
+                searched = self._query_concurrently(missing_prompts, top_k, embeddings, max_workers)
+            for position, found in zip(missing, searched, strict=True):
+                self._store_retrieval(active_prompts[position], top_k, found)
+                per_prompt[position] = found
+        record: Callable[[Dict[str, Any]], None] = _record if deduplicate else aggregated.append
+        for matches in per_prompt:
+            for match in matches or []:
+                record(match)
+
+        # The recorded seeds are expanded once each, after deduplication may have lowered their
+        # scores; duplicates share their survivor's neighbours, so they are not expanded again.
+        if neighbor_span > 0 and aggregated:
+            for neighbor in self._expand_neighbors(aggregated, neighbor_span):
+                record(neighbor)
+
+        if limit is not None and 0 <= limit < len(aggregated):
+            # Same order as a full sort, truncated, without sorting the discarded tail.
+            aggregated = heapq.nsmallest(limit, aggregated, key=lambda item: item.get("score", 0.0))
+        else:
+            aggregated.sort(key=lambda item: item.get("score", 0.0))
         logger.debug(
             "multi_query completed",
             extra={
@@ -282,32 +718,41 @@ class VectorStoreManager:
         return aggregated
 
     @staticmethod
-    def format_documents_for_llm(documents: Sequence[Dict[str, Any]]) -> str:
-        """Render retrieved documents into an LLM-ready context block."""
+    def format_documents_for_llm(documents: Iterable[Any]) -> str:
+        """Render retrieved documents into an LLM-ready context block.
 
-        formatted_blocks: List[str] = []
-        for idx, doc in enumerate(documents, start=1):
-            text = doc.get("text", "").strip()
-            if not text:
-                continue
-            metadata = doc.get("metadata", {})
-            source = metadata.get("file_name") or metadata.get("source_path") or "unknown"
-            header = f"[{idx}] {source}"
-            chunk_index = metadata.get("chunk_index")
-            if isinstance(chunk_index, int):
-                header += f" [chunk {chunk_index + 1}]"
-            page_start = metadata.get("page_start")
-            page_end = metadata.get("page_end")
-            page_single = metadata.get("page")
-            if page_start is not None and page_end is not None:
-                if page_start == page_end:
-                    header += f" (page {page_start})"
-                else:
-                    header += f" (pages {page_start}-{page_end})"
-            elif page_single is not None:
-                header += f" (page {page_single})"
-            formatted_blocks.append(f"{header}\n{text}")
-        return "\n\n".join(formatted_blocks)
+        Accepts match dicts or record objects exposing ``text`` and ``metadata`` attributes,
+        so callers need not dump their documents first.
+        """
+
+        blocks = (VectorStoreManager._format_document(idx, doc) for idx, doc in enumerate(documents, start=1))
+        return "\n\n".join(block for block in blocks if block)
+
+    @staticmethod
+    def _format_document(idx: int, doc: Any) -> str:
+        """Render one document as ``header\ntext``, or ``""`` when it has no text."""
+
+        if isinstance(doc, Mapping):
+            text = (doc.get("text") or "").strip()
+            metadata = doc.get("metadata") or {}
+        else:
+            text = (getattr(doc, "text", "") or "").strip()
+            metadata = getattr(doc, "metadata", None) or {}
+        if not text:
+            return ""
+        source = metadata.get("file_name") or metadata.get("source_path") or "unknown"
+        chunk_index = metadata.get("chunk_index")
+        chunk = f" [chunk {chunk_index + 1}]" if isinstance(chunk_index, int) else ""
+        page_start = metadata.get("page_start")
+        page_end = metadata.get("page_end")
+        page_single = metadata.get("page")
+        if page_start is not None and page_end is not None:
+            pages = f" (page {page_start})" if page_start == page_end else f" (pages {page_start}-{page_end})"
+        elif page_single is not None:
+            pages = f" (page {page_single})"
+        else:
+            pages = ""
+        return f"[{idx}] {source}{chunk}{pages}\n{text}"
 
     @staticmethod
     def rerank_documents(
@@ -345,6 +790,9 @@ class VectorStoreManager:
 
         merged: List[Dict[str, Any]] = []
         current: Optional[Dict[str, Any]] = None
+        # The open run's source and last chunk index, refreshed only when a new run starts.
+        current_source: Optional[str] = None
+        current_index: Any = None
 
         def _source(meta: Dict[str, Any]) -> str:
             return meta.get("source_path") or meta.get("file_name") or "unknown"
@@ -352,22 +800,15 @@ class VectorStoreManager:
         for doc in documents:
             metadata = dict(doc.get("metadata", {}) or {})
             text = doc.get("text", "")
-            if current is None:
-                current = {"text": text, "metadata": metadata, "score": doc.get("score", 0.0)}
-                continue
-
-            current_meta = current.get("metadata", {}) or {}
-            current_index = current_meta.get("chunk_index")
+            source = _source(metadata)
             chunk_index = metadata.get("chunk_index")
-            same_source = _source(metadata) == _source(current_meta)
-            contiguous = (
-                same_source
+            if current is not None and (
+                source == current_source
                 and isinstance(current_index, int)
                 and isinstance(chunk_index, int)
                 and chunk_index == current_index + 1
-            )
-
-            if same_source and contiguous:
+            ):
+                current_meta = current["metadata"]
                 combined_text = f"{current['text'].rstrip()}\n\n{text.strip()}" if text else current["text"]
                 current["text"] = combined_text
                 current["score"] = min(current.get("score", 0.0), doc.get("score", 0.0))
@@ -375,9 +816,14 @@ class VectorStoreManager:
                 current_meta["chunk_id"] = metadata.get("chunk_id")
                 current_meta["paragraph_end"] = metadata.get("paragraph_end")
                 current_meta["page_end"] = metadata.get("page_end") or current_meta.get("page_end")
-            else:
+                current_index = chunk_index
+                continue
+
+            if current is not None:
                 merged.append(current)
-                current = {"text": text, "metadata": metadata, "score": doc.get("score", 0.0)}
+            current = {"text": text, "metadata": metadata, "score": doc.get("score", 0.0)}
+            current_source = source
+            current_index = chunk_index
 
         if current is not None:
             merged.append(current)
@@ -390,14 +836,45 @@ class VectorStoreManager:
         for key, value in metadata.items():
             if value is None:
                 continue
-            if isinstance(value, (str, int, float, bool)):
-                clean[str(key)] = value
+            if type(key) is not str:
+                key = str(key)
+            # Exact-type lookup first; subclasses such as numpy floats still pass unchanged.
+            if type(value) in _METADATA_SCALAR_TYPES or isinstance(value, _METADATA_SCALARS):
+                clean[key] = value
             else:
-                clean[str(key)] = str(value)
+                clean[key] = str(value)
         return clean
 
     @staticmethod
-    def get_stats(storage_dir: Path, collection_name: str = "rag0") -> Dict[str, Any]:
+    def read_index_version(storage_dir: Path) -> int:
+        """Return the index version counter, bumped on every index update."""
+
+        try:
+            return int((Path(storage_dir) / INDEX_VERSION_FILE).read_text(encoding="utf-8").strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    @staticmethod
+    def bump_index_version(storage_dir: Path) -> int:
+        """Increment and persist the index version counter."""
+
+        storage_path = Path(storage_dir)
+        storage_path.mkdir(parents=True, exist_ok=True)
+        version = VectorStoreManager.read_index_version(storage_path) + 1
+        (storage_path / INDEX_VERSION_FILE).write_text(str(version), encoding="utf-8")
+        return version
+
+    def stats(self) -> Dict[str, Any]:
+        """Return :meth:`get_stats` for this manager's collection, reusing its open client."""
+
+        return self.get_stats(self._storage_dir, self._collection_name, client=self._client)
+
+    @staticmethod
+    def get_stats(
+        storage_dir: Path,
+        collection_name: str = "rag0",
+        client: Optional[ClientAPI] = None,
+    ) -> Dict[str, Any]:
         """Return basic statistics for an existing Chroma collection."""
 
         storage_path = Path(storage_dir)
@@ -413,7 +890,7 @@ class VectorStoreManager:
 
         stats["storage_exists"] = True
 
-        chroma_client = chromadb.PersistentClient(path=str(storage_path))
+        chroma_client = client if client is not None else _persistent_client(storage_path)
 
         try:
             collection = chroma_client.get_collection(collection_name)
@@ -5,7 +5,7 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Any, Dict, Optional
 
-from .chunking import ChunkingConfig, generate_chunks
+from .chunking import ChunkingConfig, generate_chunks_with_descriptors
 from .models import ParsedDocument
 
 
@@ -50,19 +50,8 @@ class VisionParser:
         ]
         markdown = "\n\n".join(str(block.get("text", "")) for block in paragraphs)
         structured_content["markdown"] = markdown
-        chunks = generate_chunks(paragraphs, metadata, self._chunking_config)
+        chunks, descriptors = generate_chunks_with_descriptors(paragraphs, metadata, self._chunking_config)
         structured_content["chunks"] = chunks
-        metadata["chunk_descriptors"] = [
-            {
-                "chunk_id": chunk["chunk_id"],
-                "chunk_index": chunk["chunk_index"],
-                "paragraph_start": chunk["paragraph_start"],
-                "paragraph_end": chunk["paragraph_end"],
-                "page_start": chunk["page_start"],
-                "page_end": chunk["page_end"],
-                "token_count": chunk["token_count"],
-            }
-            for chunk in chunks
-        ]
+        metadata["chunk_descriptors"] = descriptors
 
         return ParsedDocument(metadata=metadata, content=structured_content)
@@ -0,0 +1,53 @@
+"""Temporal data converter that encodes JSON payloads with orjson."""
+
+from __future__ import annotations
+
+import dataclasses
+from typing import Any, Optional
+
+import orjson
+from temporalio.api.common.v1 import Payload
+from temporalio.converter import (
+    CompositePayloadConverter,
+    DataConverter,
+    DefaultPayloadConverter,
+    EncodingPayloadConverter,
+    JSONPlainPayloadConverter,
+)
+
+
+class OrjsonPlainPayloadConverter(JSONPlainPayloadConverter):
+    """``json/plain`` converter that encodes with orjson and defers to the stdlib on unsupported values."""
+
+    def to_payload(self, value: Any) -> Optional[Payload]:
+        try:
+            data = orjson.dumps(value, option=orjson.OPT_SORT_KEYS)
+        except TypeError:
+            # Pydantic models, non-string keys and other values the default encoder understands.
+            return super().to_payload(value)
+        return Payload(metadata={"encoding": self.encoding.encode()}, data=data)
+
+
+def _swap_json_converter(converter: EncodingPayloadConverter) -> EncodingPayloadConverter:
+    if isinstance(converter, JSONPlainPayloadConverter):
+        return OrjsonPlainPayloadConverter()
+    return converter
+
+
+class Rag0PayloadConverter(CompositePayloadConverter):
+    """Default Temporal payload converter with the JSON step swapped for orjson."""
+
+    def __init__(self) -> None:
+        super().__init__(
+            *(
+                _swap_json_converter(converter)
+                for converter in DefaultPayloadConverter.default_encoding_payload_converters
+            )
+        )
+
+
+# Payloads stay plain JSON, so clients and workers with the default converter remain compatible.
+DATA_CONVERTER = dataclasses.replace(DataConverter.default, payload_converter_class=Rag0PayloadConverter)
+
+
+__all__ = ["DATA_CONVERTER", "OrjsonPlainPayloadConverter", "Rag0PayloadConverter"]
@@ -4,12 +4,16 @@ from __future__ import annotations
 
 import argparse
 import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 
 from temporalio.client import Client
 from temporalio.worker import Worker
 
 from ..activities import (
     answer_query_activity,
+    clear_vector_store_managers,
     detect_document_type_activity,
     index_stats_activity,
     ingest_command_activity,
@@ -22,18 +26,43 @@ from ..activities import (
     store_parsed_document_activity,
     update_index_activity,
 )
+from ..agents.ask import warm_ollama_model
+from ..config import DEFAULT_OLLAMA_BASE_URL, DEFAULT_OLLAMA_MODEL
 from ..workflows import (
     IngestionWorkflow,
     MainWorkflow,
     QuestionWorkflow,
 )
+from .converter import DATA_CONVERTER
 
 
-async def _run_worker(address: str, namespace: str, task_queue: str) -> None:
-    client = await Client.connect(address, namespace=namespace)
-    worker = Worker(
+async def _run_worker(
+    address: str,
+    namespace: str,
+    task_queue: str,
+    activity_workers: Optional[int] = None,
+) -> None:
+    client = await Client.connect(address, namespace=namespace, data_converter=DATA_CONVERTER)
+    # Load the default model in the background so the first ask skips Ollama's cold start.
+    warmup_task: Optional[asyncio.Task[bool]] = None
+    if os.getenv("ASK_AGENT_WARMUP", "1") != "0":
+        warmup_task = asyncio.create_task(warm_ollama_model(DEFAULT_OLLAMA_MODEL, DEFAULT_OLLAMA_BASE_URL))
+    # Synchronous (``def``) activities run on this pool; leaving the ``with`` block
+    # waits for in-flight activities to finish.
+    try:
+        with ThreadPoolExecutor(max_workers=activity_workers) as activity_executor:
+            await _build_worker(client, task_queue, activity_executor).run()
+    finally:
+        if warmup_task is not None:
+            warmup_task.cancel()
+        clear_vector_store_managers()
+
+
+def _build_worker(client: Client, task_queue: str, activity_executor: ThreadPoolExecutor) -> Worker:
+    return Worker(
         client,
         task_queue=task_queue,
+        activity_executor=activity_executor,
         workflows=[IngestionWorkflow, QuestionWorkflow, MainWorkflow],
         activities=[
             render_cli_menu_activity,
@@ -51,8 +80,6 @@ async def _run_worker(address: str, namespace: str, task_queue: str) -> None:
         ],
     )
 
-    await worker.run()
-
 
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
@@ -73,13 +100,19 @@ def build_parser() -> argparse.ArgumentParser:
         default="rag0",
         help="Temporal task queue",
     )
+    parser.add_argument(
+        "--activity-workers",
+        type=int,
+        default=None,
+        help="Thread pool size for synchronous activities (defaults to the executor default)",
+    )
     return parser
 
 
 def main() -> None:
     parser = build_parser()
     args = parser.parse_args()
-    asyncio.run(_run_worker(args.address, args.namespace, args.task_queue))
+    asyncio.run(_run_worker(args.address, args.namespace, args.task_queue, args.activity_workers))
 
 
 if __name__ == "__main__":  # pragma: no cover
@@ -9,6 +9,7 @@ import textwrap
 import webbrowser
 from collections import deque
 from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import TYPE_CHECKING, Any, Deque, Dict, Iterable, List, Optional, cast
 from urllib.parse import urlparse
 
@@ -590,7 +591,9 @@ def _build_documents_panel(
     )
 
 
+@lru_cache(maxsize=64)
 def _progress_label_style(label: str, theme: CLITheme) -> str:
+    # Themes are frozen and labels come from a small fixed set, so results are memoised.
     mapping = {
         "analysis": theme.accent,
         "retrieval": theme.highlight,
@@ -946,6 +949,12 @@ def build_main_cli_parser() -> argparse.ArgumentParser:
         default=defaults.chunk_merge_threshold,
         help="Token threshold for merging short paragraphs before chunking.",
     )
+    parser.add_argument(
+        "--result-timeout-seconds",
+        type=float,
+        default=defaults.result_timeout_seconds,
+        help="Seconds the CLI waits without any workflow progress before warning about a command.",
+    )
     return parser
 
 
@@ -0,0 +1,36 @@
+"""Scheduling for the short worker-side activities that workflows run locally."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import Any, Sequence
+
+from temporalio import workflow
+
+# Patch id guarding the switch to local activities. Histories recorded before it keep
+# scheduling these activities on the task queue, so in-flight workflows still replay.
+LOCAL_ACTIVITIES_PATCH = "local-cli-activities"
+
+
+async def execute_short_activity(
+    activity: str,
+    *,
+    args: Sequence[Any] = (),
+    schedule_to_close_timeout: timedelta,
+) -> Any:
+    """Run ``activity`` as a local activity, or as a regular one when replaying an older history."""
+
+    if workflow.patched(LOCAL_ACTIVITIES_PATCH):
+        return await workflow.execute_local_activity(
+            activity,
+            args=args,
+            schedule_to_close_timeout=schedule_to_close_timeout,
+        )
+    return await workflow.execute_activity(
+        activity,
+        args=args,
+        schedule_to_close_timeout=schedule_to_close_timeout,
+    )
+
+
+__all__ = ["LOCAL_ACTIVITIES_PATCH", "execute_short_activity"]
@@ -6,6 +6,8 @@ from typing import Any, Dict, Optional
 
 from temporalio import workflow
 
+from ._local_activities import execute_short_activity
+
 DETECT_DOCUMENT_ACTIVITY = "detect_document_type_activity"
 PARSE_DOCUMENT_ACTIVITY = "parse_document_activity"
 STORE_PARSED_ACTIVITY = "store_parsed_document_activity"
@@ -29,7 +31,7 @@ class IngestionWorkflow:
         if not source_path:
             raise ValueError("source_path must be provided in payload")
 
-        detection_result = await workflow.execute_activity(
+        detection_result = await execute_short_activity(
             DETECT_DOCUMENT_ACTIVITY,
             args=(source_path,),
             schedule_to_close_timeout=workflow.timedelta(minutes=2),
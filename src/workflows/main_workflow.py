@@ -2,13 +2,15 @@
 
 from __future__ import annotations
 
+import asyncio
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 from temporalio import exceptions as temporal_exceptions
 from temporalio import workflow
 
 from ..config import WorkflowConfig
+from ._local_activities import LOCAL_ACTIVITIES_PATCH, execute_short_activity
 from .ingestion_workflow import IngestionWorkflow
 from .question_workflow import QuestionWorkflow, QuestionWorkflowInput
 
@@ -18,6 +20,10 @@ INGEST_COMMAND_ACTIVITY = "ingest_command_activity"
 QUESTION_COMMAND_ACTIVITY = "question_command_activity"
 STATS_COMMAND_ACTIVITY = "stats_command_activity"
 QUIT_COMMAND_ACTIVITY = "quit_command_activity"
+WAIT_STATE_CHANGE_UPDATE = "wait_state_change"
+SUBMIT_AND_WAIT_UPDATE = "submit_and_wait"
+# Upper bound on how long a single state-waiting update blocks before answering unchanged.
+MAX_UPDATE_WAIT_SECONDS = 30.0
 
 
 @dataclass
@@ -38,6 +44,7 @@ class MainWorkflow:
         self._result_revision = 0
         self._next_prompt: Dict[str, Any] = {"prompt": "", "revision": 0}
         self._prompt_revision = 0
+        self._menu_payload: Optional[Dict[str, Any]] = None
         self._config: Optional[WorkflowConfig] = None
         self._active_command: Optional[str] = None
         self._active_progress: List[Dict[str, Any]] = []
@@ -54,6 +61,85 @@ class MainWorkflow:
     def get_next_prompt(self) -> Dict[str, Any]:
         return self._next_prompt
 
+    @workflow.query
+    def get_state(self, progress_since: int = 0) -> Dict[str, Any]:
+        """Return the current prompt and last result together.
+
+        Progress events of a running ``ask`` before ``progress_since`` are left out and
+        the result carries ``progress_offset`` instead, so each event is sent once.
+        """
+
+        return {"prompt": self._next_prompt, "result": self._result_since(progress_since)}
+
+    @workflow.update(
+        name=WAIT_STATE_CHANGE_UPDATE,
+        unfinished_policy=workflow.HandlerUnfinishedPolicy.ABANDON,
+    )
+    async def wait_state_change(
+        self,
+        last_prompt_revision: int,
+        last_result_revision: int,
+        wait_seconds: float,
+        progress_since: int = 0,
+    ) -> Dict[str, Any]:
+        """Block until the prompt or result revision advances, then return :meth:`get_state`."""
+
+        return await self._state_after(
+            last_prompt_revision, last_result_revision, wait_seconds, progress_since
+        )
+
+    @workflow.update(
+        name=SUBMIT_AND_WAIT_UPDATE,
+        unfinished_policy=workflow.HandlerUnfinishedPolicy.ABANDON,
+    )
+    async def submit_and_wait(
+        self, raw_input: str, last_prompt_revision: int, last_result_revision: int, wait_seconds: float
+    ) -> Dict[str, Any]:
+        """Submit input like :meth:`submit_input`, then wait as :meth:`wait_state_change` does."""
+
+        self._pending_input = raw_input
+        return await self._state_after(last_prompt_revision, last_result_revision, wait_seconds)
+
+    async def _state_after(
+        self,
+        last_prompt_revision: int,
+        last_result_revision: int,
+        wait_seconds: float,
+        progress_since: int = 0,
+    ) -> Dict[str, Any]:
+        await self._wait_for(
+            lambda: (
+                self._prompt_revision > last_prompt_revision
+                or self._result_revision > last_result_revision
+            ),
+            wait_seconds,
+        )
+        return self.get_state(progress_since)
+
+    def _result_since(self, progress_since: int) -> Optional[Dict[str, Any]]:
+        result = self._last_result
+        if progress_since <= 0 or result is None or result.get("status") != "running":
+            return result
+        inner = result.get("result")
+        if not isinstance(inner, dict) or not isinstance(inner.get("progress"), list):
+            return result
+        progress = inner["progress"]
+        return {
+            **result,
+            "result": {**inner, "progress": progress[progress_since:], "progress_offset": progress_since},
+        }
+
+    @staticmethod
+    async def _wait_for(condition: Callable[[], bool], wait_seconds: float) -> None:
+        # Timing out is not an error: the caller sees an unchanged revision and asks again.
+        timeout = min(float(wait_seconds), MAX_UPDATE_WAIT_SECONDS)
+        if timeout <= 0 or condition():
+            return
+        try:
+            await workflow.wait_condition(condition, timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
     @workflow.signal
     def push_progress(self, payload: Dict[str, Any]) -> None:
         """Receive incremental progress updates from downstream executions."""
@@ -71,11 +157,13 @@ class MainWorkflow:
             "metadata": dict(event.get("metadata") or {}),
         }
         self._active_progress.append(copied)
+        # The list is shared rather than copied per event: it only grows during a run and
+        # is replaced, not cleared, when the run ends.
         interim = {
             "status": "running",
             "command": "ask",
             "result": {
-                "progress": list(self._active_progress),
+                "progress": self._active_progress,
             },
         }
         self._store_result(interim)
@@ -107,14 +195,20 @@ class MainWorkflow:
                 return stored_result
 
     async def _refresh_prompt(self) -> None:
-        try:
-            prompt_payload = await workflow.execute_activity(
-                RENDER_CLI_MENU_ACTIVITY,
-                schedule_to_close_timeout=workflow.timedelta(seconds=5),
-            )
-        except temporal_exceptions.ActivityError as exc:
-            prompt_text = f"[error] Unable to render menu: {self._activity_error_message(exc)}"
-            prompt_payload = {"prompt": prompt_text}
+        # The menu is static, so it is rendered once per run and reused afterwards. Older
+        # histories rendered it every time, so reuse shares the local-activities patch.
+        if self._menu_payload is not None and workflow.patched(LOCAL_ACTIVITIES_PATCH):
+            prompt_payload: Optional[Dict[str, Any]] = self._menu_payload
+        else:
+            try:
+                prompt_payload = await execute_short_activity(
+                    RENDER_CLI_MENU_ACTIVITY,
+                    schedule_to_close_timeout=workflow.timedelta(seconds=5),
+                )
+                self._menu_payload = dict(prompt_payload or {})
+            except temporal_exceptions.ActivityError as exc:
+                prompt_text = f"[error] Unable to render menu: {self._activity_error_message(exc)}"
+                prompt_payload = {"prompt": prompt_text}
 
         self._prompt_revision += 1
         payload = dict(prompt_payload or {})
@@ -124,7 +218,7 @@ class MainWorkflow:
 
     async def _parse_command(self, raw_input: str) -> Optional[CommandPayload]:
         try:
-            parsed = await workflow.execute_activity(
+            parsed = await execute_short_activity(
                 PARSE_CLI_COMMAND_ACTIVITY,
                 args=(raw_input,),
                 schedule_to_close_timeout=workflow.timedelta(seconds=10),
@@ -147,7 +241,7 @@ class MainWorkflow:
         config_payload = self._config.to_activity_payload() if self._config else {}
         try:
             if command.command == "ingest":
-                ingest_payload = await workflow.execute_activity(
+                ingest_payload = await execute_short_activity(
                     INGEST_COMMAND_ACTIVITY,
                     args=(command.arguments, config_payload),
                     schedule_to_close_timeout=workflow.timedelta(seconds=10),
@@ -166,7 +260,7 @@ class MainWorkflow:
                 self._active_command = "ask"
                 self._active_progress = []
                 try:
-                    question_payload = await workflow.execute_activity(
+                    question_payload = await execute_short_activity(
                         QUESTION_COMMAND_ACTIVITY,
                         args=(command.arguments, config_payload),
                         schedule_to_close_timeout=workflow.timedelta(seconds=10),
@@ -198,7 +292,7 @@ class MainWorkflow:
                 }
 
             if command.command == "quit":
-                quit_payload = await workflow.execute_activity(
+                quit_payload = await execute_short_activity(
                     QUIT_COMMAND_ACTIVITY,
                     schedule_to_close_timeout=workflow.timedelta(seconds=5),
                 )
@@ -0,0 +1,44 @@
+from pathlib import Path
+
+from src.activities._query_cache import QueryCache
+from src.ingestion.vector_store import VectorStoreManager
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_query_cache_expires_entries_after_ttl() -> None:
+    clock = FakeClock()
+    cache = QueryCache(max_size=4, ttl_seconds=10.0, clock=clock)
+    cache.set("q", {"answer": "cached"})
+
+    clock.now = 9.0
+    assert cache.get("q") == {"answer": "cached"}
+    clock.now = 10.0
+    assert cache.get("q") is None
+    assert cache.stats() == {"hits": 1, "misses": 1, "size": 0}
+
+
+def test_query_cache_evicts_least_recently_used() -> None:
+    cache = QueryCache(max_size=2, ttl_seconds=60.0)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_index_version_bumps_persist(tmp_path: Path) -> None:
+    index_dir = tmp_path / "index"
+    assert VectorStoreManager.read_index_version(index_dir) == 0
+    assert VectorStoreManager.bump_index_version(index_dir) == 1
+    assert VectorStoreManager.bump_index_version(index_dir) == 2
+    assert VectorStoreManager.read_index_version(index_dir) == 2
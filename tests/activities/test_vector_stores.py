@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from src.activities._vector_stores import (
+    clear_vector_store_managers,
+    collect_index_stats,
+    get_vector_store_manager,
+)
+
+
+def test_managers_are_shared_until_cleared(tmp_path: Path) -> None:
+    index_dir = str(tmp_path / "index")
+    try:
+        first = get_vector_store_manager(index_dir)
+        assert get_vector_store_manager(index_dir) is first
+
+        clear_vector_store_managers()
+
+        assert get_vector_store_manager(index_dir) is not first
+    finally:
+        clear_vector_store_managers()
+
+
+def test_stats_for_missing_index_do_not_create_it(tmp_path: Path) -> None:
+    index_dir = tmp_path / "missing"
+
+    stats = collect_index_stats(str(index_dir))
+
+    assert stats["storage_exists"] is False
+    assert not index_dir.exists()
+
+
+def test_stats_reuse_cached_manager(tmp_path: Path) -> None:
+    index_dir = str(tmp_path / "index")
+    try:
+        get_vector_store_manager(index_dir)
+
+        stats = collect_index_stats(index_dir)
+
+        assert stats["collection_available"] is True
+        assert stats["document_count"] == 0
+    finally:
+        clear_vector_store_managers()
@@ -1,6 +1,11 @@
 from __future__ import annotations
 
-from src.ingestion.chunking import ChunkingConfig, generate_chunks
+from src.ingestion.chunking import (
+    ChunkingConfig,
+    generate_chunks,
+    generate_chunks_with_descriptors,
+    split_paragraphs,
+)
 
 
 def test_generate_chunks_respects_overlap() -> None:
@@ -27,3 +32,64 @@ def test_generate_chunks_respects_overlap() -> None:
     assert chunks[1]["paragraph_end"] == 2
     assert chunks[1]["page_end"] == 2
     assert chunks[1]["metadata"]["chunk_id"] == "sample.md-chunk-0002"
+
+
+def test_generate_chunks_overlap_backs_up_one_paragraph() -> None:
+    paragraphs = [
+        {"text": "alpha beta", "page": 1},
+        {"text": " ".join(f"word{i}" for i in range(12)), "page": 1},
+        {"text": "gamma delta epsilon", "page": 2},
+    ]
+    config = ChunkingConfig(chunk_size_tokens=5, chunk_overlap_tokens=2, merge_threshold_tokens=0)
+
+    chunks = generate_chunks(paragraphs, {"file_name": "sample.md"}, config)
+
+    spans = [(chunk["paragraph_start"], chunk["paragraph_end"]) for chunk in chunks]
+    assert spans == [(0, 1), (1, 1), (2, 2)]
+    assert [chunk["token_count"] for chunk in chunks] == [14, 12, 3]
+
+
+def test_split_paragraphs_matches_blank_line_blocks() -> None:
+    text = "  First line\nstill first\n\n\n \n\nSecond\t\n\n\n  third  \n"
+
+    assert split_paragraphs(text) == ["First line\nstill first", "Second", "third"]
+    assert split_paragraphs("\n \n") == []
+
+
+def test_generate_chunks_with_descriptors_projects_chunk_fields() -> None:
+    paragraphs = [{"text": f"paragraph {index} " + "word " * 6, "page": index + 1} for index in range(4)]
+    config = ChunkingConfig(chunk_size_tokens=10, chunk_overlap_tokens=2, merge_threshold_tokens=0)
+
+    chunks, descriptors = generate_chunks_with_descriptors(paragraphs, {"file_name": "doc.md"}, config)
+
+    assert chunks == generate_chunks(paragraphs, {"file_name": "doc.md"}, config)
+    assert descriptors == [
+        {key: chunk[key] for key in descriptor} for chunk, descriptor in zip(chunks, descriptors, strict=True)
+    ]
+    assert all("text" not in descriptor for descriptor in descriptors)
+    assert set(descriptors[0]) == {
+        "chunk_id",
+        "chunk_index",
+        "paragraph_start",
+        "paragraph_end",
+        "page_start",
+        "page_end",
+        "token_count",
+    }
+
+
+def test_chunking_config_clamp_is_shared_and_sanitized() -> None:
+    clamped = ChunkingConfig(chunk_size_tokens=0, chunk_overlap_tokens=5, merge_threshold_tokens=-3).clamp()
+
+    assert clamped == ChunkingConfig(chunk_size_tokens=1, chunk_overlap_tokens=0, merge_threshold_tokens=0)
+    assert ChunkingConfig(0, 5, -3).clamp() is clamped
+
+
+def test_generate_chunks_overlap_covers_at_least_the_requested_tokens() -> None:
+    paragraphs = [{"text": " ".join(["word"] * count)} for count in (4, 2, 2, 2, 4)]
+    config = ChunkingConfig(chunk_size_tokens=8, chunk_overlap_tokens=3, merge_threshold_tokens=0)
+
+    chunks = generate_chunks(paragraphs, {"file_name": "doc.md"}, config)
+
+    # Two 2-token paragraphs are carried over, since one alone falls short of the overlap.
+    assert [(chunk["paragraph_start"], chunk["paragraph_end"]) for chunk in chunks] == [(0, 2), (1, 4)]
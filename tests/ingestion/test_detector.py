@@ -0,0 +1,96 @@
+from pathlib import Path
+from typing import Any, List
+
+import pytest
+from src.ingestion import detector
+from src.ingestion.models import DocumentType
+
+
+class FakePage:
+    def extract_text(self) -> str:
+        return "Hello"
+
+
+def test_pdf_text_detection_is_cached_per_file_version(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    opened: List[str] = []
+
+    class FakeReader:
+        def __init__(self, path: str) -> None:
+            opened.append(path)
+            self.pages: List[Any] = [FakePage()]
+
+    monkeypatch.setattr(detector, "_pdf_reader_cls", lambda: FakeReader)
+    detector._cached_pdf_has_text.cache_clear()
+    pdf = tmp_path / "doc.pdf"
+    pdf.write_bytes(b"%PDF-1.4\n")
+
+    assert detector.detect_document_type(pdf) is DocumentType.TEXT_PDF
+    assert detector.detect_document_type(pdf) is DocumentType.TEXT_PDF
+    assert opened == [str(pdf)]
+
+    pdf.write_bytes(b"%PDF-1.4\n% edited\n")
+    assert detector.detect_document_type(pdf) is DocumentType.TEXT_PDF
+    assert len(opened) == 2
+    detector._cached_pdf_has_text.cache_clear()
+
+
+def test_pdf_text_markers_skip_the_reader(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    def fail_reader() -> Any:
+        raise AssertionError("PdfReader should not be needed")
+
+    monkeypatch.setattr(detector, "_pdf_reader_cls", fail_reader)
+    detector._cached_pdf_has_text.cache_clear()
+    pdf = tmp_path / "doc.pdf"
+    pdf.write_bytes(b"%PDF-1.4\n4 0 obj\nstream\nBT /F1 12 Tf (Hello) Tj ET\nendstream\n")
+
+    assert detector.detect_document_type(pdf) is DocumentType.TEXT_PDF
+    detector._cached_pdf_has_text.cache_clear()
+
+
+def test_missing_file_is_unknown(tmp_path: Path) -> None:
+    assert detector.detect_document_type(tmp_path / "missing.txt") is DocumentType.UNKNOWN
+    assert detector.detect_document_type(tmp_path / "missing.pdf") is DocumentType.UNKNOWN
+
+
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [
+        (b"%PDF-1.7\n", "application/pdf"),
+        (b"\x89PNG\r\n\x1a\n\x00\x00", "image/png"),
+        (b"GIF89a\x01\x00", "image/gif"),
+        (b"\xff\xd8\xff\xe0", "image/jpeg"),
+        (b"BM\x00\x00", "image/bmp"),
+        (b"MM\x00*\x00\x00", "image/tiff"),
+        (b"GIF88a\x01\x00", None),
+        (b"plain text", None),
+    ],
+)
+def test_detect_mime_signature_fallback(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, header: bytes, expected: Any
+) -> None:
+    monkeypatch.setattr(detector, "_filetype_module", lambda: None)
+    sample = tmp_path / "sample.bin"
+    sample.write_bytes(header)
+
+    assert detector._detect_mime(str(sample)) == expected
+
+
+def test_known_suffix_skips_content_sniffing(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    def fail_sniff(_: str) -> Any:
+        raise AssertionError("suffix should decide the type")
+
+    monkeypatch.setattr(detector, "_detect_mime", fail_sniff)
+    image = tmp_path / "photo.JPG"
+    image.write_bytes(b"\xff\xd8\xff\xe0")
+
+    assert detector.detect_document_type(image) is DocumentType.IMAGE
+
+
+def test_unknown_suffix_falls_back_to_content(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(detector, "_filetype_module", lambda: None)
+    image = tmp_path / "upload.bin"
+    image.write_bytes(b"\x89PNG\r\n\x1a\n\x00\x00")
+
+    assert detector.detect_document_type(image) is DocumentType.IMAGE
@@ -2,7 +2,15 @@ from __future__ import annotations
 
 from pathlib import Path
 
-from src.ingestion.storage import load_parsed_markdown, store_parsed_markdown
+import orjson
+import pytest
+from src.ingestion import storage
+from src.ingestion.storage import (
+    binary_sidecar_path,
+    load_parsed_markdown,
+    read_metadata_sidecar,
+    store_parsed_markdown,
+)
 
 
 def test_store_and_load_preserves_chunk_metadata(tmp_path: Path) -> None:
@@ -48,3 +56,61 @@ def test_store_and_load_preserves_chunk_metadata(tmp_path: Path) -> None:
     assert payload["metadata"]["chunk_descriptors"][0]["chunk_id"] == "example-chunk-0001"
     assert payload["content"]["chunks"][0]["chunk_id"] == "example-chunk-0001"
     assert payload["content"]["markdown"] == content["markdown"]
+
+
+def test_load_falls_back_to_paragraphs_on_malformed_sidecar(tmp_path: Path) -> None:
+    markdown_path = tmp_path / "doc.md"
+    markdown_path.write_text("First block\n\nSecond block", encoding="utf-8")
+    markdown_path.with_suffix(".metadata.json").write_bytes(b"{not json")
+
+    payload = load_parsed_markdown(markdown_path)
+
+    assert [paragraph["text"] for paragraph in payload["content"]["paragraphs"]] == [
+        "First block",
+        "Second block",
+    ]
+
+
+def test_store_writes_utf8_sidecar_with_non_string_keys(tmp_path: Path) -> None:
+    metadata = {"file_name": "notes.md", "page_sizes": {1: 420}}
+    content = {"markdown": "Café", "paragraphs": [{"text": "Café"}], "chunks": [], "warnings": []}
+
+    paths = store_parsed_markdown(metadata, content, tmp_path)
+
+    raw = paths["metadata_path"].read_bytes()
+    assert "Café".encode("utf-8") in raw
+    payload = load_parsed_markdown(paths["markdown_path"], paths["metadata_path"])
+    assert payload["metadata"]["page_sizes"] == {"1": 420}
+
+
+def test_store_drops_binary_sidecar_without_msgpack(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(storage, "msgpack", None)
+    stale = tmp_path / "notes.metadata.msgpack"
+    stale.write_bytes(b"stale")
+
+    paths = store_parsed_markdown({"file_name": "notes.md"}, {"markdown": "Body"}, tmp_path)
+
+    assert not stale.exists()
+    assert read_metadata_sidecar(paths["metadata_path"])["metadata"] == {"file_name": "notes.md"}
+
+
+def test_binary_sidecar_matches_json(tmp_path: Path) -> None:
+    pytest.importorskip("msgpack")
+    metadata = {"file_name": "notes.md", "page_sizes": {1: 420}}
+
+    paths = store_parsed_markdown(metadata, {"markdown": "Body", "chunks": []}, tmp_path)
+
+    binary_path = binary_sidecar_path(paths["metadata_path"])
+    assert binary_path.exists()
+    expected = orjson.loads(paths["metadata_path"].read_bytes())
+    assert read_metadata_sidecar(paths["metadata_path"]) == expected
+
+
+def test_read_metadata_sidecar_maps_large_files(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(storage, "SIDECAR_MMAP_THRESHOLD_BYTES", 8)
+    sidecar = tmp_path / "big.metadata.json"
+    sidecar.write_bytes(orjson.dumps({"metadata": {"file_name": "big.md"}, "content": {"chunks": []}}))
+
+    assert read_metadata_sidecar(sidecar)["metadata"] == {"file_name": "big.md"}
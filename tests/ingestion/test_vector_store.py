@@ -1,19 +1,47 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List
+import asyncio
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple, cast
 
+import numpy as np
+import orjson
+from src.ingestion import vector_store
 from src.ingestion.vector_store import VectorStoreManager
 
 
 class StubVectorStoreManager(VectorStoreManager):
-    def __init__(self, responses: Dict[str, List[Dict[str, object]]]) -> None:
+    def __init__(self, responses: Dict[str, List[Dict[str, Any]]]) -> None:
         self.responses = responses
-        self._chunk_sidecar_cache: Dict[str, List[Dict[str, Any]]] = {}
+        self._chunk_sidecar_cache: Dict[str, Tuple[int, List[Dict[str, Any]], Dict[str, int]]] = {}
+        self._embed_model = None
 
-    def query(self, prompt: str, top_k: int = 3) -> List[Dict[str, object]]:
+    def query(
+        self, prompt: str, top_k: int = 3, embedding: Optional[Sequence[float]] = None
+    ) -> List[Dict[str, Any]]:
         return list(self.responses.get(prompt, []))
 
 
+class BatchEmbeddingManager(VectorStoreManager):
+    def __init__(self) -> None:
+        self._chunk_sidecar_cache: Dict[str, Tuple[int, List[Dict[str, Any]], Dict[str, int]]] = {}
+        self._embed_model = cast(Any, object())
+        self.embed_calls: List[List[str]] = []
+        self.queried: List[tuple[str, Optional[List[float]]]] = []
+
+    def batch_embed(self, texts: Sequence[str]) -> np.ndarray:
+        self.embed_calls.append(list(texts))
+        return np.arange(len(texts) * 2, dtype=np.float32).reshape(len(texts), 2)
+
+    def query(
+        self, prompt: str, top_k: int = 3, embedding: Optional[Sequence[float]] = None
+    ) -> List[Dict[str, Any]]:
+        self.queried.append((prompt, None if embedding is None else list(embedding)))
+        return [{"text": prompt, "metadata": {"source_path": "doc", "chunk_id": prompt}, "score": 0.1}]
+
+
 def test_multi_query_deduplicates_chunk_ids() -> None:
     manager = StubVectorStoreManager(
         {
@@ -29,6 +57,41 @@ def test_multi_query_deduplicates_chunk_ids() -> None:
     assert chunk_ids == ["doc-1", "doc-2"]
 
 
+def test_multi_query_deduplicates_by_text_without_chunk_ids() -> None:
+    manager = StubVectorStoreManager(
+        {
+            "a": [{"text": "same", "metadata": {"source_path": "doc"}, "score": 0.4}],
+            "b": [
+                {"text": "same", "metadata": {"source_path": "doc"}, "score": 0.2},
+                {"text": "same", "metadata": {"source_path": "other"}, "score": 0.3},
+            ],
+        }
+    )
+
+    results = manager.multi_query(["a", "b"], top_k=2, dedupe_fields=["chunk_id"])
+
+    assert [(item["metadata"]["source_path"], item["score"]) for item in results] == [
+        ("doc", 0.2),
+        ("other", 0.3),
+    ]
+
+
+def test_multi_query_limit_keeps_best_scores() -> None:
+    manager = StubVectorStoreManager(
+        {
+            "q": [
+                {"text": name, "metadata": {"source_path": "doc", "chunk_id": name}, "score": score}
+                for name, score in (("c", 0.3), ("a", 0.1), ("d", 0.4), ("b", 0.2))
+            ]
+        }
+    )
+
+    limited = manager.multi_query(["q"], top_k=4, limit=2)
+
+    assert [item["text"] for item in limited] == ["a", "b"]
+    assert [item["text"] for item in manager.multi_query(["q"], top_k=4)] == ["a", "b", "c", "d"]
+
+
 def test_multi_query_expands_neighbors(monkeypatch) -> None:
     base_match = {"text": "A", "metadata": {"source_path": "doc", "chunk_id": "doc-1"}, "score": 0.1}
     manager = StubVectorStoreManager({"q": [base_match]})
@@ -43,6 +106,51 @@ def test_multi_query_expands_neighbors(monkeypatch) -> None:
     assert chunk_ids == ["doc-1", "doc-2"]
 
 
+def test_expand_neighbors_reads_adjacent_sidecar_chunks(tmp_path) -> None:
+    chunks = [
+        {
+            "chunk_id": f"doc-{idx}",
+            "chunk_index": idx,
+            "text": f"chunk {idx}",
+            "metadata": {"file_name": "d.md"},
+        }
+        for idx in range(4)
+    ]
+    sidecar = tmp_path / "doc.metadata.json"
+    sidecar.write_bytes(orjson.dumps({"metadata": {}, "content": {"chunks": chunks}}))
+    manager = StubVectorStoreManager({})
+
+    def match(chunk_id: str) -> Dict[str, Any]:
+        metadata = {"chunk_id": chunk_id, "parsed_metadata_path": str(sidecar), "source_path": "doc"}
+        return {"text": "chunk", "metadata": metadata, "score": 0.1}
+
+    expansions = manager._expand_neighbors([match("doc-2")], neighbor_span=1)
+
+    assert [item["metadata"]["chunk_id"] for item in expansions] == ["doc-1", "doc-3"]
+    assert expansions[0]["metadata"]["file_name"] == "d.md"
+    assert expansions[0]["metadata"]["source_path"] == "doc"
+    assert expansions[0]["metadata"]["parsed_metadata_path"] == str(sidecar)
+    assert manager._expand_neighbors([match("doc-9")], neighbor_span=1) == []
+
+
+def test_chunk_sidecar_reloads_after_rewrite(tmp_path) -> None:
+    sidecar = tmp_path / "doc.metadata.json"
+    manager = StubVectorStoreManager({})
+
+    def write(texts: List[str], mtime_ns: int) -> None:
+        chunks = [{"chunk_id": f"doc-{idx}", "text": text} for idx, text in enumerate(texts)]
+        sidecar.write_bytes(orjson.dumps({"metadata": {}, "content": {"chunks": chunks}}))
+        os.utime(sidecar, ns=(mtime_ns, mtime_ns))
+
+    write(["old"], 1_000_000_000)
+    assert manager._load_chunk_sidecar(str(sidecar))[0][0]["text"] == "old"
+
+    write(["new", "more"], 2_000_000_000)
+    chunks, positions = manager._load_chunk_sidecar(str(sidecar))
+    assert [chunk["text"] for chunk in chunks] == ["new", "more"]
+    assert positions == {"doc-0": 0, "doc-1": 1}
+
+
 def test_merge_adjacent_documents_merges_contiguous_chunks() -> None:
     docs = [
         {
@@ -83,3 +191,287 @@ def test_merge_adjacent_documents_merges_contiguous_chunks() -> None:
     assert len(merged) == 2
     assert "First chunk." in merged[0]["text"]
     assert "Second chunk." in merged[0]["text"]
+
+
+def test_multi_query_embeds_all_prompts_in_one_batch() -> None:
+    manager = BatchEmbeddingManager()
+    results = manager.multi_query(["first?", "second?"], top_k=1)
+
+    assert manager.embed_calls == [["first?", "second?"]]
+    # Per-prompt queries run concurrently, so only the pairing of prompt and embedding is fixed.
+    assert sorted(manager.queried) == [("first?", [0.0, 1.0]), ("second?", [2.0, 3.0])]
+    assert [item["text"] for item in results] == ["first?", "second?"]
+
+
+def test_multi_query_reuses_cached_prompt_results() -> None:
+    manager = BatchEmbeddingManager()
+    manager._retrieval_cache_size = 4
+    manager._retrieval_cache = OrderedDict()
+
+    manager.multi_query(["first?"], top_k=1)
+    results = manager.multi_query(["first?", "  second? "], top_k=1)
+    manager.multi_query(["second?"], top_k=1)
+
+    assert manager.embed_calls == [["first?"], ["  second? "]]
+    assert [item["text"] for item in results] == ["first?", "  second? "]
+
+
+def test_multi_query_runs_prompt_queries_concurrently() -> None:
+    barrier = threading.Barrier(3, timeout=5)
+
+    class BarrierManager(StubVectorStoreManager):
+        def query(
+            self, prompt: str, top_k: int = 3, embedding: Optional[Sequence[float]] = None
+        ) -> List[Dict[str, Any]]:
+            # Each query blocks until all three are in flight, which deadlocks if run serially.
+            barrier.wait()
+            return super().query(prompt, top_k, embedding)
+
+    manager = BarrierManager(
+        {
+            prompt: [{"text": prompt, "metadata": {"source_path": "doc", "chunk_id": prompt}, "score": 0.1}]
+            for prompt in ("a", "b", "c")
+        }
+    )
+
+    results = manager.multi_query(["a", "b", "c"], top_k=1)
+
+    assert [item["text"] for item in results] == ["a", "b", "c"]
+
+
+def test_multi_query_runs_serially_with_one_worker() -> None:
+    threads: List[int] = []
+
+    class ThreadRecordingManager(StubVectorStoreManager):
+        def query(
+            self, prompt: str, top_k: int = 3, embedding: Optional[Sequence[float]] = None
+        ) -> List[Dict[str, Any]]:
+            threads.append(threading.get_ident())
+            return super().query(prompt, top_k, embedding)
+
+    manager = ThreadRecordingManager({})
+
+    manager.multi_query(["a", "b", "c"], top_k=1, max_workers=1)
+
+    assert threads == [threading.get_ident()] * 3
+
+
+def test_search_embeddings_ranks_by_cosine_similarity(tmp_path) -> None:
+    manager = VectorStoreManager(storage_dir=tmp_path / "index")
+    collection = cast(Any, manager)._collection
+    collection.add(
+        ids=["a", "b", "c"],
+        embeddings=[[1.0, 0.0], [0.0, 2.0], [1.0, 1.0]],
+        documents=["east", "north", "north-east"],
+        metadatas=[{"chunk_id": "a"}, {"chunk_id": "b"}, {"chunk_id": "c"}],
+    )
+
+    results = manager._search_embeddings(np.array([[0.0, 1.0], [3.0, 0.1]], dtype=np.float32), top_k=2)
+
+    assert results is not None
+    assert [match["text"] for match in results[0]] == ["north", "north-east"]
+    assert [match["metadata"]["chunk_id"] for match in results[1]] == ["a", "c"]
+    assert results[0][0]["score"] == 1.0
+
+
+def test_mmr_select_prefers_diverse_candidates() -> None:
+    candidates = np.array([[1.0, 0.0], [0.995, 0.0998], [0.6, 0.8]], dtype=np.float32)
+    relevance = np.array([0.95, 0.94, 0.7], dtype=np.float32)
+
+    assert VectorStoreManager._mmr_select(candidates, relevance, 2, 0.5) == [0, 2]
+    assert VectorStoreManager._mmr_select(candidates, relevance, 2, 1.0) == [0, 1]
+
+
+def test_top_k_indices_orders_best_first() -> None:
+    scores = np.array([0.2, 0.9, 0.1, 0.5], dtype=np.float32)
+    assert VectorStoreManager._top_k_indices(scores, 2).tolist() == [1, 3]
+    assert VectorStoreManager._top_k_indices(scores, 10).tolist() == [1, 3, 0, 2]
+
+
+def test_upsert_documents_streams_batches_with_precomputed_embeddings(tmp_path, monkeypatch) -> None:
+    manager = VectorStoreManager(storage_dir=tmp_path / "index")
+    batches: List[int] = []
+
+    def fake_batch_embed(texts: Sequence[str]) -> np.ndarray:
+        batches.append(len(texts))
+        return np.ones((len(texts), 3), dtype=np.float32)
+
+    monkeypatch.setattr(manager, "batch_embed", fake_batch_embed)
+    documents = (
+        {"text": f"chunk {idx}", "metadata": {"chunk_id": f"doc-{idx}", "source_path": "doc"}}
+        for idx in range(5)
+    )
+
+    inserted = manager.upsert_documents(documents, batch_size=2)
+
+    assert inserted == 5
+    assert batches == [2, 2, 1]
+    assert cast(Any, manager)._collection.count() == 5
+    assert VectorStoreManager.read_index_version(tmp_path / "index") == 1
+
+
+def test_upsert_documents_overwrites_chunks_on_reingest(tmp_path, monkeypatch) -> None:
+    manager = VectorStoreManager(storage_dir=tmp_path / "index")
+    monkeypatch.setattr(
+        manager, "batch_embed", lambda texts: np.ones((len(texts), 3), dtype=np.float32)
+    )
+
+    def documents(version: str) -> List[Dict[str, Any]]:
+        return [
+            {"text": f"{version} chunk {idx}", "metadata": {"chunk_id": f"doc-{idx}", "source_path": "doc"}}
+            for idx in range(3)
+        ]
+
+    assert manager.upsert_documents(documents("old")) == 3
+    assert manager.upsert_documents(documents("new")) == 3
+
+    collection = cast(Any, manager)._collection
+    assert collection.count() == 3
+    stored = collection.get(include=["documents"])["documents"]
+    assert sorted(stored) == ["new chunk 0", "new chunk 1", "new chunk 2"]
+    results = manager._search_embeddings(np.ones((1, 3), dtype=np.float32), top_k=1)
+    assert results is not None
+    assert results[0][0]["metadata"]["source_path"] == "doc"
+
+
+def test_upsert_documents_drops_chunks_missing_from_a_shorter_reingest(tmp_path, monkeypatch) -> None:
+    manager = VectorStoreManager(storage_dir=tmp_path / "index")
+    monkeypatch.setattr(
+        manager, "batch_embed", lambda texts: np.ones((len(texts), 3), dtype=np.float32)
+    )
+
+    def documents(source: str, count: int) -> List[Dict[str, Any]]:
+        return [
+            {"text": f"{source} chunk {idx}", "metadata": {"chunk_id": str(idx), "source_path": source}}
+            for idx in range(count)
+        ]
+
+    manager.upsert_documents(documents("doc", 4) + documents("other", 1))
+    manager.upsert_documents(documents("doc", 2), batch_size=1)
+
+    stored = cast(Any, manager)._collection.get(include=["documents"])["documents"]
+    assert sorted(stored) == ["doc chunk 0", "doc chunk 1", "other chunk 0"]
+
+
+def test_search_embeddings_reloads_after_another_manager_reingests(tmp_path, monkeypatch) -> None:
+    writer = VectorStoreManager(storage_dir=tmp_path / "index")
+    reader = VectorStoreManager(storage_dir=tmp_path / "index")
+    axes: List[List[float]] = [[1.0, 0.0], [0.0, 1.0]]
+    monkeypatch.setattr(writer, "batch_embed", lambda texts: np.array(axes[: len(texts)], dtype=np.float32))
+
+    def documents(version: str) -> List[Dict[str, Any]]:
+        return [
+            {"text": f"{version} chunk {idx}", "metadata": {"chunk_id": f"doc-{idx}", "source_path": "doc"}}
+            for idx in range(2)
+        ]
+
+    query = np.array([[1.0, 0.0]], dtype=np.float32)
+    writer.upsert_documents(documents("old"))
+    before = reader._search_embeddings(query, top_k=1)
+    axes.reverse()
+    writer.upsert_documents(documents("new"))
+    after = reader._search_embeddings(query, top_k=1)
+
+    assert before is not None and after is not None
+    assert before[0][0]["text"] == "old chunk 0"
+    assert after[0][0]["text"] == "new chunk 1"
+
+
+def test_search_embeddings_defers_large_collections_to_chroma(tmp_path, monkeypatch) -> None:
+    manager = VectorStoreManager(storage_dir=tmp_path / "index")
+    collection = cast(Any, manager)._collection
+    collection.add(ids=["a", "b"], embeddings=[[1.0, 0.0], [0.0, 1.0]], documents=["a", "b"])
+    monkeypatch.setattr(vector_store, "EXACT_SEARCH_MAX_ROWS", 1)
+
+    assert manager._search_embeddings(np.ones((1, 2), dtype=np.float32), top_k=1) is None
+
+
+def test_query_embeddings_are_cached_per_prompt(monkeypatch) -> None:
+    calls: List[str] = []
+
+    class CountingEmbedder:
+        def get_query_embedding(self, prompt: str) -> List[float]:
+            calls.append(prompt)
+            return [1.0, 0.5]
+
+    monkeypatch.setitem(vector_store._EMBEDDERS, ("http://embed", "stub-model"), CountingEmbedder())
+    VectorStoreManager.clear_embedding_cache()
+    manager = StubVectorStoreManager({})
+    manager._embed_model = cast(Any, object())
+    manager._ollama_base_url = "http://embed"
+    manager._embed_model_name = "stub-model"
+
+    first = manager._create_query_bundle("what is rag0?")
+    second = manager._create_query_bundle("what is rag0?")
+
+    assert first is not None and second is not None
+    assert first.embedding == second.embedding == [1.0, 0.5]
+    assert calls == ["what is rag0?"]
+    VectorStoreManager.clear_embedding_cache()
+
+
+def test_clean_metadata_keeps_scalars_and_stringifies_the_rest() -> None:
+    metadata = {"name": "doc", "page": 3, "score": np.float64(0.5), "flag": True, 7: ["a"], "skip": None}
+
+    clean = VectorStoreManager._clean_metadata(cast(Dict[str, Any], metadata))
+
+    assert clean == {"name": "doc", "page": 3, "score": 0.5, "flag": True, "7": "['a']"}
+    assert type(clean["score"]) is np.float64
+
+
+def test_aquery_runs_query_off_the_event_loop_thread() -> None:
+    class ThreadRecordingManager(StubVectorStoreManager):
+        def query(
+            self, prompt: str, top_k: int = 3, embedding: Optional[Sequence[float]] = None
+        ) -> List[Dict[str, Any]]:
+            threads.append(threading.get_ident())
+            return super().query(prompt, top_k, embedding)
+
+    threads: List[int] = []
+    manager = ThreadRecordingManager({"q": [{"text": "A", "metadata": {}, "score": 0.1}]})
+
+    matches = asyncio.run(manager.aquery("q"))
+
+    assert [match["text"] for match in matches] == ["A"]
+    assert threads and threads[0] != threading.get_ident()
+
+
+def test_multi_query_expands_each_deduplicated_seed_once() -> None:
+    class SeedRecordingManager(StubVectorStoreManager):
+        def _expand_neighbors(self, matches: Any, neighbor_span: int) -> List[Dict[str, Any]]:
+            expanded.append([match["metadata"]["chunk_id"] for match in matches])
+            return []
+
+    expanded: List[List[str]] = []
+    shared = {"text": "A", "metadata": {"source_path": "doc", "chunk_id": "doc-1"}, "score": 0.2}
+    manager = SeedRecordingManager({"q1": [shared], "q2": [{**shared, "score": 0.1}]})
+
+    results = manager.multi_query(["q1", "q2"], top_k=1, neighbor_span=1)
+
+    assert expanded == [["doc-1"]]
+    assert [match["score"] for match in results] == [0.1]
+
+
+def test_managers_and_stats_share_lru_segment_cache_settings(tmp_path) -> None:
+    manager = VectorStoreManager(storage_dir=tmp_path / "index", memory_limit_bytes=1 << 20)
+    settings = cast(Any, manager)._client.get_settings()
+
+    assert settings.chroma_segment_cache_policy == "LRU"
+    assert settings.chroma_memory_limit_bytes == 1 << 20
+
+    # A stats client for a path opened with the default limit must not conflict with it.
+    default = VectorStoreManager(storage_dir=tmp_path / "default")
+    stats = VectorStoreManager.get_stats(tmp_path / "default")
+
+    limit = cast(Any, default)._client.get_settings().chroma_memory_limit_bytes
+    assert limit == vector_store.CHROMA_MEMORY_LIMIT_BYTES
+    assert stats["collection_available"] is True
+
+
+def test_multi_query_records_a_repeated_match_object_once() -> None:
+    match = {"text": "A", "metadata": {"source_path": "doc", "chunk_id": "doc-1"}, "score": 0.3}
+    manager = StubVectorStoreManager({"q": [match, match]})
+
+    results = manager.multi_query(["q"], top_k=2)
+
+    assert results == [match]
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from src.temporal.converter import DATA_CONVERTER
+from temporalio.converter import DataConverter
+
+
+def test_orjson_payloads_decode_with_default_converter() -> None:
+    value = {"answer": "ok", "progress": [{"label": "plan", "metadata": {"score": 0.5}}]}
+
+    payloads = DATA_CONVERTER.payload_converter.to_payloads([value])
+
+    assert payloads[0].metadata["encoding"] == b"json/plain"
+    assert DataConverter.default.payload_converter.from_payloads(payloads) == [value]
+
+
+def test_unsupported_values_fall_back_to_default_encoder() -> None:
+    # orjson rejects non-string keys; the stdlib encoder stringifies them.
+    payloads = DATA_CONVERTER.payload_converter.to_payloads([{1: "page"}])
+
+    assert DATA_CONVERTER.payload_converter.from_payloads(payloads) == [{"1": "page"}]
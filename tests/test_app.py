@@ -0,0 +1,196 @@
+import argparse
+import asyncio
+import threading
+from typing import Any, Dict, List
+
+import pytest
+from src import app
+from temporalio.service import RPCError, RPCStatusCode
+
+
+class StateHandle:
+    def __init__(self, ready_after: int) -> None:
+        self.ready_after = ready_after
+        self.queries = 0
+
+    async def query(self, _query: Any, *_args: Any) -> Dict[str, Any]:
+        self.queries += 1
+        revision = 1 if self.queries > self.ready_after else 0
+        return {
+            "prompt": {"prompt": "menu", "revision": 1},
+            "result": {"revision": revision, "status": "ok"},
+        }
+
+
+@pytest.mark.asyncio
+async def test_await_state_change_backs_off_between_queries(monkeypatch: pytest.MonkeyPatch) -> None:
+    pauses: List[float] = []
+
+    async def record_sleep(delay: float) -> None:
+        pauses.append(delay)
+
+    monkeypatch.setattr(app.asyncio, "sleep", record_sleep)
+    handle = StateHandle(ready_after=8)
+
+    change = await app._await_state_change(handle, 1, 0)  # type: ignore[arg-type]
+
+    assert change.result is not None and change.result["revision"] == 1
+    assert not change.prompt_advanced
+    assert handle.queries == 9
+    assert len(pauses) == 8
+    assert pauses[0] <= app.POLL_MIN_DELAY_SECONDS
+    assert pauses[-1] > pauses[0]
+    assert max(pauses) <= app.POLL_MAX_DELAY_SECONDS
+
+
+@pytest.mark.asyncio
+async def test_await_state_change_times_out_without_progress() -> None:
+    handle = StateHandle(ready_after=10_000)
+
+    change = await app._await_state_change(handle, 1, 0, timeout_seconds=0.05)  # type: ignore[arg-type]
+
+    assert change.timed_out
+    assert change.result is None
+    assert handle.queries >= 1
+
+
+class UpdateHandle(StateHandle):
+    def __init__(self, supported: bool = True) -> None:
+        super().__init__(ready_after=0)
+        self.supported = supported
+        self.updates: List[Any] = []
+        self.signals: List[Any] = []
+
+    async def signal(self, _signal: Any, arg: Any) -> None:
+        self.signals.append(arg)
+
+    async def execute_update(self, update: Any, *, args: Any) -> Dict[str, Any]:
+        self.updates.append((update, *args))
+        if not self.supported:
+            raise RPCError("updates disabled", RPCStatusCode.PERMISSION_DENIED, b"")
+        if update == app.SUBMIT_AND_WAIT_UPDATE:
+            _, last_prompt_revision, last_result_revision, _ = args
+        else:
+            last_prompt_revision, last_result_revision, _, _ = args
+        return {
+            "prompt": {"prompt": "menu", "revision": last_prompt_revision + 1},
+            "result": {"revision": last_result_revision + 1, "status": "ok"},
+        }
+
+
+@pytest.mark.asyncio
+async def test_await_state_change_returns_prompt_and_result_from_one_update() -> None:
+    handle = UpdateHandle()
+    mode = app._WaitMode()
+
+    change = await app._await_state_change(handle, 3, 5, mode=mode)  # type: ignore[arg-type]
+
+    assert change.prompt_advanced and change.prompt == "menu"
+    assert change.prompt_revision == 4
+    assert change.result is not None and change.result_revision == 6
+    assert handle.updates == [(app.WAIT_STATE_CHANGE_UPDATE, 3, 5, app.UPDATE_WAIT_SECONDS, 0)]
+    assert handle.queries == 0
+
+
+@pytest.mark.asyncio
+async def test_await_state_change_falls_back_to_queries_without_updates() -> None:
+    handle = UpdateHandle(supported=False)
+    mode = app._WaitMode()
+
+    change = await app._await_state_change(handle, 1, 0, mode=mode)  # type: ignore[arg-type]
+
+    assert change.result is not None and change.result["revision"] == 1
+    assert mode.updates is False
+    assert len(handle.updates) == 1
+    assert handle.queries == 1
+
+
+def test_sanitize_command_drops_leading_noise() -> None:
+    assert app._sanitize_command("  \x1b[/ask What is RAG0?  ") == "/ask What is RAG0?"
+    assert app._sanitize_command("   ") == ""
+    assert app._sanitize_command("???") == "???"
+
+
+def test_progress_label_formats_and_caches_labels() -> None:
+    app._progress_label.cache_clear()
+
+    first = app._progress_label("grade_answer")
+    second = app._progress_label("grade_answer")
+
+    assert first[0] == "Grade Answer"
+    assert second is first
+    assert app._progress_label.cache_info().hits == 1
+
+
+def test_safe_int_falls_back_to_default() -> None:
+    assert app._safe_int(7) == 7
+    assert app._safe_int(True) == 1
+    assert app._safe_int(" 12 ") == 12
+    assert app._safe_int(3.9) == 3
+    assert app._safe_int("", 5) == 5
+    assert app._safe_int("1.5", 5) == 5
+    assert app._safe_int(None, 5) == 5
+    assert app._safe_int(float("inf"), 5) == 5
+
+
+@pytest.mark.asyncio
+async def test_submit_command_waits_for_result_in_the_same_update() -> None:
+    handle = UpdateHandle()
+
+    change = await app._submit_command(handle, "/stat", 2, 4, app._WaitMode())  # type: ignore[arg-type]
+
+    assert change is not None and change.result_revision == 5
+    assert handle.updates == [(app.SUBMIT_AND_WAIT_UPDATE, "/stat", 2, 4, app.UPDATE_WAIT_SECONDS)]
+    assert handle.signals == []
+
+
+@pytest.mark.asyncio
+async def test_submit_command_signals_when_updates_are_rejected() -> None:
+    handle = UpdateHandle(supported=False)
+    mode = app._WaitMode()
+
+    change = await app._submit_command(handle, "/stat", 2, 4, mode)  # type: ignore[arg-type]
+
+    assert change is None
+    assert mode.updates is False
+    assert handle.signals == ["/stat"]
+
+
+@pytest.mark.asyncio
+async def test_read_line_keeps_event_loop_responsive() -> None:
+    release = threading.Event()
+    ticks: List[int] = []
+
+    def blocking_reader(prompt: str) -> str:
+        release.wait(timeout=5)
+        return prompt + "/stat"
+
+    async def ticker() -> None:
+        for tick in range(3):
+            ticks.append(tick)
+            await asyncio.sleep(0)
+        release.set()
+
+    line, _ = await asyncio.gather(app._read_line(blocking_reader, "> "), ticker())
+
+    assert line == "> /stat"
+    assert ticks == [0, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_read_line_propagates_eof() -> None:
+    def closed_reader(prompt: str) -> str:
+        raise EOFError
+
+    with pytest.raises(EOFError):
+        await app._read_line(closed_reader, "> ")
+
+
+def test_config_from_args_ignores_unknown_flags() -> None:
+    args = argparse.Namespace(ask_top_k=3, task_queue="custom", verbose=True)
+
+    config = app._config_from_args(args)
+
+    assert config.ask_top_k == 3
+    assert config.task_queue == "custom"
+    assert not hasattr(config, "verbose")
@@ -41,3 +41,19 @@ async def test_parse_quit_command() -> None:
 async def test_parse_unknown_command() -> None:
     with pytest.raises(CommandParseError):
         await parse_cli_command_activity("/unknown")
+
+
+@pytest.mark.asyncio
+async def test_parse_ingest_quoted_path_with_spaces(tmp_path: Path) -> None:
+    doc = tmp_path / "my notes.txt"
+    doc.write_text("hello world", encoding="utf-8")
+
+    command = await parse_cli_command_activity(f'/ingest "{doc}"')
+
+    assert Path(command["arguments"]["source_path"]).resolve() == doc.resolve()
+
+
+@pytest.mark.asyncio
+async def test_parse_unbalanced_quotes() -> None:
+    with pytest.raises(CommandParseError):
+        await parse_cli_command_activity('/ask "unterminated')
@@ -0,0 +1,65 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+from src.activities import detect_document_type_activity
+from src.workflows import IngestionWorkflow
+
+temporalio_activity = pytest.importorskip("temporalio.activity")
+temporalio_testing = pytest.importorskip("temporalio.testing")
+temporalio_worker = pytest.importorskip("temporalio.worker")
+
+
+@pytest.mark.asyncio
+async def test_ingestion_workflow_detects_type_locally(tmp_path: Path) -> None:
+    image = tmp_path / "scan.png"
+    image.write_bytes(b"\x89PNG\r\n\x1a\n" + b"\x00" * 16)
+    parse_calls: List[str] = []
+
+    @temporalio_activity.defn(name="parse_document_activity")
+    async def stub_parse(source_path: str, document_type: str, *_: Any) -> Dict[str, Any]:
+        parse_calls.append(document_type)
+        return {"metadata": {"source_path": source_path}, "content": {"paragraphs": []}}
+
+    @temporalio_activity.defn(name="store_parsed_document_activity")
+    async def stub_store(
+        metadata: Dict[str, Any], content: Dict[str, Any], parsed_dir: str
+    ) -> Dict[str, Any]:
+        return {"parsed_path": str(tmp_path / "scan.md"), "metadata_path": None}
+
+    @temporalio_activity.defn(name="update_index_activity")
+    async def stub_update_index(*_: Any) -> Dict[str, Any]:
+        return {"status": "indexed"}
+
+    env = await temporalio_testing.WorkflowEnvironment.start_time_skipping()
+    try:
+        with ThreadPoolExecutor(max_workers=2) as activity_executor:
+            async with temporalio_worker.Worker(
+                env.client,
+                task_queue="test-ingestion-workflow",
+                activity_executor=activity_executor,
+                workflows=[IngestionWorkflow],
+                activities=[detect_document_type_activity, stub_parse, stub_store, stub_update_index],
+            ):
+                handle = await env.client.start_workflow(
+                    IngestionWorkflow.run,
+                    {"source_path": str(image), "parsed_dir": str(tmp_path)},
+                    id="test-ingestion-workflow-detect",
+                    task_queue="test-ingestion-workflow",
+                )
+                result = await asyncio.wait_for(handle.result(), timeout=10)
+                history = await handle.fetch_history()
+    finally:
+        await env.shutdown()
+
+    assert result["document_type"] == "image"
+    assert parse_calls == ["image"]
+    scheduled = [
+        event.activity_task_scheduled_event_attributes.activity_type.name
+        for event in history.events
+        if event.HasField("activity_task_scheduled_event_attributes")
+    ]
+    assert "detect_document_type_activity" not in scheduled
+    assert "parse_document_activity" in scheduled
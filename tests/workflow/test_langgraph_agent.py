@@ -1,9 +1,20 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Sequence, Tuple, cast
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple, cast
 
+import numpy as np
+import orjson
+import pytest
 from llama_index.core.schema import QueryBundle
-from src.agents.ask import AskAgentConfig, AskAgentState, LangGraphAskAgent
+from src.agents.ask import (
+    AskAgentConfig,
+    AskAgentState,
+    LangGraphAskAgent,
+    ReasoningStep,
+    RetrievedDocument,
+    warm_ollama_model,
+)
 from src.ingestion.vector_store import VectorStoreManager
 from src.workflows import QuestionWorkflowInput
 
@@ -75,6 +86,42 @@ def test_langgraph_agent_uses_stubs(monkeypatch):
     assert stub_responder.prompts, "Responder should be invoked."
 
 
+class EmbeddingCountingStore(VectorStoreManager):
+    def __init__(self) -> None:
+        self._chunk_sidecar_cache: Dict[str, Tuple[int, List[Dict[str, Any]], Dict[str, int]]] = {}
+        self._embed_model = cast(Any, object())
+        self._retrieval_cache_size = 16
+        self._retrieval_cache = OrderedDict()
+        self.embedded: List[List[str]] = []
+
+    def batch_embed(self, texts: Sequence[str]) -> np.ndarray:
+        self.embedded.append(list(texts))
+        return np.ones((len(texts), 2), dtype=np.float32)
+
+    def query(
+        self, prompt: str, top_k: int = 3, embedding: Optional[Sequence[float]] = None
+    ) -> List[Dict[str, Any]]:
+        return [{"text": f"About {prompt}", "metadata": {"source_path": prompt, "chunk_id": prompt}}]
+
+
+def test_reflection_pass_only_embeds_new_prompts():
+    store = EmbeddingCountingStore()
+
+    def vector_factory(_config: AskAgentConfig):
+        return store
+
+    def responder_factory(_config: AskAgentConfig):
+        return ReflectiveResponder()
+
+    agent = LangGraphAskAgent(vector_store_factory=vector_factory, responder_factory=responder_factory)
+    config = AskAgentConfig(max_subquestions=1, reflection_enabled=True, max_reflections=1)
+    agent.run("Explain RAG0 goals.", config)
+
+    assert len(store.embedded) == 2
+    assert store.embedded[0] == ["Explain RAG0 goals?"]
+    assert "Explain RAG0 goals." not in store.embedded[1]
+
+
 def test_state_round_trip():
     config = AskAgentConfig(ollama_model="mistral")
     state = AskAgentState(
@@ -88,6 +135,44 @@ def test_state_round_trip():
     assert restored.config.ollama_model == "mistral"
 
 
+def test_graph_state_reuses_unchanged_history_dicts():
+    state = AskAgentState(
+        question="What is LangGraph?",
+        reasoning=[ReasoningStep(label="analysis", detail="planned")],
+    )
+    graph_state = state.to_graph_state()
+
+    restored = AskAgentState.from_graph_state(graph_state)
+    restored.reasoning.append(ReasoningStep(label="retrieval", detail="found"))
+    dumped = restored.to_graph_state()
+
+    assert dumped["reasoning"][0] is graph_state["reasoning"][0]
+    assert dumped["reasoning"][1]["label"] == "retrieval"
+    assert dumped["conversation"] is graph_state["conversation"]
+    assert dumped["config"] is graph_state["config"]
+
+
+def test_graph_state_reuses_supplied_config():
+    config = AskAgentConfig(ollama_model="mistral")
+    graph_state = AskAgentState(question="What is LangGraph?", config=config).to_graph_state()
+
+    restored = AskAgentState.from_graph_state(graph_state, config)
+
+    assert restored.config is config
+    assert restored.to_graph_state()["config"] is graph_state["config"]
+
+
+def test_graph_state_is_plain_json():
+    state = AskAgentState(
+        question="What is LangGraph?",
+        retrieved_documents=[RetrievedDocument(text="chunk", score=0.5, metadata={"page": 1})],
+        reasoning=[ReasoningStep(label="rewrite_query", detail="d", metadata={"followups": ["more?"]})],
+    )
+    graph_state = state.to_graph_state()
+
+    assert orjson.loads(orjson.dumps(graph_state)) == graph_state
+
+
 def test_format_documents_for_llm():
     docs = [
         {
@@ -100,6 +185,12 @@ def test_format_documents_for_llm():
     assert "Context snippet" in formatted
 
 
+def test_format_documents_for_llm_accepts_records():
+    docs = [RetrievedDocument(text="Context snippet", metadata={"file_name": "doc.md", "page": 2})]
+
+    assert VectorStoreManager.format_documents_for_llm(docs) == "[1] doc.md (page 2)\nContext snippet"
+
+
 def test_question_workflow_input_to_args():
     payload = QuestionWorkflowInput(
         question="What is LangGraph?",
@@ -165,3 +256,50 @@ def test_vector_store_retriever_input_with_embedding(monkeypatch):
     cast(Any, manager)._create_query_bundle = fake_create_query_bundle
     bundle = VectorStoreManager._retriever_input(cast(VectorStoreManager, manager), "question?")
     assert isinstance(bundle, QueryBundle)
+
+
+def test_cached_graph_keeps_step_callbacks_per_run():
+    responses = [
+        {
+            "text": "RAG0 overview chunk.",
+            "metadata": {"source_path": "doc.md", "chunk_id": "doc-1", "chunk_index": 0},
+        }
+    ]
+    stores: List[StubVectorStore] = []
+    builds: List[AskAgentConfig] = []
+
+    def vector_factory(_config: AskAgentConfig):
+        store = StubVectorStore(responses)
+        stores.append(store)
+        return store
+
+    class CountingAgent(LangGraphAskAgent):
+        def _build_graph(self, config: AskAgentConfig):
+            builds.append(config)
+            return super()._build_graph(config)
+
+    def responder_factory(_config: AskAgentConfig):
+        return StubResponder()
+
+    agent = CountingAgent(
+        vector_store_factory=vector_factory,
+        responder_factory=responder_factory,
+    )
+    config = AskAgentConfig(top_k=2, reflection_enabled=False)
+    first_steps: List[str] = []
+    second_steps: List[str] = []
+
+    agent.run("Explain RAG0 goals.", config, on_step=lambda label, _state: first_steps.append(label))
+    recorded_first = list(first_steps)
+    agent.run("What does RAG0 index?", config, on_step=lambda label, _state: second_steps.append(label))
+
+    assert len(builds) == 1, "Expected the compiled graph to be reused for the same config"
+    assert first_steps == recorded_first, "First callback must not receive steps from the second run"
+    assert first_steps and second_steps
+    assert first_steps[0] == second_steps[0] == "analysis"
+    assert len(stores) == 2, "Each run should get its own vector store"
+
+
+@pytest.mark.asyncio
+async def test_warm_ollama_model_reports_unreachable_server() -> None:
+    assert await warm_ollama_model("stub-model", "http://127.0.0.1:9") is False
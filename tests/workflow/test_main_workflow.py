@@ -1,4 +1,5 @@
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 
 import pytest
 from src.activities import (
@@ -20,29 +21,45 @@ temporalio_worker = pytest.importorskip("temporalio.worker")
 async def test_main_workflow_handles_quit() -> None:
     env = await temporalio_testing.WorkflowEnvironment.start_time_skipping()
     try:
-        async with temporalio_worker.Worker(
-            env.client,
-            task_queue="test-main-workflow",
-            workflows=[MainWorkflow],
-            activities=[
-                render_cli_menu_activity,
-                parse_cli_command_activity,
-                ingest_command_activity,
-                question_command_activity,
-                stats_command_activity,
-                quit_command_activity,
-            ],
-        ):
-            handle = await env.client.start_workflow(
-                MainWorkflow.run,
-                WorkflowConfig(),
-                id="test-main-workflow-quit",
+        with ThreadPoolExecutor(max_workers=4) as activity_executor:
+            async with temporalio_worker.Worker(
+                env.client,
                 task_queue="test-main-workflow",
-            )
-            await handle.signal(MainWorkflow.submit_input, "/quit")
-            result = await asyncio.wait_for(handle.result(), timeout=5)
+                activity_executor=activity_executor,
+                workflows=[MainWorkflow],
+                activities=[
+                    render_cli_menu_activity,
+                    parse_cli_command_activity,
+                    ingest_command_activity,
+                    question_command_activity,
+                    stats_command_activity,
+                    quit_command_activity,
+                ],
+            ):
+                handle = await env.client.start_workflow(
+                    MainWorkflow.run,
+                    WorkflowConfig(),
+                    id="test-main-workflow-quit",
+                    task_queue="test-main-workflow",
+                )
+                await handle.signal(MainWorkflow.submit_input, "/quit")
+                result = await asyncio.wait_for(handle.result(), timeout=5)
     finally:
         await env.shutdown()
 
     assert result["status"] == "quit"
     assert result["command"] == "quit"
+
+
+def test_get_state_omits_progress_already_seen() -> None:
+    workflow = MainWorkflow()
+    workflow._active_command = "ask"
+    for label in ("analysis", "retrieval", "reasoner"):
+        workflow.push_progress({"event": {"label": label, "detail": ""}})
+
+    state = workflow.get_state(2)
+    running = state["result"]["result"]
+
+    assert [event["label"] for event in running["progress"]] == ["reasoner"]
+    assert running["progress_offset"] == 2
+    assert len(workflow.get_state()["result"]["result"]["progress"]) == 3